@@ -8,178 +8,70 @@ import sqlite3
 import json
 from datetime import datetime, date
 import os
+import base64
+import io
+import shutil
+import tempfile
+import threading
+import time
+import database
+import settings
+from asset_search import RANK_EXPR, asset_search_source, build_asset_filters
+from database import begin_immediate, get_db
+from license_keys import (claim_available_keys, iter_license_keys, normalize_license_keys, recompute_license_quantities,
+                          reconcile_license_keys)
+from migrations import migrate
+from scheduler import request_run, scheduler_status, start_scheduler
+from sequences import allocate_number
 
 app = Flask(__name__)
-DB_PATH = 'itam_prod.db'
-
-def normalize_license_keys(raw_text):
-    """Parse bulk key text into unique key list preserving order."""
-    if raw_text is None:
-        return []
-    text = str(raw_text).replace('\r', '')
-    candidates = []
-    for line in text.split('\n'):
-        for token in line.replace(';', ',').split(','):
-            key = token.strip()
-            if key:
-                candidates.append(key)
-    deduped = []
-    seen = set()
-    for key in candidates:
-        if key not in seen:
-            deduped.append(key)
-            seen.add(key)
-    return deduped
 
 def check_db_schema():
-    """Check and update DB schema without external script"""
+    """Apply pending schema migrations; a version lookup when already up to date."""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.execute("PRAGMA foreign_keys = ON")
-        cursor = conn.cursor()
-        table_exists = cursor.execute(
-            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='SoftwareLicense'"
-        ).fetchone()
-        if not table_exists:
-            conn.close()
-            return
-        
-        # Check SoftwareLicense.license_status
-        cursor.execute("PRAGMA table_info(SoftwareLicense)")
-        columns = [info[1] for info in cursor.fetchall()]
-        if 'license_status' not in columns:
-            print("🔄 Migrating: Adding license_status to SoftwareLicense")
-            cursor.execute("ALTER TABLE SoftwareLicense ADD COLUMN license_status VARCHAR(20) NOT NULL DEFAULT '활성'")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_license_status ON SoftwareLicense(license_status)")
-        
-        # Key inventory table for per-key lifecycle management.
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS LicenseKey (
-                license_key_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                license_id INTEGER NOT NULL,
-                key_value VARCHAR(500) NOT NULL,
-                key_status VARCHAR(20) NOT NULL DEFAULT '가용',
-                assigned_assignment_id INTEGER,
-                assigned_date DATE,
-                revoked_date DATE,
-                notes TEXT,
-                created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(license_id, key_value),
-                FOREIGN KEY (license_id) REFERENCES SoftwareLicense(license_id),
-                FOREIGN KEY (assigned_assignment_id) REFERENCES LicenseAssignment(assignment_id)
-            )
-        ''')
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_licensekey_license ON LicenseKey(license_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_licensekey_status ON LicenseKey(key_status)")
-
-        # Link assignment row to allocated key.
-        la_exists = cursor.execute(
-            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='LicenseAssignment'"
-        ).fetchone()
-        if la_exists:
-            cursor.execute("PRAGMA table_info(LicenseAssignment)")
-            la_columns = [info[1] for info in cursor.fetchall()]
-            if 'license_key_id' not in la_columns:
-                print("🔄 Migrating: Adding license_key_id to LicenseAssignment")
-                cursor.execute("ALTER TABLE LicenseAssignment ADD COLUMN license_key_id INTEGER")
-                cursor.execute("CREATE INDEX IF NOT EXISTS idx_assignment_licensekey ON LicenseAssignment(license_key_id)")
-
-        # Backfill keys from legacy SoftwareLicense.license_key field.
-        legacy_rows = cursor.execute('''
-            SELECT license_id, license_key
-            FROM SoftwareLicense
-            WHERE COALESCE(TRIM(license_key), '') != ''
-        ''').fetchall()
-        for license_id, legacy_text in legacy_rows:
-            for key in normalize_license_keys(legacy_text):
-                cursor.execute('''
-                    INSERT OR IGNORE INTO LicenseKey (license_id, key_value, key_status)
-                    VALUES (?, ?, '가용')
-                ''', (license_id, key))
-
-        # Map active assignments to available keys when assignment link is empty.
-        license_ids = [row[0] for row in cursor.execute(
-            "SELECT license_id FROM SoftwareLicense WHERE is_deleted = 0"
-        ).fetchall()]
-        for license_id in license_ids:
-            assignment_ids = [row[0] for row in cursor.execute('''
-                SELECT assignment_id
-                FROM LicenseAssignment
-                WHERE license_id = ? AND is_active = 1 AND license_key_id IS NULL
-                ORDER BY assignment_id
-            ''', (license_id,)).fetchall()]
-            key_ids = [row[0] for row in cursor.execute('''
-                SELECT license_key_id
-                FROM LicenseKey
-                WHERE license_id = ? AND key_status = '가용'
-                ORDER BY license_key_id
-            ''', (license_id,)).fetchall()]
-            for assignment_id, license_key_id in zip(assignment_ids, key_ids):
-                cursor.execute('''
-                    UPDATE LicenseAssignment
-                    SET license_key_id = ?
-                    WHERE assignment_id = ?
-                ''', (license_key_id, assignment_id))
-                cursor.execute('''
-                    UPDATE LicenseKey
-                    SET key_status = '할당',
-                        assigned_assignment_id = ?,
-                        assigned_date = COALESCE(assigned_date, DATE('now'))
-                    WHERE license_key_id = ?
-                ''', (assignment_id, license_key_id))
-
-            # Keep quantity fields consistent during startup migration.
-            key_total = cursor.execute('''
-                SELECT COUNT(*)
-                FROM LicenseKey
-                WHERE license_id = ? AND key_status != '폐기'
-            ''', (license_id,)).fetchone()[0]
-            assigned_key_count = cursor.execute('''
-                SELECT COUNT(*)
-                FROM LicenseKey
-                WHERE license_id = ? AND key_status = '할당'
-            ''', (license_id,)).fetchone()[0]
-            active_assign_count = cursor.execute('''
-                SELECT COUNT(*)
-                FROM LicenseAssignment
-                WHERE license_id = ? AND is_active = 1
-            ''', (license_id,)).fetchone()[0]
-            current_total = cursor.execute('''
-                SELECT total_quantity
-                FROM SoftwareLicense
-                WHERE license_id = ?
-            ''', (license_id,)).fetchone()[0]
-            if key_total > 0:
-                total = key_total
-                used = max(assigned_key_count, active_assign_count)
-            else:
-                total = current_total
-                used = active_assign_count
-            available = total - used
-            compliance = '정상' if available >= 0 else '초과'
-            cursor.execute('''
-                UPDATE SoftwareLicense
-                SET total_quantity = ?, used_quantity = ?, available_quantity = ?, compliance_status = ?,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE license_id = ?
-            ''', (total, used, available, compliance, license_id))
-
-        conn.commit()
-        conn.close()
+        migrate()
     except Exception as e:
         print(f"⚠️ Schema check failed: {e}")
 
 check_db_schema()
 
+# 백그라운드 작업(스케줄러 등)은 모듈 import 시점이 아니라 실제로 요청을 처리하는 프로세스에서만 기동
+# (python app.py 실행 시 또는 WSGI 워커의 첫 요청 시; SCHEDULER_ENABLED로 끌 수 있음)
+_background_started = False
+_background_lock = threading.Lock()
+
+def start_background_services():
+    """Start per-process background work once: import job recovery and the scheduler thread.
+
+    스케줄러는 WSGI 워커별로 기동하고 DB 임대로 한 곳만 실행한다.
+    """
+    global _background_started
+    with _background_lock:
+        if _background_started:
+            return
+        _background_started = True
+    # 이전 프로세스가 남긴 대기/중단 Import 작업 정리 (이후에는 스케줄러가 주기적으로 확인)
+    from import_jobs import recover_import_jobs
+    conn = get_db()
+    try:
+        recover_import_jobs(conn)
+    except Exception as e:
+        print(f"⚠️ Import job recovery failed: {e}")
+    finally:
+        conn.close()
+    try:
+        start_scheduler()
+    except Exception as e:
+        print(f"⚠️ Scheduler start failed: {e}")
+
+@app.before_request
+def ensure_background_services():
+    if not _background_started:
+        start_background_services()
+
 # ========================================
 # Database Helpers
 # ========================================
-def get_db():
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("PRAGMA foreign_keys = ON")
-    conn.row_factory = sqlite3.Row
-    return conn
-
 def row_to_dict(row):
     return dict(row) if row else None
 
@@ -189,6 +81,23 @@ def rows_to_list(rows):
 def api_response(success=True, data=None, message=None, status=200):
     return jsonify({"success": success, "data": data, "message": message}), status
 
+def encode_cursor(values):
+    """Opaque keyset cursor for paginated list APIs."""
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(token):
+    if not token:
+        return None
+    padded = token + '=' * (-len(token) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+def parse_page_limit(raw):
+    limit = int(raw) if raw not in (None, '') else settings.API_PAGE_SIZE
+    if limit <= 0:
+        raise ValueError('limit must be positive')
+    return min(limit, settings.API_PAGE_SIZE_MAX)
+
 def log_history(conn, ref_type, ref_id, action_type, detail, prev_vals=None, new_vals=None, action_by=1):
     """Insert audit trail record"""
     cursor = conn.cursor()
@@ -201,29 +110,18 @@ def log_history(conn, ref_type, ref_id, action_type, detail, prev_vals=None, new
           json.dumps(new_vals, ensure_ascii=False) if new_vals else None, action_by))
 
 def sync_license_quantities(conn, license_id):
-    """Synchronize quantity fields with assignment/key state."""
-    row = conn.execute(
-        'SELECT total_quantity FROM SoftwareLicense WHERE license_id = ?',
-        (license_id,)
-    ).fetchone()
+    """Synchronize quantity fields with assignment/key state (trigger-maintained counters)."""
+    row = conn.execute('''
+        SELECT total_quantity, key_total_count, key_assigned_count, active_assignment_count
+        FROM SoftwareLicense
+        WHERE license_id = ?
+    ''', (license_id,)).fetchone()
     if not row:
         return
 
-    key_total = conn.execute('''
-        SELECT COUNT(*) AS cnt
-        FROM LicenseKey
-        WHERE license_id = ? AND key_status != '폐기'
-    ''', (license_id,)).fetchone()['cnt']
-    assigned_key_count = conn.execute('''
-        SELECT COUNT(*) AS cnt
-        FROM LicenseKey
-        WHERE license_id = ? AND key_status = '할당'
-    ''', (license_id,)).fetchone()['cnt']
-    active_assignment_count = conn.execute('''
-        SELECT COUNT(*) AS cnt
-        FROM LicenseAssignment
-        WHERE license_id = ? AND is_active = 1
-    ''', (license_id,)).fetchone()['cnt']
+    key_total = row['key_total_count']
+    assigned_key_count = row['key_assigned_count']
+    active_assignment_count = row['active_assignment_count']
 
     if key_total > 0:
         total = key_total
@@ -243,49 +141,7 @@ def sync_license_quantities(conn, license_id):
 
 def upsert_license_keys(conn, license_id, key_text):
     """Upsert keys from bulk text; assigned keys are preserved."""
-    desired_keys = set(normalize_license_keys(key_text))
-    today = date.today().isoformat()
-    rows = conn.execute('''
-        SELECT license_key_id, key_value, key_status
-        FROM LicenseKey
-        WHERE license_id = ?
-    ''', (license_id,)).fetchall()
-
-    existing_by_key = {row['key_value']: row for row in rows}
-    assigned_kept = []
-
-    # Add/reactivate desired keys.
-    for key in desired_keys:
-        existing = existing_by_key.get(key)
-        if not existing:
-            conn.execute('''
-                INSERT INTO LicenseKey (license_id, key_value, key_status)
-                VALUES (?, ?, '가용')
-            ''', (license_id, key))
-            continue
-        if existing['key_status'] == '폐기':
-            conn.execute('''
-                UPDATE LicenseKey
-                SET key_status = '가용', revoked_date = NULL, notes = NULL
-                WHERE license_key_id = ?
-            ''', (existing['license_key_id'],))
-
-    # Deprecate keys removed from the new bulk list.
-    for row in rows:
-        key_value = row['key_value']
-        if key_value in desired_keys:
-            continue
-        if row['key_status'] == '할당':
-            assigned_kept.append(key_value)
-            continue
-        if row['key_status'] != '폐기':
-            conn.execute('''
-                UPDATE LicenseKey
-                SET key_status = '폐기', revoked_date = ?, notes = '라이선스 수정으로 비활성화'
-                WHERE license_key_id = ?
-            ''', (today, row['license_key_id']))
-
-    return assigned_kept
+    return reconcile_license_keys(conn, license_id, normalize_license_keys(key_text))['assigned_kept']
 
 # ========================================
 # Location API (사업장)
@@ -725,51 +581,72 @@ def delete_eos_info(id):
 # ========================================
 def generate_asset_number(conn, location_code, category_code):
     year = datetime.now().year
-    prefix = f"{location_code}-{category_code}-{year}"
-    row = conn.execute("SELECT asset_number FROM Asset WHERE asset_number LIKE ? ORDER BY asset_number DESC LIMIT 1", (f"{prefix}-%",)).fetchone()
-    if row:
-        last_num = int(row['asset_number'].split('-')[-1])
-        return f"{prefix}-{str(last_num + 1).zfill(4)}"
-    return f"{prefix}-0001"
+    return allocate_number(conn, 'ASSET', f"{location_code}-{category_code}-{year}")
 
 @app.route('/api/assets', methods=['GET'])
 def get_assets():
-    conn = get_db()
-    location_id = request.args.get('location_id')
-    category_id = request.args.get('category_id')
-    status = request.args.get('status')
-    keyword = request.args.get('keyword')
-    
-    query = '''
+    """자산 목록 - limit/cursor 지정 시 키셋 페이지 (검색 시 관련도순, 그 외 asset_id DESC)"""
+    paged = 'limit' in request.args or 'cursor' in request.args
+    try:
+        limit = parse_page_limit(request.args.get('limit'))
+        cursor = decode_cursor(request.args.get('cursor'))
+        last_id = int(cursor['id']) if cursor else None
+        last_rank = float(cursor['rank']) if cursor and 'rank' in cursor else None
+    except (ValueError, KeyError, TypeError):
+        return api_response(False, message="잘못된 페이지 요청입니다.", status=400)
+
+    conn = get_db()
+    where, params, match = build_asset_filters(conn, request.args)
+    source, where, params = asset_search_source(where, params, match)
+    rank_select = f', {RANK_EXPR} AS search_rank' if match else ''
+    order_by = 'search_rank, a.asset_id DESC' if match else 'a.asset_id DESC'
+    query = f'''
         SELECT a.*, c.category_name, c.category_code, c.asset_type, l.location_name, l.location_code,
                u.user_name as current_user_name, m.user_name as manager_name, e.product_name as eos_product_name
-        FROM Asset a
+               {rank_select}
+        {source}
         LEFT JOIN AssetCategory c ON a.category_id = c.category_id
         LEFT JOIN Location l ON a.location_id = l.location_id
         LEFT JOIN User u ON a.current_user_id = u.user_id
         LEFT JOIN User m ON a.asset_manager_id = m.user_id
         LEFT JOIN EOSInfo e ON a.eos_id = e.eos_id
-        WHERE a.is_deleted = 0
+        WHERE {where}
     '''
-    params = []
-    if location_id:
-        query += ' AND a.location_id = ?'
-        params.append(location_id)
-    if category_id:
-        query += ' AND a.category_id = ?'
-        params.append(category_id)
-    if status:
-        query += ' AND a.asset_status = ?'
-        params.append(status)
-    if keyword:
-        query += ' AND (a.asset_number LIKE ? OR a.asset_name LIKE ? OR a.serial_number LIKE ? OR a.ip_address LIKE ?)'
-        kw = f'%{keyword}%'
-        params.extend([kw, kw, kw, kw])
-    query += ' ORDER BY a.asset_id DESC'
-    
-    rows = conn.execute(query, params).fetchall()
-    conn.close()
-    return api_response(data=rows_to_list(rows))
+    if not paged:
+        rows = conn.execute(query + f' ORDER BY {order_by}', params).fetchall()
+        conn.close()
+        return api_response(data=rows_to_list(rows))
+
+    page_params = list(params)
+    if last_id is not None and match and last_rank is not None:
+        query += f' AND ({RANK_EXPR} > ? OR ({RANK_EXPR} = ? AND a.asset_id < ?))'
+        page_params.extend([last_rank, last_rank, last_id])
+    elif last_id is not None:
+        query += ' AND a.asset_id < ?'
+        page_params.append(last_id)
+    query += f' ORDER BY {order_by} LIMIT ?'
+    page_params.append(limit + 1)
+    rows = conn.execute(query, page_params).fetchall()
+    has_more = len(rows) > limit
+    items = rows_to_list(rows[:limit])
+
+    total = None
+    if request.args.get('include_total') in ('1', 'true'):
+        # 조인 없이 Asset(+검색 인덱스)만 세므로 목록 조회보다 가볍다
+        total = conn.execute(f'SELECT COUNT(*) AS cnt {source} WHERE {where}', params).fetchone()['cnt']
+    conn.close()
+
+    next_cursor = None
+    if has_more:
+        last = items[-1]
+        next_cursor = encode_cursor({"rank": last['search_rank'], "id": last['asset_id']} if match
+                                    else {"id": last['asset_id']})
+    return api_response(data={
+        "items": items,
+        "next_cursor": next_cursor,
+        "has_more": has_more,
+        "total": total
+    })
 
 @app.route('/api/assets', methods=['POST'])
 def create_asset():
@@ -993,20 +870,13 @@ def get_eos_expired_assets():
 # ========================================
 def generate_license_number(conn):
     year = datetime.now().year
-    prefix = f"HQ-SW-{year}"
-    row = conn.execute("SELECT license_number FROM SoftwareLicense WHERE license_number LIKE ? ORDER BY license_number DESC LIMIT 1", (f"{prefix}-%",)).fetchone()
-    if row:
-        last_num = int(row['license_number'].split('-')[-1])
-        return f"{prefix}-{str(last_num + 1).zfill(4)}"
-    return f"{prefix}-0001"
+    return allocate_number(conn, 'LICENSE', f"HQ-SW-{year}")
 
 @app.route('/api/licenses', methods=['GET'])
 def get_licenses():
     conn = get_db()
     rows = conn.execute('''
-        SELECT sl.*, c.category_name, v.vendor_name, u.user_name as manager_name,
-               (SELECT COUNT(*) FROM LicenseKey lk WHERE lk.license_id = sl.license_id AND lk.key_status != '폐기') AS key_total_count,
-               (SELECT COUNT(*) FROM LicenseKey lk WHERE lk.license_id = sl.license_id AND lk.key_status = '가용') AS key_available_count
+        SELECT sl.*, c.category_name, v.vendor_name, u.user_name as manager_name
         FROM SoftwareLicense sl
         LEFT JOIN AssetCategory c ON sl.category_id = c.category_id
         LEFT JOIN Vendor v ON sl.vendor_id = v.vendor_id
@@ -1037,11 +907,12 @@ def create_license():
                                          alert_days_before, notes, license_status)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, '활성')
         ''', (license_number, data['software_name'], data['category_id'], data.get('vendor_id'), data.get('version'),
-              data['license_type'], data['license_metric'], legacy_key_text, total, total,
+              data['license_type'], data['license_metric'], None, total, total,
               data.get('purchase_date'), data.get('purchase_cost'), data.get('subscription_start'), data.get('subscription_end'),
               1 if data.get('subscription_end') else 0, data.get('auto_renewal'), data.get('renewal_cost'),
               data.get('parent_license_id'), data['license_manager_id'], '정상', data.get('alert_days_before', 30), data.get('notes')))
         license_id = cursor.lastrowid
+        # 키 원문은 LicenseKey에만 저장 (대용량 텍스트가 SoftwareLicense 행에 실리지 않도록)
         if keys:
             cursor.executemany('''
                 INSERT OR IGNORE INTO LicenseKey (license_id, key_value, key_status)
@@ -1060,12 +931,8 @@ def create_license():
 
 @app.route('/api/licenses/<int:id>', methods=['GET'])
 def get_license(id):
-    conn = get_db()
-    row = conn.execute('''
-        SELECT sl.*, c.category_name, v.vendor_name, u.user_name as manager_name,
-               (SELECT COUNT(*) FROM LicenseKey lk WHERE lk.license_id = sl.license_id AND lk.key_status != '폐기') AS key_total_count,
-               (SELECT COUNT(*) FROM LicenseKey lk WHERE lk.license_id = sl.license_id AND lk.key_status = '가용') AS key_available_count,
-               (SELECT COUNT(*) FROM LicenseKey lk WHERE lk.license_id = sl.license_id AND lk.key_status = '할당') AS key_assigned_count,
+    """라이선스 상세 - 전체 키 목록(license_key_list)은 include_keys=1일 때만 포함"""
+    key_list_select = ''',
                (SELECT group_concat(s.key_value, '\n')
                 FROM (
                     SELECT key_value
@@ -1073,7 +940,10 @@ def get_license(id):
                     WHERE license_id = sl.license_id AND key_status != '폐기'
                     ORDER BY license_key_id
                 ) s
-               ) AS license_key_list
+               ) AS license_key_list''' if request.args.get('include_keys') in ('1', 'true') else ''
+    conn = get_db()
+    row = conn.execute(f'''
+        SELECT sl.*, c.category_name, v.vendor_name, u.user_name as manager_name{key_list_select}
         FROM SoftwareLicense sl
         LEFT JOIN AssetCategory c ON sl.category_id = c.category_id
         LEFT JOIN Vendor v ON sl.vendor_id = v.vendor_id
@@ -1098,13 +968,13 @@ def update_license(id):
 
     conn.execute('''
         UPDATE SoftwareLicense
-        SET software_name=?, category_id=?, vendor_id=?, version=?, license_type=?, license_metric=?, license_key=COALESCE(?, license_key),
+        SET software_name=?, category_id=?, vendor_id=?, version=?, license_type=?, license_metric=?, license_key=CASE WHEN ? THEN NULL ELSE license_key END,
             total_quantity=?, purchase_date=?, purchase_cost=?, subscription_start=?, subscription_end=?,
             is_subscription=?, auto_renewal=?, renewal_cost=?, parent_license_id=?, license_manager_id=?,
             alert_days_before=?, notes=?, license_status=COALESCE(?, license_status), updated_at=CURRENT_TIMESTAMP
         WHERE license_id=?
     ''', (data['software_name'], data['category_id'], data.get('vendor_id'), data.get('version'), data['license_type'],
-          data['license_metric'], key_text, effective_total, data.get('purchase_date'),
+          data['license_metric'], key_text_provided, effective_total, data.get('purchase_date'),
           data.get('purchase_cost'), data.get('subscription_start'), data.get('subscription_end'),
           1 if data.get('subscription_end') else 0, data.get('auto_renewal'), data.get('renewal_cost'),
           data.get('parent_license_id'), data['license_manager_id'], data.get('alert_days_before', 30), data.get('notes'),
@@ -1178,8 +1048,35 @@ def get_license_assignments(id):
 
 @app.route('/api/licenses/<int:id>/keys', methods=['GET'])
 def get_license_keys(id):
-    conn = get_db()
-    rows = conn.execute('''
+    """라이선스 키 목록 - limit/cursor 지정 시 license_key_id 순 키셋 페이지
+
+    Filters: status (가용/할당/폐기, 쉼표로 복수 지정), q (key_value 접두어 검색).
+    """
+    paged = 'limit' in request.args or 'cursor' in request.args
+    try:
+        limit = parse_page_limit(request.args.get('limit'))
+        cursor = decode_cursor(request.args.get('cursor'))
+        last_id = int(cursor['id']) if cursor else None
+    except (ValueError, KeyError, TypeError):
+        return api_response(False, message="잘못된 페이지 요청입니다.", status=400)
+
+    where, params = ['lk.license_id = ?'], [id]
+    statuses = [v for v in request.args.get('status', '').split(',') if v]
+    if statuses:
+        where.append(f"lk.key_status IN ({','.join('?' * len(statuses))})")
+        params.extend(statuses)
+    prefix = request.args.get('q', '').strip()
+    if prefix:
+        # (license_id, key_value) 유니크 인덱스 범위 검색
+        where.append('lk.key_value >= ? AND lk.key_value < ?')
+        params.extend([prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)])
+    base_where = ' AND '.join(where)
+
+    page_where, page_params = base_where, list(params)
+    if paged and last_id is not None:
+        page_where += ' AND lk.license_key_id > ?'
+        page_params.append(last_id)
+    query = f'''
         SELECT lk.license_key_id, lk.key_value, lk.key_status, lk.assigned_date, lk.revoked_date, lk.notes,
                la.assignment_id, la.user_id, la.asset_id,
                u.user_name, u.employee_no, a.asset_number
@@ -1187,11 +1084,60 @@ def get_license_keys(id):
         LEFT JOIN LicenseAssignment la ON lk.assigned_assignment_id = la.assignment_id
         LEFT JOIN User u ON la.user_id = u.user_id
         LEFT JOIN Asset a ON la.asset_id = a.asset_id
-        WHERE lk.license_id = ?
+        WHERE {page_where}
         ORDER BY lk.license_key_id
-    ''', (id,)).fetchall()
+    '''
+    conn = get_db()
+    if not paged:
+        rows = conn.execute(query, page_params).fetchall()
+        conn.close()
+        return api_response(data=rows_to_list(rows))
+
+    rows = conn.execute(query + ' LIMIT ?', page_params + [limit + 1]).fetchall()
+    has_more = len(rows) > limit
+    items = rows_to_list(rows[:limit])
+    total = None
+    if request.args.get('include_total') in ('1', 'true'):
+        total = conn.execute(f'SELECT COUNT(*) AS cnt FROM LicenseKey lk WHERE {base_where}', params).fetchone()['cnt']
     conn.close()
-    return api_response(data=rows_to_list(rows))
+    return api_response(data={
+        "items": items,
+        "next_cursor": encode_cursor({"id": items[-1]['license_key_id']}) if has_more else None,
+        "has_more": has_more,
+        "total": total
+    })
+
+@app.route('/api/licenses/<int:id>/keys/upload', methods=['POST'])
+def upload_license_keys(id):
+    """Stream a key file (multipart 'file' or raw text body) into LicenseKey.
+
+    Query: mode=append (default, add/reactivate only) | replace (retire keys not in the file).
+    """
+    mode = request.args.get('mode', 'append')
+    if mode not in ('append', 'replace'):
+        return api_response(False, message="mode는 append 또는 replace만 가능합니다.", status=400)
+    upload = request.files.get('file')
+    stream = upload.stream if upload else request.stream
+    conn = get_db()
+    try:
+        begin_immediate(conn)
+        if not conn.execute('SELECT 1 FROM SoftwareLicense WHERE license_id = ? AND is_deleted = 0', (id,)).fetchone():
+            conn.rollback()
+            return api_response(False, message="라이선스를 찾을 수 없습니다.", status=404)
+        lines = io.TextIOWrapper(stream, encoding='utf-8-sig', errors='replace')
+        result = reconcile_license_keys(conn, id, iter_license_keys(lines), deprecate_missing=(mode == 'replace'))
+        sync_license_quantities(conn, id)
+        log_history(conn, 'LICENSE', id, 'KEYS_UPLOADED',
+                    f"키 파일 업로드({mode}): 추가 {result['inserted']}, 재활성 {result['reactivated']}, "
+                    f"폐기 {result['deprecated']}, 할당 유지 {len(result['assigned_kept'])}", None,
+                    {'filename': upload.filename if upload else None, 'mode': mode}, 1)
+        conn.commit()
+        return api_response(data={**result, 'assigned_kept': len(result['assigned_kept'])}, message="시리얼키 업로드 완료")
+    except Exception as e:
+        conn.rollback()
+        return api_response(False, message=str(e), status=400)
+    finally:
+        conn.close()
 
 @app.route('/api/licenses/<int:id>/assign', methods=['POST'])
 def assign_license(id):
@@ -1199,95 +1145,204 @@ def assign_license(id):
     conn = get_db()
     today = date.today().isoformat()
     cursor = conn.cursor()
-
-    lic = conn.execute('''
-        SELECT license_number, available_quantity
-        FROM SoftwareLicense
-        WHERE license_id = ? AND is_deleted = 0
-    ''', (id,)).fetchone()
-    if not lic:
-        conn.close()
-        return api_response(False, message="라이선스를 찾을 수 없습니다.", status=404)
-
-    key_total = conn.execute('''
-        SELECT COUNT(*) AS cnt
-        FROM LicenseKey
-        WHERE license_id = ? AND key_status != '폐기'
-    ''', (id,)).fetchone()['cnt']
-    selected_key = None
-    if key_total > 0:
-        selected_key = conn.execute('''
-            SELECT license_key_id, key_value
-            FROM LicenseKey
-            WHERE license_id = ? AND key_status = '가용'
-            ORDER BY license_key_id
-            LIMIT 1
+    try:
+        # 쓰기 잠금을 먼저 잡아 동시 할당이 같은 키/수량을 보지 않도록 직렬화
+        begin_immediate(conn)
+        lic = conn.execute('''
+            SELECT license_number, available_quantity, key_total_count
+            FROM SoftwareLicense
+            WHERE license_id = ? AND is_deleted = 0
         ''', (id,)).fetchone()
-        if not selected_key:
-            conn.close()
-            return api_response(False, message="가용 시리얼키가 없습니다.", status=400)
-    elif lic['available_quantity'] <= 0:
+        if not lic:
+            conn.rollback()
+            return api_response(False, message="라이선스를 찾을 수 없습니다.", status=404)
+
+        selected_key = None
+        if lic['key_total_count'] > 0:
+            claimed = claim_available_keys(conn, id, 1, today)
+            if not claimed:
+                conn.rollback()
+                return api_response(False, message="가용 시리얼키가 없습니다.", status=400)
+            selected_key = claimed[0]
+        elif lic['available_quantity'] <= 0:
+            conn.rollback()
+            return api_response(False, message="가용 수량이 없습니다.", status=400)
+
+        cursor.execute('''
+            INSERT INTO LicenseAssignment (license_id, user_id, asset_id, assigned_date, is_active, assigned_by, notes, license_key_id)
+            VALUES (?, ?, ?, ?, 1, ?, ?, ?)
+        ''', (id, data.get('user_id'), data.get('asset_id'), today, 1, data.get('notes'), selected_key['license_key_id'] if selected_key else None))
+        assignment_id = cursor.lastrowid
+        if selected_key:
+            conn.execute('''
+                UPDATE LicenseKey SET assigned_assignment_id = ? WHERE license_key_id = ?
+            ''', (assignment_id, selected_key['license_key_id']))
+
+        sync_license_quantities(conn, id)
+        log_detail = f"라이선스 할당: user_id={data.get('user_id')}"
+        if selected_key:
+            log_detail += f", key={selected_key['key_value']}"
+        log_history(conn, 'LICENSE', id, 'LICENSE_ASSIGNED', log_detail, None, data, 1)
+        conn.commit()
+        return api_response(message="라이선스 할당 완료")
+    except Exception as e:
+        conn.rollback()
+        return api_response(False, message=str(e), status=400)
+    finally:
         conn.close()
-        return api_response(False, message="가용 수량이 없습니다.", status=400)
 
-    cursor.execute('''
-        INSERT INTO LicenseAssignment (license_id, user_id, asset_id, assigned_date, is_active, assigned_by, notes, license_key_id)
-        VALUES (?, ?, ?, ?, 1, ?, ?, ?)
-    ''', (id, data.get('user_id'), data.get('asset_id'), today, 1, data.get('notes'), selected_key['license_key_id'] if selected_key else None))
-    assignment_id = cursor.lastrowid
-    if selected_key:
-        conn.execute('''
-            UPDATE LicenseKey
-            SET key_status = '할당',
-                assigned_assignment_id = ?,
-                assigned_date = ?,
-                revoked_date = NULL
-            WHERE license_key_id = ?
-        ''', (assignment_id, today, selected_key['license_key_id']))
+@app.route('/api/licenses/<int:id>/assign-bulk', methods=['POST'])
+def assign_license_bulk(id):
+    """Assign one license to many targets in a single transaction.
+
+    Body: {"targets": [{"user_id": .., "asset_id": .., "notes": ..}, ...], "notes": ..}
+    Targets that cannot be assigned are reported in data.failed; the rest are committed.
+    """
+    data = request.json or {}
+    targets = data.get('targets') or []
+    if not isinstance(targets, list) or not targets:
+        return api_response(False, message="할당 대상(targets)을 입력해주세요.", status=400)
+
+    # JSON의 "3"/3.0 등도 DB 정수 id와 같은 값으로 비교되도록 정수로 정규화
+    def to_id(value):
+        if value in (None, ''):
+            return None
+        if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+            raise ValueError(value)
+        return int(value)
+    try:
+        targets = [dict(t, user_id=to_id(t.get('user_id')), asset_id=to_id(t.get('asset_id')))
+                   if isinstance(t, dict) else {} for t in targets]
+    except (TypeError, ValueError):
+        return api_response(False, message="user_id/asset_id는 정수여야 합니다.", status=400)
 
-    sync_license_quantities(conn, id)
-    log_detail = f"라이선스 할당: user_id={data.get('user_id')}"
-    if selected_key:
-        log_detail += f", key={selected_key['key_value']}"
-    log_history(conn, 'LICENSE', id, 'LICENSE_ASSIGNED', log_detail, None, data, 1)
-    conn.commit()
-    conn.close()
-    return api_response(message="라이선스 할당 완료")
+    conn = get_db()
+    today = date.today().isoformat()
+    try:
+        begin_immediate(conn)
+        lic = conn.execute('''
+            SELECT license_number, available_quantity, key_total_count
+            FROM SoftwareLicense
+            WHERE license_id = ? AND is_deleted = 0
+        ''', (id,)).fetchone()
+        if not lic:
+            conn.rollback()
+            return api_response(False, message="라이선스를 찾을 수 없습니다.", status=404)
+
+        # 대상 검증은 집합 단위로 한 번씩 조회
+        def ids_of(field):
+            return json.dumps(list({t.get(field) for t in targets if t.get(field)}))
+        valid_users = {row[0] for row in conn.execute(
+            'SELECT user_id FROM User WHERE user_id IN (SELECT value FROM json_each(?))', (ids_of('user_id'),))}
+        valid_assets = {row[0] for row in conn.execute(
+            'SELECT asset_id FROM Asset WHERE is_deleted = 0 AND asset_id IN (SELECT value FROM json_each(?))', (ids_of('asset_id'),))}
+        already = {row[0] for row in conn.execute(
+            'SELECT user_id FROM LicenseAssignment WHERE license_id = ? AND is_active = 1 AND user_id IS NOT NULL', (id,))}
+
+        failed = []
+        pending = []
+        for index, target in enumerate(targets):
+            user_id, asset_id = target.get('user_id'), target.get('asset_id')
+            reason = None
+            if not user_id and not asset_id:
+                reason = "사용자 또는 자산을 지정해주세요."
+            elif user_id and user_id not in valid_users:
+                reason = "사용자를 찾을 수 없습니다."
+            elif asset_id and asset_id not in valid_assets:
+                reason = "자산을 찾을 수 없습니다."
+            elif user_id and user_id in already:
+                reason = "이미 할당된 사용자입니다."
+            if reason:
+                failed.append({'index': index, 'user_id': user_id, 'asset_id': asset_id, 'reason': reason})
+                continue
+            if user_id:
+                already.add(user_id)
+            pending.append((index, user_id, asset_id, target.get('notes') or data.get('notes')))
+
+        keys = []
+        if lic['key_total_count'] > 0:
+            keys = claim_available_keys(conn, id, len(pending), today)
+            capacity, shortage = len(keys), "가용 시리얼키가 없습니다."
+        else:
+            capacity, shortage = max(lic['available_quantity'] or 0, 0), "가용 수량이 없습니다."
+        for index, user_id, asset_id, _ in pending[capacity:]:
+            failed.append({'index': index, 'user_id': user_id, 'asset_id': asset_id, 'reason': shortage})
+        pending = pending[:capacity]
+
+        assigned = []
+        if pending:
+            last_id = conn.execute('SELECT COALESCE(MAX(assignment_id), 0) FROM LicenseAssignment').fetchone()[0]
+            conn.executemany('''
+                INSERT INTO LicenseAssignment (license_id, user_id, asset_id, assigned_date, is_active, assigned_by, notes, license_key_id)
+                VALUES (?, ?, ?, ?, 1, 1, ?, ?)
+            ''', [(id, user_id, asset_id, today, notes, keys[i]['license_key_id'] if keys else None)
+                  for i, (_, user_id, asset_id, notes) in enumerate(pending)])
+            # 쓰기 잠금 보유 중이므로 last_id 이후 행이 이번 배치
+            new_ids = [row[0] for row in conn.execute('''
+                SELECT assignment_id FROM LicenseAssignment WHERE assignment_id > ? ORDER BY assignment_id
+            ''', (last_id,))]
+            if keys:
+                conn.executemany('''
+                    UPDATE LicenseKey SET assigned_assignment_id = ? WHERE license_key_id = ?
+                ''', [(assignment_id, key['license_key_id']) for assignment_id, key in zip(new_ids, keys)])
+            for i, ((index, user_id, asset_id, _), assignment_id) in enumerate(zip(pending, new_ids)):
+                assigned.append({'index': index, 'user_id': user_id, 'asset_id': asset_id, 'assignment_id': assignment_id,
+                                 'key_value': keys[i]['key_value'] if keys else None})
+
+            sync_license_quantities(conn, id)
+            log_history(conn, 'LICENSE', id, 'LICENSE_BULK_ASSIGNED',
+                        f"라이선스 일괄 할당: {len(assigned)}건 (실패 {len(failed)}건)", None,
+                        {'targets': [[a['user_id'], a['asset_id'], a['key_value']] for a in assigned]}, 1)
+        conn.commit()
+        failed.sort(key=lambda f: f['index'])
+        return api_response(data={'assigned': assigned, 'failed': failed},
+                            message=f"일괄 할당 완료: {len(assigned)}건 성공, {len(failed)}건 실패")
+    except Exception as e:
+        conn.rollback()
+        return api_response(False, message=str(e), status=400)
+    finally:
+        conn.close()
 
 @app.route('/api/licenses/<int:id>/revoke', methods=['POST'])
 def revoke_license(id):
     data = request.json
     conn = get_db()
     today = date.today().isoformat()
-    assignment = conn.execute('''
-        SELECT assignment_id, license_key_id
-        FROM LicenseAssignment
-        WHERE assignment_id = ? AND license_id = ? AND is_active = 1
-    ''', (data['assignment_id'], id)).fetchone()
-    if not assignment:
-        conn.close()
-        return api_response(False, message="활성 할당 정보를 찾을 수 없습니다.", status=404)
-
-    conn.execute('''
-        UPDATE LicenseAssignment
-        SET is_active = 0, revoked_date = ?
-        WHERE assignment_id = ?
-    ''', (today, data['assignment_id']))
+    try:
+        begin_immediate(conn)
+        assignment = conn.execute('''
+            SELECT assignment_id, license_key_id
+            FROM LicenseAssignment
+            WHERE assignment_id = ? AND license_id = ? AND is_active = 1
+        ''', (data['assignment_id'], id)).fetchone()
+        if not assignment:
+            conn.rollback()
+            return api_response(False, message="활성 할당 정보를 찾을 수 없습니다.", status=404)
 
-    if assignment['license_key_id']:
         conn.execute('''
-            UPDATE LicenseKey
-            SET key_status = '가용',
-                assigned_assignment_id = NULL,
-                revoked_date = ?
-            WHERE license_key_id = ?
-        ''', (today, assignment['license_key_id']))
+            UPDATE LicenseAssignment
+            SET is_active = 0, revoked_date = ?
+            WHERE assignment_id = ?
+        ''', (today, data['assignment_id']))
 
-    sync_license_quantities(conn, id)
-    log_history(conn, 'LICENSE', id, 'LICENSE_REVOKED', f"라이선스 회수: assignment_id={data['assignment_id']}", None, data, 1)
-    conn.commit()
-    conn.close()
-    return api_response(message="라이선스 회수 완료")
+        if assignment['license_key_id']:
+            conn.execute('''
+                UPDATE LicenseKey
+                SET key_status = '가용',
+                    assigned_assignment_id = NULL,
+                    revoked_date = ?
+                WHERE license_key_id = ?
+            ''', (today, assignment['license_key_id']))
+
+        sync_license_quantities(conn, id)
+        log_history(conn, 'LICENSE', id, 'LICENSE_REVOKED', f"라이선스 회수: assignment_id={data['assignment_id']}", None, data, 1)
+        conn.commit()
+        return api_response(message="라이선스 회수 완료")
+    except Exception as e:
+        conn.rollback()
+        return api_response(False, message=str(e), status=400)
+    finally:
+        conn.close()
 
 # ========================================
 # Inventory API (실사)
@@ -1487,29 +1542,111 @@ def update_config(key):
     conn.close()
     return api_response(message="설정 수정 완료")
 
+# ========================================
+# System API
+# ========================================
+@app.route('/api/system/db-pool', methods=['GET'])
+def get_db_pool_stats():
+    return api_response(data=database.pool_stats())
+
+@app.route('/api/system/recompute-licenses', methods=['POST'])
+def recompute_licenses():
+    """전체 라이선스 수량/컴플라이언스/카운터 재계산 (집합 단위)"""
+    conn = get_db()
+    try:
+        begin_immediate(conn)
+        started = time.monotonic()
+        updated = recompute_license_quantities(conn)
+        conn.commit()
+        return api_response(data={'updated': updated, 'elapsed_ms': int((time.monotonic() - started) * 1000)},
+                            message=f"라이선스 재계산 완료: {updated}건 갱신")
+    except Exception as e:
+        conn.rollback()
+        return api_response(False, message=str(e), status=500)
+    finally:
+        conn.close()
+
+@app.route('/api/system/scheduler', methods=['GET'])
+def get_scheduler_status():
+    conn = get_db()
+    try:
+        return api_response(data=scheduler_status(conn))
+    finally:
+        conn.close()
+
+@app.route('/api/system/scheduler/<job_name>/run', methods=['POST'])
+def run_scheduled_job(job_name):
+    """작업을 즉시 실행 대상으로 표시 (실행은 스케줄러 스레드가 담당, 요청은 바로 반환)"""
+    conn = get_db()
+    try:
+        if not request_run(conn, job_name):
+            return api_response(False, message="스케줄러 작업을 찾을 수 없습니다", status=404)
+        return api_response(data=scheduler_status(conn), message=f"{job_name} 실행 예약 완료", status=202)
+    finally:
+        conn.close()
+
 # ========================================
 # Import/Export API
 # ========================================
-@app.route('/api/assets/import', methods=['POST'])
-def import_assets():
-    from import_handler import import_hw_assets
+def spool_upload(file):
+    """Copy an upload into a SpooledTemporaryFile (memory up to UPLOAD_SPOOL_MAX_BYTES, then disk)."""
+    spooled = tempfile.SpooledTemporaryFile(max_size=settings.UPLOAD_SPOOL_MAX_BYTES)
+    shutil.copyfileobj(file.stream, spooled)
+    spooled.seek(0)
+    return spooled
+
+def run_import_request(job_type):
+    """Queue the uploaded file (xlsx/csv/ndjson) as a background job (202); wait=1 imports inline.
+
+    mode=merge updates existing rows by asset_number/license_number instead of rejecting them.
+    """
+    from import_handler import IMPORT_MODES, detect_format, import_summary
+    from import_jobs import IMPORTERS, submit_import
     if 'file' not in request.files:
         return api_response(False, message="파일이 없습니다", status=400)
     file = request.files['file']
+    mode = request.values.get('mode') or 'insert'
+    if mode not in IMPORT_MODES:
+        return api_response(False, message=f"지원하지 않는 Import 모드: {mode}", status=400)
     try:
-        results = import_hw_assets(file.read())
-        return api_response(data=results, message=f"Import 완료: 성공 {results['success']}건, 실패 {len(results['errors'])}건")
+        if request.args.get('wait') == '1':
+            with spool_upload(file) as spooled:
+                results = IMPORTERS[job_type](spooled, mode=mode, file_format=detect_format(file.filename))
+            return api_response(data=results, message=import_summary(results))
+        job_id = submit_import(job_type, file.stream, file.filename, mode=mode)
+        return api_response(data={'job_id': job_id, 'status': '대기', 'mode': mode, 'status_url': f'/api/import-jobs/{job_id}'},
+                            message="Import 작업이 등록되었습니다", status=202)
     except Exception as e:
         return api_response(False, message=str(e), status=500)
 
+@app.route('/api/import-jobs/<int:job_id>', methods=['GET'])
+def get_import_job(job_id):
+    from import_jobs import get_job
+    conn = get_db()
+    try:
+        job = get_job(conn, job_id)
+    finally:
+        conn.close()
+    if not job:
+        return api_response(False, message="Import 작업을 찾을 수 없습니다", status=404)
+    return api_response(data=job)
+
+@app.route('/api/assets/import', methods=['POST'])
+def import_assets():
+    return run_import_request('asset')
+
 @app.route('/api/assets/export', methods=['GET'])
 def export_assets():
-    from import_handler import export_assets as do_export
-    from io import BytesIO
+    from export_cache import cached_export
+    from import_handler import parse_export_columns
     try:
-        content = do_export()
-        return send_file(BytesIO(content), mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                         as_attachment=True, download_name=f'assets_export_{date.today().isoformat()}.xlsx')
+        output, etag = cached_export('asset', request.args, parse_export_columns(request.args.get('columns')))
+        # 데이터 버전이 같으면 캐시 파일을 그대로 전송 (열린 파일은 응답 종료 시 닫힘, 캐시 정리와 무관)
+        return send_file(output, mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                         as_attachment=True, download_name=f'assets_export_{date.today().isoformat()}.xlsx',
+                         etag=etag or False)
+    except ValueError as e:
+        return api_response(False, message=str(e), status=400)
     except Exception as e:
         return api_response(False, message=str(e), status=500)
 
@@ -1523,24 +1660,20 @@ def get_asset_template(type):
 
 @app.route('/api/licenses/import', methods=['POST'])
 def import_licenses_api():
-    from import_handler import import_licenses
-    if 'file' not in request.files:
-        return api_response(False, message="파일이 없습니다", status=400)
-    file = request.files['file']
-    try:
-        results = import_licenses(file.read())
-        return api_response(data=results, message=f"Import 완료: 성공 {results['success']}건, 실패 {len(results['errors'])}건")
-    except Exception as e:
-        return api_response(False, message=str(e), status=500)
+    return run_import_request('license')
 
 @app.route('/api/licenses/export', methods=['GET'])
 def export_licenses():
-    from import_handler import export_licenses as do_export
-    from io import BytesIO
+    from export_cache import cached_export
+    from import_handler import parse_export_columns
     try:
-        content = do_export()
-        return send_file(BytesIO(content), mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                         as_attachment=True, download_name=f'licenses_export_{date.today().isoformat()}.xlsx')
+        output, etag = cached_export('license', request.args, parse_export_columns(request.args.get('columns')))
+        # 데이터 버전이 같으면 캐시 파일을 그대로 전송 (열린 파일은 응답 종료 시 닫힘, 캐시 정리와 무관)
+        return send_file(output, mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                         as_attachment=True, download_name=f'licenses_export_{date.today().isoformat()}.xlsx',
+                         etag=etag or False)
+    except ValueError as e:
+        return api_response(False, message=str(e), status=400)
     except Exception as e:
         return api_response(False, message=str(e), status=500)
 
@@ -1556,9 +1689,12 @@ def get_license_template():
 def generate_notifications():
     from notification_checker import run_all_checks
     try:
-        results = run_all_checks()
+        timings = {}
+        # full=1: 변경 추적과 무관하게 전체 자산/라이선스 재평가
+        results = run_all_checks(timings, full=request.args.get('full') == '1')
         total = sum(results.values())
-        return api_response(data=results, message=f"알림 생성 완료: 총 {total}건")
+        return api_response(data=dict(results, timings_ms=timings),
+                            message=f"알림 생성 완료: 총 {total}건 ({sum(timings.values()):.0f}ms)")
     except Exception as e:
         return api_response(False, message=str(e), status=500)
 
@@ -1570,12 +1706,8 @@ def index():
     return render_template('index.html')
 
 if __name__ == '__main__':
-    # 서버 시작 시 알림 체크 실행
-    try:
-        from notification_checker import run_all_checks
-        print("🔔 Checking notifications on startup...")
-        run_all_checks()
-    except Exception as e:
-        print(f"⚠️ Notification check failed: {e}")
-    
+    # 시작 시 알림 체크는 스케줄러가 수행 (interval 일정은 기동 직후 첫 실행)
+    # debug 리로더의 감시(부모) 프로세스는 요청을 처리하지 않으므로 실제 서버 프로세스에서만 기동
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_services()
     app.run(debug=True, port=5000)
@@ -0,0 +1,106 @@
+"""
+ITAM - Asset Search
+자산 목록 필터 및 FTS5(trigram) 키워드 검색
+"""
+import sqlite3
+
+# AssetSearch 인덱스 컬럼과 bm25 가중치 (자산번호/시리얼/자산명 우선)
+SEARCH_COLUMNS = [
+    ('asset_number', 10.0),
+    ('asset_name', 5.0),
+    ('serial_number', 8.0),
+    ('hostname', 3.0),
+    ('ip_address', 3.0),
+    ('mac_address', 3.0),
+    ('model_name', 2.0),
+    ('install_location', 1.0),
+]
+RANK_EXPR = 'bm25(AssetSearch, {})'.format(', '.join(str(w) for _, w in SEARCH_COLUMNS))
+MIN_FTS_KEYWORD = 3  # trigram 토크나이저는 3글자 미만을 매칭하지 못함
+
+_index_available = None
+
+def search_index_available(conn):
+    global _index_available
+    if _index_available is None:
+        _index_available = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='AssetSearch'"
+        ).fetchone() is not None
+    return _index_available
+
+def match_expression(keyword):
+    """Quote keyword as one FTS5 phrase; trigram phrases behave like LIKE '%kw%'."""
+    keyword = (keyword or '').strip()
+    if len(keyword) < MIN_FTS_KEYWORD:
+        return None
+    return '"' + keyword.replace('"', '""') + '"'
+
+def build_asset_filters(conn, args):
+    """Translate asset list filters into (where, params, match) on Asset a.
+
+    When match is not None the caller must join AssetSearch and bind it
+    with "AssetSearch MATCH ?" (see asset_search_source).
+    """
+    where = ['a.is_deleted = 0']
+    params = []
+    match = None
+    if args.get('location_id'):
+        where.append('a.location_id = ?')
+        params.append(args.get('location_id'))
+    if args.get('category_id'):
+        where.append('a.category_id = ?')
+        params.append(args.get('category_id'))
+    if args.get('status'):
+        where.append('a.asset_status = ?')
+        params.append(args.get('status'))
+    keyword = args.get('keyword')
+    if keyword:
+        match = match_expression(keyword) if search_index_available(conn) else None
+        if match is None:
+            # FTS 인덱스와 같은 컬럼 범위로 검색 (짧은 키워드/인덱스 없음 모두 결과가 일관되도록)
+            where.append('(' + ' OR '.join(f'a.{name} LIKE ?' for name, _ in SEARCH_COLUMNS) + ')')
+            params.extend([f'%{keyword}%'] * len(SEARCH_COLUMNS))
+    return ' AND '.join(where), params, match
+
+def asset_search_source(where, params, match):
+    """FROM/WHERE for Asset a, joined to the FTS index when searching."""
+    if match is None:
+        return 'FROM Asset a', where, list(params)
+    # CROSS JOIN으로 FTS 결과를 바깥 루프에 고정 (Asset 전체 스캔 후 행마다 MATCH 방지)
+    return ('FROM AssetSearch CROSS JOIN Asset a ON a.asset_id = AssetSearch.rowid',
+            f'AssetSearch MATCH ? AND {where}', [match] + list(params))
+
+def create_search_index(conn):
+    columns = ', '.join(name for name, _ in SEARCH_COLUMNS)
+    new_values = ', '.join(f'new.{name}' for name, _ in SEARCH_COLUMNS)
+    old_values = ', '.join(f'old.{name}' for name, _ in SEARCH_COLUMNS)
+    conn.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS AssetSearch USING fts5(
+            {columns}, content='Asset', content_rowid='asset_id', tokenize='trigram'
+        )
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_asset_search_ai AFTER INSERT ON Asset BEGIN
+            INSERT INTO AssetSearch (rowid, {columns}) VALUES (new.asset_id, {new_values});
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_asset_search_ad AFTER DELETE ON Asset BEGIN
+            INSERT INTO AssetSearch (AssetSearch, rowid, {columns}) VALUES ('delete', old.asset_id, {old_values});
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_asset_search_au AFTER UPDATE OF {columns} ON Asset BEGIN
+            INSERT INTO AssetSearch (AssetSearch, rowid, {columns}) VALUES ('delete', old.asset_id, {old_values});
+            INSERT INTO AssetSearch (rowid, {columns}) VALUES (new.asset_id, {new_values});
+        END
+    ''')
+    conn.execute("INSERT INTO AssetSearch (AssetSearch) VALUES ('rebuild')")
+
+def fts5_trigram_supported(conn):
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x, tokenize='trigram')")
+        conn.execute("DROP TABLE temp.fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
@@ -0,0 +1,113 @@
+"""
+ITAM - Import Memory Benchmark
+행 수를 늘려가며 HW 자산 Import의 최대 RSS/소요시간 측정
+
+    python benchmarks/import_memory.py                      # 기본: 1000 10000 50000 행
+    python benchmarks/import_memory.py --rows 10000 100000 --compare
+
+각 측정은 새 프로세스에서 임시 DB(init_db 샘플 데이터)로 실행되며,
+--compare 시 기존 방식(bytes 전체 + 일반 모드 load_workbook) 파싱만의 RSS도 함께 출력한다.
+SQLite 페이지 캐시/mmap은 DB 크기에 따라 RSS를 키우므로 Import 자체의 메모리만 보도록
+작게 고정한다 (ITAM_DB_CACHE_SIZE_KB, ITAM_DB_MMAP_SIZE로 덮어쓸 수 있음).
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def _peak_rss_mb():
+    # Linux: KiB, macOS: bytes
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def build_workbook(path, rows, db_path):
+    """write_only 모드로 Import용 워크북 생성 (생성 측 메모리도 행 수와 무관)."""
+    import sqlite3
+    from openpyxl import Workbook
+
+    conn = sqlite3.connect(db_path)
+    location = conn.execute('SELECT location_name FROM Location WHERE is_active = 1 ORDER BY location_id LIMIT 1').fetchone()[0]
+    category = conn.execute("SELECT category_name FROM AssetCategory WHERE asset_type = 'HW' AND is_active = 1 ORDER BY category_id LIMIT 1").fetchone()[0]
+    employee_no = conn.execute('SELECT employee_no FROM User ORDER BY user_id LIMIT 1').fetchone()[0]
+    conn.close()
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(['asset_number', 'asset_name', 'category_name', 'asset_status', 'location_name',
+               'manufacturer', 'model_name', 'serial_number', 'purchase_date', 'manager_employee_no', 'employee_no'])
+    for n in range(rows):
+        ws.append([None, f'벤치마크 자산 {n}', category, '사용중', location,
+                   'Lenovo', 'ThinkPad T14s', f'BENCH{n:08d}', '2024-03-15', employee_no, employee_no])
+    wb.save(path)
+
+def run_child(mode, xlsx_path, chunk_size):
+    started = time.monotonic()
+    if mode == 'import':
+        from import_handler import import_hw_assets
+        results = import_hw_assets(xlsx_path, chunk_size=chunk_size)
+        summary = {'success': results['success'], 'errors': len(results['errors'])}
+    else:
+        # 기존 방식: 업로드 bytes 전체 + 일반 모드 워크북 (파싱만)
+        from io import BytesIO
+        from openpyxl import load_workbook
+        with open(xlsx_path, 'rb') as f:
+            wb = load_workbook(filename=BytesIO(f.read()))
+        summary = {'rows': wb.active.max_row - 1}
+    summary.update({'seconds': round(time.monotonic() - started, 2), 'peak_rss_mb': round(_peak_rss_mb(), 1)})
+    print(json.dumps(summary))
+    return 0
+
+def measure(mode, xlsx_path, db_path, chunk_size):
+    env = dict({'ITAM_DB_CACHE_SIZE_KB': '2048', 'ITAM_DB_MMAP_SIZE': '0'}, **os.environ)
+    env['ITAM_DB_PATH'] = db_path
+    cmd = [sys.executable, os.path.abspath(__file__), '--child', mode, xlsx_path]
+    if chunk_size:
+        cmd += ['--chunk-size', str(chunk_size)]
+    out = subprocess.run(cmd, env=env, cwd=ROOT, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='HW 자산 Import 메모리 벤치마크')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--chunk-size', type=int, default=None, help='기본값: settings.IMPORT_CHUNK_SIZE')
+    parser.add_argument('--compare', action='store_true', help='기존 일반 모드 파싱 RSS도 측정')
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'XLSX'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        return run_child(args.child[0], args.child[1], args.chunk_size)
+
+    workdir = tempfile.mkdtemp(prefix='itam_bench_')
+    try:
+        template_db = os.path.join(workdir, 'template.db')
+        subprocess.run([sys.executable, 'init_db.py'], env=dict(os.environ, ITAM_DB_PATH=template_db),
+                       cwd=ROOT, check=True, capture_output=True)
+
+        print(f"{'rows':>8} | {'import s':>8} | {'import RSS MB':>13}" + (f" | {'legacy parse RSS MB':>19}" if args.compare else ''))
+        for rows in args.rows:
+            xlsx_path = os.path.join(workdir, f'assets_{rows}.xlsx')
+            build_workbook(xlsx_path, rows, template_db)
+
+            db_path = os.path.join(workdir, f'bench_{rows}.db')
+            shutil.copyfile(template_db, db_path)
+            result = measure('import', xlsx_path, db_path, args.chunk_size)
+            line = f"{rows:>8} | {result['seconds']:>8} | {result['peak_rss_mb']:>13}"
+            if args.compare:
+                legacy = measure('legacy', xlsx_path, db_path, None)
+                line += f" | {legacy['peak_rss_mb']:>19}"
+            print(line)
+            os.remove(xlsx_path)
+        return 0
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == '__main__':
+    sys.exit(main())
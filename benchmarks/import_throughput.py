@@ -0,0 +1,103 @@
+"""
+ITAM - Import Throughput Benchmark
+같은 HW 자산 데이터를 xlsx / CSV / NDJSON으로 만들어 Import 처리량(rows/sec) 비교
+
+    python benchmarks/import_throughput.py                 # 기본: 20000 행
+    python benchmarks/import_throughput.py --rows 100000 --formats csv ndjson
+
+각 형식은 새 프로세스에서 임시 DB(init_db 샘플 데이터) 복사본으로 측정한다.
+"""
+import argparse
+import csv
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+HEADERS = ['asset_number', 'asset_name', 'category_name', 'asset_status', 'location_name',
+           'manufacturer', 'model_name', 'serial_number', 'purchase_date', 'purchase_cost',
+           'manager_employee_no', 'employee_no']
+EXTENSIONS = {'xlsx': '.xlsx', 'csv': '.csv', 'ndjson': '.ndjson'}
+
+def sample_rows(db_path, rows):
+    conn = sqlite3.connect(db_path)
+    location = conn.execute('SELECT location_name FROM Location WHERE is_active = 1 ORDER BY location_id LIMIT 1').fetchone()[0]
+    category = conn.execute("SELECT category_name FROM AssetCategory WHERE asset_type = 'HW' AND is_active = 1 ORDER BY category_id LIMIT 1").fetchone()[0]
+    employee_no = conn.execute('SELECT employee_no FROM User ORDER BY user_id LIMIT 1').fetchone()[0]
+    conn.close()
+    for n in range(rows):
+        yield [None, f'벤치마크 자산 {n}', category, '사용중', location,
+               'Lenovo', 'ThinkPad T14s', f'BENCH{n:08d}', '2024-03-15', 1500000, employee_no, employee_no]
+
+def write_file(path, file_format, rows):
+    if file_format == 'xlsx':
+        from openpyxl import Workbook
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet()
+        ws.append(HEADERS)
+        for row in rows:
+            ws.append(row)
+        wb.save(path)
+    elif file_format == 'csv':
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(HEADERS)
+            writer.writerows(['' if v is None else v for v in row] for row in rows)
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            for row in rows:
+                f.write(json.dumps(dict(zip(HEADERS, row)), ensure_ascii=False) + '\n')
+
+def run_child(path, file_format):
+    from import_handler import import_hw_assets
+    started = time.monotonic()
+    results = import_hw_assets(path, file_format=file_format)
+    print(json.dumps({'seconds': time.monotonic() - started, 'success': results['success'],
+                      'errors': len(results['errors'])}))
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='HW 자산 Import 형식별 처리량 벤치마크')
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--formats', nargs='+', choices=list(EXTENSIONS), default=list(EXTENSIONS))
+    parser.add_argument('--child', nargs=2, metavar=('FORMAT', 'PATH'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        return run_child(args.child[1], args.child[0])
+
+    workdir = tempfile.mkdtemp(prefix='itam_bench_')
+    try:
+        template_db = os.path.join(workdir, 'template.db')
+        subprocess.run([sys.executable, 'init_db.py'], env=dict(os.environ, ITAM_DB_PATH=template_db),
+                       cwd=ROOT, check=True, capture_output=True)
+
+        print(f"{'format':>8} | {'rows':>8} | {'seconds':>8} | {'rows/sec':>9} | {'file MB':>7}")
+        for file_format in args.formats:
+            path = os.path.join(workdir, f'assets{EXTENSIONS[file_format]}')
+            write_file(path, file_format, sample_rows(template_db, args.rows))
+            db_path = os.path.join(workdir, f'bench_{file_format}.db')
+            shutil.copyfile(template_db, db_path)
+
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', file_format, path],
+                                 env=dict(os.environ, ITAM_DB_PATH=db_path), cwd=ROOT,
+                                 check=True, capture_output=True, text=True).stdout
+            result = json.loads(out.strip().splitlines()[-1])
+            if result['success'] != args.rows:
+                print(f"⚠️ {file_format}: 성공 {result['success']}건, 실패 {result['errors']}건")
+            print(f"{file_format:>8} | {args.rows:>8} | {result['seconds']:>8.2f} | "
+                  f"{args.rows / result['seconds']:>9.0f} | {os.path.getsize(path) / 1048576:>7.1f}")
+            os.remove(path)
+        return 0
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == '__main__':
+    sys.exit(main())
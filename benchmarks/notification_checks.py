@@ -0,0 +1,101 @@
+"""
+ITAM - Notification Check Benchmark
+자산 수를 늘려가며 알림 체크의 전체 평가(full)와 다음 날 증분 평가 소요시간 비교
+
+    python benchmarks/notification_checks.py                # 기본: 500000 자산, 변경 1000건
+    python benchmarks/notification_checks.py --assets 100000 --touched 5000
+
+임시 DB(init_db 샘플 데이터)에 자산을 생성하고 첫 실행(전체 평가)으로 기준점을 만든 뒤,
+일부 자산의 알림 조건 컬럼을 바꾸고 다음 날 기준으로 증분/전체 평가를 각각 새 DB 복사본에서 측정한다.
+(알림 중복 방지 키는 실제 날짜 기준이라 created는 첫 실행과 겹치지 않는 건수만 센다)
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def seed(db_path, assets):
+    import sqlite3
+    conn = sqlite3.connect(db_path)
+    eos_count = conn.execute('SELECT COUNT(*) FROM EOSInfo').fetchone()[0]
+    conn.execute("UPDATE EOSInfo SET eos_date = DATE('now', '-' || (eos_id * 40) || ' days')")
+    # 보증/사용연한 만료일을 약 5년에 걸쳐 분산
+    conn.execute(f'''
+        INSERT INTO Asset (asset_number, asset_name, category_id, asset_status, location_id, asset_manager_id,
+                           created_by, updated_by, warranty_end, useful_life_expire_date, eos_id)
+        WITH RECURSIVE r(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM r WHERE i < {assets})
+        SELECT 'BENCH-' || i, '벤치마크 자산 ' || i, 1, '사용중', 1, 1, 1, 1,
+               DATE('now', '+' || (i % 900) || ' days'), DATE('now', '-' || (i % 900) || ' days', '+450 days'),
+               CASE WHEN i % 3 = 0 THEN 1 + i % {eos_count} END
+        FROM r
+    ''')
+    conn.commit()
+    conn.close()
+
+def touch(db_path, touched):
+    import sqlite3
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+        UPDATE Asset SET useful_life_expire_date = DATE('now', '-3 days')
+        WHERE asset_id IN (SELECT asset_id FROM Asset ORDER BY asset_id DESC LIMIT ?)
+    ''', (touched,))
+    conn.commit()
+    conn.close()
+
+def run_child(mode):
+    from notification_checker import run_all_checks
+    today = date.today() + timedelta(days=1 if mode != 'baseline' else 0)
+    timings = {}
+    started = time.monotonic()
+    results = run_all_checks(timings, full=(mode == 'full'), today=today)
+    print(json.dumps({'seconds': round(time.monotonic() - started, 2), 'created': sum(results.values()),
+                      'timings': timings}))
+    return 0
+
+def measure(mode, db_path):
+    env = dict(os.environ, ITAM_DB_PATH=db_path, ITAM_SCHEDULER_ENABLED='0')
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', mode], env=env, cwd=ROOT,
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='알림 체크 전체/증분 평가 벤치마크')
+    parser.add_argument('--assets', type=int, default=500000)
+    parser.add_argument('--touched', type=int, default=1000, help='다음 날 실행 전 조건 컬럼을 바꿀 자산 수')
+    parser.add_argument('--child', choices=['baseline', 'incremental', 'full'], help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        return run_child(args.child)
+
+    workdir = tempfile.mkdtemp(prefix='itam_bench_')
+    try:
+        db_path = os.path.join(workdir, 'bench.db')
+        subprocess.run([sys.executable, 'init_db.py'], env=dict(os.environ, ITAM_DB_PATH=db_path),
+                       cwd=ROOT, check=True, capture_output=True)
+        seed(db_path, args.assets)
+
+        baseline = measure('baseline', db_path)
+        touch(db_path, args.touched)
+        print(f"{'mode':>12} | {'assets':>8} | {'seconds':>8} | {'created':>8}")
+        print(f"{'first run':>12} | {args.assets:>8} | {baseline['seconds']:>8} | {baseline['created']:>8}")
+        for mode in ('incremental', 'full'):
+            copy_path = os.path.join(workdir, f'{mode}.db')
+            shutil.copyfile(db_path, copy_path)
+            result = measure(mode, copy_path)
+            print(f"{mode:>12} | {args.assets:>8} | {result['seconds']:>8} | {result['created']:>8}")
+            print(' ' * 15 + ', '.join(f'{name} {ms}ms' for name, ms in result['timings'].items()))
+        return 0
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+ITAM - Database Connection Manager
+공용 SQLite 커넥션 풀 (WAL 모드)
+"""
+import os
+import queue
+import sqlite3
+import threading
+import time
+import weakref
+
+import settings
+
+class PooledConnection(sqlite3.Connection):
+    """close() 호출 시 실제로 닫지 않고 풀에 반납하는 커넥션"""
+    _pool = None
+
+    def close(self):
+        pool = self._pool
+        if pool is None:
+            super().close()
+            return
+        pool.release(self)
+
+    def _close_physical(self):
+        self._pool = None
+        super().close()
+
+class ConnectionPool:
+    """최대 size개의 커넥션을 재사용하는 스레드 안전 풀"""
+
+    def __init__(self, db_path, size=None, timeout=None):
+        self.db_path = db_path
+        self.size = size or settings.DB_POOL_SIZE
+        self.timeout = timeout or settings.DB_POOL_TIMEOUT
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        # LIFO: 최근에 쓴 커넥션(페이지 캐시가 따뜻한 것)을 먼저 재사용
+        self._idle = queue.LifoQueue()
+        self._in_use = weakref.WeakSet()
+        self._opening = 0
+        self._pid = os.getpid()
+        self._stats = {'hits': 0, 'misses': 0, 'waits': 0, 'timeouts': 0,
+                       'wait_ms_total': 0.0, 'wait_ms_max': 0.0}
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=settings.DB_BUSY_TIMEOUT_MS / 1000,
+                               check_same_thread=False, cached_statements=256,
+                               factory=PooledConnection)
+        conn.execute(f"PRAGMA journal_mode = {settings.DB_JOURNAL_MODE}")
+        conn.execute(f"PRAGMA synchronous = {settings.DB_SYNCHRONOUS}")
+        conn.execute(f"PRAGMA cache_size = -{int(settings.DB_CACHE_SIZE_KB)}")
+        conn.execute(f"PRAGMA mmap_size = {int(settings.DB_MMAP_SIZE)}")
+        conn.execute(f"PRAGMA busy_timeout = {int(settings.DB_BUSY_TIMEOUT_MS)}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn._pool = self
+        return conn
+
+    def acquire(self):
+        # fork된 워커(gunicorn --preload 등)는 부모 커넥션을 공유하면 안 됨
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._reset()
+
+        conn = None
+        create = False
+        with self._lock:
+            try:
+                conn = self._idle.get_nowait()
+                self._stats['hits'] += 1
+            except queue.Empty:
+                if self._idle.qsize() + len(self._in_use) + self._opening < self.size:
+                    create = True
+                    self._opening += 1
+                    self._stats['misses'] += 1
+
+        if conn is None and create:
+            try:
+                conn = self._connect()
+            finally:
+                with self._lock:
+                    self._opening -= 1
+                    if conn is not None:
+                        self._in_use.add(conn)
+        elif conn is None:
+            started = time.monotonic()
+            try:
+                conn = self._idle.get(timeout=self.timeout)
+            except queue.Empty:
+                with self._lock:
+                    self._stats['timeouts'] += 1
+                raise sqlite3.OperationalError(
+                    f"connection pool exhausted ({self.size} connections, waited {self.timeout}s)")
+            waited_ms = (time.monotonic() - started) * 1000
+            with self._lock:
+                self._stats['waits'] += 1
+                self._stats['wait_ms_total'] += waited_ms
+                self._stats['wait_ms_max'] = max(self._stats['wait_ms_max'], waited_ms)
+
+        conn.row_factory = sqlite3.Row
+        if not create:
+            with self._lock:
+                self._in_use.add(conn)
+        return conn
+
+    def release(self, conn):
+        with self._lock:
+            if conn not in self._in_use:
+                # 중복 close() 또는 fork 이전 커넥션
+                if conn._pool is not self:
+                    conn._close_physical()
+                return
+            self._in_use.discard(conn)
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn._close_physical()
+            return
+        self._idle.put(conn)
+
+    def close_all(self):
+        with self._lock:
+            while True:
+                try:
+                    self._idle.get_nowait()._close_physical()
+                except queue.Empty:
+                    break
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['idle'] = self._idle.qsize()
+            stats['in_use'] = len(self._in_use)
+        stats['size'] = self.size
+        stats['db_path'] = self.db_path
+        acquired = stats['hits'] + stats['misses'] + stats['waits']
+        stats['hit_ratio'] = round(stats['hits'] / acquired, 4) if acquired else None
+        stats['wait_ms_avg'] = round(stats['wait_ms_total'] / stats['waits'], 3) if stats['waits'] else 0.0
+        stats['wait_ms_total'] = round(stats['wait_ms_total'], 3)
+        stats['wait_ms_max'] = round(stats['wait_ms_max'], 3)
+        return stats
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(db_path=None):
+    db_path = db_path or settings.DB_PATH
+    key = os.path.abspath(db_path)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = ConnectionPool(db_path)
+                _pools[key] = pool
+    return pool
+
+def get_db(db_path=None):
+    """풀에서 커넥션을 빌려온다. 사용 후 conn.close()로 반납."""
+    return get_pool(db_path).acquire()
+
+def begin_immediate(conn):
+    """쓰기 잠금을 먼저 잡고 트랜잭션 시작 (read→write 승격 시 SQLITE_BUSY 방지).
+
+    이미 열린 트랜잭션이 있으면 호출자의 미완료 변경을 임의로 커밋하지 않고 오류를 낸다.
+    """
+    if conn.in_transaction:
+        raise sqlite3.ProgrammingError("begin_immediate: 이미 트랜잭션이 열려 있습니다 (commit/rollback 후 호출)")
+    conn.execute('BEGIN IMMEDIATE')
+
+def pool_stats():
+    return [pool.stats() for pool in list(_pools.values())]
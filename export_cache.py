@@ -0,0 +1,169 @@
+"""
+ITAM - Export Cache
+데이터 버전(DataVersion) 기준 Export 파일 캐시
+"""
+import glob
+import hashlib
+import json
+import os
+import tempfile
+
+import settings
+from database import begin_immediate, get_db
+from import_handler import (ASSET_EXPORT_FILTERS, LICENSE_EXPORT_FILTERS, export_assets, export_licenses)
+
+# scope -> Export 결과에 영향을 주는 테이블 (이 테이블이 바뀌면 해당 scope 버전 증가)
+DATA_VERSION_SOURCES = {
+    'asset': ('Asset', 'AssetCategory', 'Location', 'User'),
+    'license': ('SoftwareLicense', 'AssetCategory', 'User', 'Vendor'),
+}
+
+# dirty 정리 직후 다른 쓰기가 끼어들어 깨끗한 스냅샷을 못 잡을 때 재시도 횟수 (초과 시 캐시 없이 임시 파일로 생성)
+SETTLE_ATTEMPTS = 3
+
+# scope -> (Export 함수, 캐시 키에 들어가는 필터)
+EXPORTERS = {
+    'asset': (export_assets, ASSET_EXPORT_FILTERS),
+    'license': (export_licenses, LICENSE_EXPORT_FILTERS),
+}
+
+def create_data_version_table(conn):
+    """DataVersion 테이블과 원본 테이블 쓰기 트리거.
+
+    트리거는 version을 행마다 올리지 않고 dirty 표시만 한다 (이미 표시돼 있으면 쓰지 않으므로
+    트랜잭션/문장당 실제 쓰기는 한 번). 표시된 변경은 Export 시점에 settle_data_version이 version 1 증가로 합친다.
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS DataVersion (
+            scope VARCHAR(20) PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0,
+            dirty INTEGER NOT NULL DEFAULT 0,
+            updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.executemany('INSERT OR IGNORE INTO DataVersion (scope) VALUES (?)',
+                     [(scope,) for scope in DATA_VERSION_SOURCES])
+
+    tables = {}
+    for scope, sources in DATA_VERSION_SOURCES.items():
+        for table in sources:
+            tables.setdefault(table, []).append(scope)
+    for table, scopes in tables.items():
+        scope_list = ', '.join(f"'{scope}'" for scope in scopes)
+        mark = (f"UPDATE DataVersion SET dirty = 1, updated_at = CURRENT_TIMESTAMP "
+                f"WHERE scope IN ({scope_list}) AND dirty = 0;")
+        for suffix, event in (('ai', 'INSERT'), ('au', 'UPDATE'), ('ad', 'DELETE')):
+            conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_data_version_{table.lower()}_{suffix}
+                AFTER {event} ON {table} BEGIN {mark} END
+            ''')
+
+def data_version(conn, scope):
+    """Return (version, dirty) for scope; dirty means writes since version was settled."""
+    row = conn.execute('SELECT version, dirty FROM DataVersion WHERE scope = ?', (scope,)).fetchone()
+    return (row[0], bool(row[1])) if row else (0, False)
+
+def settle_data_version(conn, scope):
+    """Fold pending writes into a single version bump (짧은 쓰기 트랜잭션)."""
+    begin_immediate(conn)
+    conn.execute('''
+        UPDATE DataVersion SET version = version + 1, dirty = 0, updated_at = CURRENT_TIMESTAMP
+        WHERE scope = ? AND dirty = 1
+    ''', (scope,))
+    conn.commit()
+
+def cache_key(filter_keys, filters, columns):
+    """Digest of the filters that affect the output plus the column list (order matters)."""
+    filters = filters or {}
+    used = {key: str(filters.get(key)) for key in filter_keys if filters.get(key)}
+    raw = json.dumps({'filters': used, 'columns': list(columns or [])}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20]
+
+def cached_export(scope, filters=None, columns=None):
+    """Return (open binary file, etag) of an Export for scope/filters/columns at the current data version.
+
+    같은 데이터 버전에서 같은 조건으로 이미 만든 파일이 있으면 그대로 돌려주고,
+    없으면 버전 조회와 같은 읽기 트랜잭션(스냅샷)에서 생성해 원자적으로 저장한다.
+    스냅샷이 dirty(버전 확정 후 변경 있음)면 먼저 버전을 올려 확정하고 다시 스냅샷을 잡는다:
+    dirty가 아닌 스냅샷의 데이터는 그 버전이 확정된 시점 그대로이므로 버전이 곧 캐시 키가 된다.
+    파일은 정리(prune) 전에 열어서 돌려주므로 전송 중 다른 요청이 지워도 안전하다 (호출자/send_file이 닫음).
+    """
+    exporter, filter_keys = EXPORTERS[scope]
+    digest = cache_key(filter_keys, filters, columns)
+    os.makedirs(settings.EXPORT_CACHE_DIR, exist_ok=True)
+
+    conn = get_db()
+    try:
+        for attempt in range(SETTLE_ATTEMPTS + 1):
+            conn.execute('BEGIN')
+            version, dirty = data_version(conn, scope)
+            if not dirty or attempt == SETTLE_ATTEMPTS:
+                break
+            conn.rollback()
+            settle_data_version(conn, scope)
+        if dirty:
+            # 쓰기가 계속 끼어드는 중: 이 스냅샷 결과는 버전과 맞지 않으므로 캐시 폴더에 두지 않고
+            # 임시 파일(EXPORT_SPOOL_MAX_BYTES 초과 시 디스크)로 전송 후 닫히면 사라짐
+            return exporter(filters, columns, conn=conn), None
+
+        etag = f'{scope}_{version}_{digest}'
+        path = os.path.join(settings.EXPORT_CACHE_DIR, f'{etag}.xlsx')
+        try:
+            output = open(path, 'rb')
+        except FileNotFoundError:
+            output = None  # 아직 없거나 방금 정리됨 → 생성
+        if output is not None:
+            try:
+                os.utime(path)  # 최근 사용 순서 유지 (용량 정리 기준)
+            except OSError:
+                pass
+            return output, etag
+
+        fd, tmp_path = tempfile.mkstemp(prefix=f'{scope}_', suffix='.tmp', dir=settings.EXPORT_CACHE_DIR)
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                exporter(filters, columns, conn=conn, output=out)
+            output = open(tmp_path, 'rb')
+            os.replace(tmp_path, path)
+        except Exception:
+            if output is not None:
+                output.close()
+            os.remove(tmp_path)
+            raise
+    finally:
+        conn.close()
+
+    prune_cache(scope, version)
+    return output, etag
+
+def _file_version(scope, name):
+    if not name.startswith(f'{scope}_'):
+        return None
+    try:
+        return int(name[len(scope) + 1:].split('_', 1)[0])
+    except ValueError:
+        return None
+
+def prune_cache(scope, version):
+    """이전 데이터 버전 파일 삭제 후, 남은 파일이 EXPORT_CACHE_MAX_FILES를 넘으면 오래된 것부터 삭제.
+
+    동시에 다른 요청이 더 새 버전 파일을 만들었을 수 있으므로 version보다 작은 버전만 지운다.
+    """
+    files = []
+    for path in glob.glob(os.path.join(settings.EXPORT_CACHE_DIR, '*.xlsx')):
+        name = os.path.basename(path)
+        file_version = _file_version(scope, name)
+        try:
+            if file_version is not None and file_version < version:
+                os.remove(path)
+            else:
+                files.append((os.path.getmtime(path), path))
+        except OSError:
+            # 다른 요청이 전송 중이거나 이미 지운 파일
+            continue
+    files.sort()
+    for _, path in files[:max(len(files) - settings.EXPORT_CACHE_MAX_FILES, 0)]:
+        try:
+            os.remove(path)
+        except OSError:
+            continue
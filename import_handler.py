@@ -2,25 +2,31 @@
 ITAM - Import Handler
 엑셀 Import/Export 처리 모듈
 """
-import sqlite3
+import csv
 import json
+import os
+import sqlite3
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
 from datetime import datetime
-from io import BytesIO
+from io import BytesIO, TextIOWrapper
+
+import settings
+from asset_search import asset_search_source, build_asset_filters
+from database import begin_immediate, get_db
+from license_keys import recompute_license_quantities
+from sequences import BlockAllocator
 
 try:
     from openpyxl import Workbook, load_workbook
+    from openpyxl.cell import WriteOnlyCell
     from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 except ImportError:
     print("⚠️ openpyxl 미설치. pip install openpyxl 실행 필요")
 
-DB_PATH = 'itam.db'
-
-def get_db():
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("PRAGMA foreign_keys = ON")
-    conn.row_factory = sqlite3.Row
-    return conn
-
 # ========================================
 # 검증 함수
 # ========================================
@@ -49,335 +55,908 @@ def validate_number(value, field_name):
     except:
         return f"'{field_name}' 숫자 형식 오류"
 
-def validate_location(conn, location_name):
-    row = conn.execute('SELECT location_id FROM Location WHERE location_name = ? AND is_active = 1', 
-                       (location_name,)).fetchone()
-    return row['location_id'] if row else None
+class ReferenceLookup:
+    """Import 1회당 한 번 적재하는 기준정보 사전 (행마다 SELECT 하지 않음)."""
+
+    def __init__(self, conn, number_table=None, number_column=None):
+        self.locations = {}
+        for row in conn.execute('SELECT location_id, location_name, location_code FROM Location WHERE is_active = 1 ORDER BY location_id'):
+            self.locations.setdefault(row['location_name'], (row['location_id'], row['location_code']))
+        self.categories = {}
+        for row in conn.execute('SELECT category_id, category_name, category_code FROM AssetCategory WHERE is_active = 1 ORDER BY category_id'):
+            self.categories.setdefault(row['category_name'], (row['category_id'], row['category_code']))
+        self.users = {}
+        for row in conn.execute('SELECT user_id, employee_no FROM User ORDER BY user_id'):
+            self.users.setdefault(row['employee_no'], row['user_id'])
+        # 기존 번호 집합: 중복 검사 + 이번 Import에서 넣은 번호도 추가해 파일 내 중복까지 잡음
+        self.numbers = set()
+        if number_table:
+            self.numbers = {row[0] for row in conn.execute(f'SELECT {number_column} FROM {number_table}')}
 
-def validate_category(conn, category_name):
-    row = conn.execute('SELECT category_id FROM AssetCategory WHERE category_name = ? AND is_active = 1', 
-                       (category_name,)).fetchone()
-    return row['category_id'] if row else None
+    def __getstate__(self):
+        # 검증 워커에는 기준정보만 보냄 (번호 집합은 writer 전용)
+        state = dict(self.__dict__)
+        state['numbers'] = set()
+        return state
 
-def validate_user_by_empno(conn, employee_no):
-    row = conn.execute('SELECT user_id FROM User WHERE employee_no = ?', (employee_no,)).fetchone()
-    return row['user_id'] if row else None
+def _lookup_key(value):
+    return str(value) if value is not None else None
+
+def validate_location(lookup, location_name):
+    found = lookup.locations.get(_lookup_key(location_name))
+    return found if found else (None, None)
+
+def validate_category(lookup, category_name):
+    found = lookup.categories.get(_lookup_key(category_name))
+    return found if found else (None, None)
+
+def validate_user_by_empno(lookup, employee_no):
+    return lookup.users.get(_lookup_key(employee_no))
 
 def validate_asset_status(status):
     valid_statuses = ['신규', '사용중', '여유', '수리중', '폐기예정', '폐기', '분실']
     return status in valid_statuses
 
 # ========================================
-# HW 자산 Import
+# Import 컬럼 정의 (템플릿 / xlsx·CSV·NDJSON 헤더 매핑 공용)
 # ========================================
-def import_hw_assets(file_content):
-    """HW 자산 Import 처리"""
-    conn = get_db()
-    wb = load_workbook(filename=BytesIO(file_content))
-    ws = wb.active
+HW_TEMPLATE_HEADERS = ('asset_number', 'asset_name', 'category_name', 'asset_status', 'location_name',
+                       'install_location', 'manufacturer', 'model_name', 'serial_number',
+                       'spec_cpu', 'spec_ram_gb', 'spec_storage', 'purchase_date', 'purchase_cost',
+                       'warranty_start', 'warranty_end', 'useful_life_months',
+                       'employee_no', 'user_name', 'manager_employee_no',
+                       'ip_address', 'mac_address', 'hostname', 'os_info', 'notes')
+
+HW_TEMPLATE_HEADERS_KR = ('자산번호(선택)', '자산명*', '카테고리*', '상태*', '사업장*',
+                          '상세위치', '제조사', '모델명', '시리얼번호',
+                          'CPU', 'RAM(GB)', '저장장치', '구매일', '구매금액',
+                          '보증시작일', '보증만료일', '사용연한(월)',
+                          '사용자사번', '사용자이름', '관리담당자사번*',
+                          'IP주소', 'MAC주소', '호스트명', '운영체제', '비고')
+
+LICENSE_TEMPLATE_HEADERS = ('license_number', 'software_name', 'category_name', 'version', 'license_type',
+                            'license_metric', 'total_quantity', 'purchase_date', 'purchase_cost',
+                            'subscription_start', 'subscription_end', 'auto_renewal', 'manager_employee_no', 'notes')
+
+LICENSE_TEMPLATE_HEADERS_KR = ('관리번호(선택)', '소프트웨어명*', '카테고리*', '버전', '유형*',
+                               '측정단위*', '총수량*', '구매일', '구매금액',
+                               '구독시작일', '구독만료일', '자동갱신(Y/N)', '관리담당자사번*', '비고')
+
+def _header_aliases(headers, headers_kr):
+    # 영문 키, 한글 라벨, '*' 뺀 한글 라벨 모두 영문 키로
+    aliases = {}
+    for en, kr in zip(headers, headers_kr):
+        aliases[en] = en
+        aliases[kr] = en
+        aliases[kr.rstrip('*')] = en
+    return aliases
+
+HEADER_ALIASES = {
+    'asset': _header_aliases(HW_TEMPLATE_HEADERS, HW_TEMPLATE_HEADERS_KR),
+    'license': _header_aliases(LICENSE_TEMPLATE_HEADERS, LICENSE_TEMPLATE_HEADERS_KR),
+}
+
+def normalize_headers(kind, headers):
+    aliases = HEADER_ALIASES[kind]
+    return [aliases.get(str(h).strip(), str(h).strip()) if h is not None else None for h in headers]
+
+# ========================================
+# 스트리밍 읽기 (xlsx / CSV / NDJSON)
+# ========================================
+IMPORT_FORMATS = ('xlsx', 'csv', 'ndjson')
+
+def detect_format(file_name):
+    """Import format from the file extension (default xlsx)."""
+    ext = os.path.splitext(file_name or '')[1].lower()
+    if ext == '.csv':
+        return 'csv'
+    if ext in ('.ndjson', '.jsonl'):
+        return 'ndjson'
+    return 'xlsx'
+
+def iter_sheet_rows(source, kind=None):
+    """Yield (row_idx, {header: value}) from the first sheet without loading the workbook.
+
+    source: 경로 또는 seek 가능한 파일 객체 (bytes도 허용). read_only 모드라
+    행을 하나씩 XML에서 읽으므로 메모리 사용량이 행 수와 무관하다.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = BytesIO(source)
+    wb = load_workbook(filename=source, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        headers = next(rows, ())
+        if kind:
+            headers = normalize_headers(kind, headers)
+        for row_idx, row in enumerate(rows, start=2):
+            if not any(row):  # 빈 행 스킵
+                continue
+            yield row_idx, dict(zip(headers, row))
+    finally:
+        wb.close()
+
+@contextmanager
+def _open_text(source):
+    """Text stream over a path, bytes or binary file object (BOM-safe utf-8)."""
+    if isinstance(source, (bytes, bytearray)):
+        source = BytesIO(source)
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding='utf-8-sig', newline='') as f:
+            yield f
+        return
+    text = TextIOWrapper(source, encoding='utf-8-sig', newline='')
+    try:
+        yield text
+    finally:
+        text.detach()  # 호출자 파일은 닫지 않음
+
+def iter_csv_rows(source, kind):
+    """Yield (row_idx, {header: value}) from CSV; empty cells become None like xlsx."""
+    with _open_text(source) as f:
+        reader = csv.reader(f)
+        headers = normalize_headers(kind, next(reader, ()))
+        for row_idx, row in enumerate(reader, start=2):
+            if not any(row):
+                continue
+            yield row_idx, {h: (v if v != '' else None) for h, v in zip(headers, row)}
+
+def iter_ndjson_rows(source, kind):
+    """Yield (line_no, {key: value}) from NDJSON (one JSON object per line)."""
+    aliases = HEADER_ALIASES[kind]
+    with _open_text(source) as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            obj = json.loads(line)
+            if not isinstance(obj, dict):
+                raise ValueError(f"NDJSON {line_no}행: JSON 객체가 아닙니다")
+            yield line_no, {aliases.get(k, k): (v if v != '' else None) for k, v in obj.items()}
+
+def iter_source_rows(source, kind, file_format='xlsx'):
+    if file_format == 'csv':
+        return iter_csv_rows(source, kind)
+    if file_format == 'ndjson':
+        return iter_ndjson_rows(source, kind)
+    return iter_sheet_rows(source, kind)
+
+# ========================================
+# 청크 커밋
+# ========================================
+class ChunkedWriter:
+    """Import 쓰기를 chunk_size 행마다 커밋; 제약 위반 시 실패한 행만 되돌린다."""
+
+    def __init__(self, conn, numbers=None, chunk_size=None, on_commit=None):
+        self.conn = conn
+        self.numbers = numbers
+        self.chunk_size = max(1, chunk_size or settings.IMPORT_CHUNK_SIZE)
+        self.on_commit = on_commit  # 커밋 직전 같은 트랜잭션에서 호출 (진행률 기록)
+        self.pending = 0
+        self.committed = 0
+
+    def _begin(self):
+        if not self.conn.in_transaction:
+            self.conn.execute('BEGIN IMMEDIATE')
+
+    def execute(self, sql, params):
+        """Insert one row inside a savepoint; a failing row is rolled back alone and re-raised."""
+        self._begin()
+        self.conn.execute('SAVEPOINT import_row')
+        try:
+            self.conn.execute(sql, params)
+        except sqlite3.Error:
+            self.conn.execute('ROLLBACK TO import_row')
+            self.conn.execute('RELEASE import_row')
+            raise
+        self.conn.execute('RELEASE import_row')
+        self.pending += 1
+
+    def executemany(self, sql, params_list):
+        """Insert a batch with one executemany; returns [(index, error)] for rejected rows.
+
+        On a constraint violation the batch is rolled back to its savepoint
+        and replayed row by row, so only the offending rows are dropped.
+        """
+        if not params_list:
+            return []
+        self._begin()
+        self.conn.execute('SAVEPOINT import_batch')
+        try:
+            self.conn.executemany(sql, params_list)
+        except sqlite3.IntegrityError:
+            self.conn.execute('ROLLBACK TO import_batch')
+            self.conn.execute('RELEASE import_batch')
+        else:
+            self.conn.execute('RELEASE import_batch')
+            self.pending += len(params_list)
+            return []
+        failed = []
+        for i, params in enumerate(params_list):
+            try:
+                self.execute(sql, params)
+            except sqlite3.IntegrityError as e:
+                failed.append((i, e))
+        return failed
+
+    def checkpoint(self):
+        if self.pending >= self.chunk_size:
+            self.commit()
+
+    def commit(self):
+        # 예약 블록은 커밋 후에도 이 Import 소유로 남고, 남은 꼬리는 finish()에서 반납
+        if self.on_commit:
+            self.on_commit()
+        self.conn.commit()
+        self.committed += self.pending
+        self.pending = 0
+
+    def finish(self):
+        if self.numbers is not None:
+            self.numbers.release()
+        self.commit()
+
+# ========================================
+# 행 검증 (순수 함수: 워커 프로세스에서도 실행)
+# ========================================
+def _fmt_date(v):
+    if isinstance(v, datetime):
+        return v.strftime('%Y-%m-%d')
+    return str(v) if v else None
+
+def validate_hw_row(lookup, row_idx, data):
+    """Validate/normalize one HW row; number duplicate check and allocation stay with the writer."""
+    errors = []
+    warnings = []
     
-    results = {'success': 0, 'errors': [], 'warnings': []}
-    headers = [cell.value for cell in ws[1]]
+    # 필수 필드 검증
+    if err := validate_required(data.get('asset_name'), '자산명'):
+        errors.append(err)
+    if err := validate_required(data.get('category_name'), '자산 카테고리'):
+        errors.append(err)
+    if err := validate_required(data.get('asset_status'), '상태'):
+        errors.append(err)
+    if err := validate_required(data.get('location_name'), '사업장'):
+        errors.append(err)
+    if err := validate_required(data.get('manager_employee_no'), '관리담당자사번'):
+        errors.append(err)
     
-    for row_idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
-        if not any(row):  # 빈 행 스킵
-            continue
-            
-        data = dict(zip(headers, row))
-        errors = []
-        warnings = []
-        
-        # 필수 필드 검증
-        if err := validate_required(data.get('asset_name'), '자산명'):
-            errors.append(err)
-        if err := validate_required(data.get('category_name'), '자산 카테고리'):
-            errors.append(err)
-        if err := validate_required(data.get('asset_status'), '상태'):
-            errors.append(err)
-        if err := validate_required(data.get('location_name'), '사업장'):
-            errors.append(err)
-        if err := validate_required(data.get('manager_employee_no'), '관리담당자사번'):
-            errors.append(err)
-        
-        # 날짜 검증
-        if err := validate_date(data.get('purchase_date'), '구매일'):
-            errors.append(err)
-        if err := validate_date(data.get('warranty_start'), '보증시작일'):
-            errors.append(err)
-        if err := validate_date(data.get('warranty_end'), '보증만료일'):
-            errors.append(err)
-        
-        # 참조 데이터 검증
-        location_id = validate_location(conn, data.get('location_name'))
-        if not location_id and data.get('location_name'):
-            errors.append(f"사업장 '{data.get('location_name')}' 시스템에 없음")
-        
-        category_id = validate_category(conn, data.get('category_name'))
-        if not category_id and data.get('category_name'):
-            errors.append(f"카테고리 '{data.get('category_name')}' 시스템에 없음")
-        
-        manager_id = validate_user_by_empno(conn, data.get('manager_employee_no'))
-        if not manager_id and data.get('manager_employee_no'):
-            errors.append(f"관리담당자 사번 '{data.get('manager_employee_no')}' 시스템에 없음")
-        
-        user_id = None
-        if data.get('employee_no'):
-            user_id = validate_user_by_empno(conn, data.get('employee_no'))
-            if not user_id:
-                warnings.append(f"사용자 사번 '{data.get('employee_no')}' 시스템에 없음 (배정 보류)")
-        
-        if not validate_asset_status(data.get('asset_status', '')):
-            errors.append(f"상태 '{data.get('asset_status')}' 허용 값 아님")
-        
-        # 자산번호 중복 체크
-        if data.get('asset_number'):
-            existing = conn.execute('SELECT 1 FROM Asset WHERE asset_number = ?', 
-                                    (data.get('asset_number'),)).fetchone()
-            if existing:
-                errors.append(f"자산번호 '{data.get('asset_number')}' 중복")
-        
-        if errors:
-            results['errors'].append({'row': row_idx, 'asset_name': data.get('asset_name'), 'errors': errors})
-            continue
-        
-        # 자산번호 자동 채번
-        asset_number = data.get('asset_number')
-        if not asset_number:
-            loc = conn.execute('SELECT location_code FROM Location WHERE location_id = ?', (location_id,)).fetchone()
-            cat = conn.execute('SELECT category_code FROM AssetCategory WHERE category_id = ?', (category_id,)).fetchone()
-            year = datetime.now().year
-            prefix = f"{loc['location_code']}-{cat['category_code']}-{year}"
-            last = conn.execute("SELECT asset_number FROM Asset WHERE asset_number LIKE ? ORDER BY asset_number DESC LIMIT 1", (f"{prefix}-%",)).fetchone()
-            if last:
-                num = int(last['asset_number'].split('-')[-1]) + 1
-            else:
-                num = 1
-            asset_number = f"{prefix}-{str(num).zfill(4)}"
-        
-        # 스펙 정보 조합
-        specs = {}
-        if data.get('spec_cpu'): specs['cpu'] = data['spec_cpu']
-        if data.get('spec_ram_gb'): specs['ram_gb'] = data['spec_ram_gb']
-        if data.get('spec_storage'): specs['storage'] = data['spec_storage']
-        
-        # 날짜 포맷
-        def fmt_date(v):
-            if isinstance(v, datetime):
-                return v.strftime('%Y-%m-%d')
-            return str(v) if v else None
-        
-        # Insert
-        cursor = conn.cursor()
-        cursor.execute('''
+    # 날짜 검증
+    if err := validate_date(data.get('purchase_date'), '구매일'):
+        errors.append(err)
+    if err := validate_date(data.get('warranty_start'), '보증시작일'):
+        errors.append(err)
+    if err := validate_date(data.get('warranty_end'), '보증만료일'):
+        errors.append(err)
+    
+    # 참조 데이터 검증
+    location_id, location_code = validate_location(lookup, data.get('location_name'))
+    if not location_id and data.get('location_name'):
+        errors.append(f"사업장 '{data.get('location_name')}' 시스템에 없음")
+    
+    category_id, category_code = validate_category(lookup, data.get('category_name'))
+    if not category_id and data.get('category_name'):
+        errors.append(f"카테고리 '{data.get('category_name')}' 시스템에 없음")
+    
+    manager_id = validate_user_by_empno(lookup, data.get('manager_employee_no'))
+    if not manager_id and data.get('manager_employee_no'):
+        errors.append(f"관리담당자 사번 '{data.get('manager_employee_no')}' 시스템에 없음")
+    
+    user_id = None
+    if data.get('employee_no'):
+        user_id = validate_user_by_empno(lookup, data.get('employee_no'))
+        if not user_id:
+            warnings.append(f"사용자 사번 '{data.get('employee_no')}' 시스템에 없음 (배정 보류)")
+    
+    if not validate_asset_status(data.get('asset_status', '')):
+        errors.append(f"상태 '{data.get('asset_status')}' 허용 값 아님")
+    
+    row = {'row': row_idx, 'name': data.get('asset_name'), 'errors': errors, 'warnings': warnings,
+           'number': str(data['asset_number']) if data.get('asset_number') else None}
+    if errors:
+        return row
+    
+    # 스펙 정보 조합
+    specs = {}
+    if data.get('spec_cpu'): specs['cpu'] = data['spec_cpu']
+    if data.get('spec_ram_gb'): specs['ram_gb'] = data['spec_ram_gb']
+    if data.get('spec_storage'): specs['storage'] = data['spec_storage']
+    
+    row['prefix'] = f"{location_code}-{category_code}-{datetime.now().year}"
+    row['values'] = (data['asset_name'], category_id, data['asset_status'], location_id,
+                     data.get('install_location'), data.get('manufacturer'), data.get('model_name'),
+                     data.get('serial_number'), json.dumps(specs, ensure_ascii=False) if specs else None,
+                     _fmt_date(data.get('purchase_date')), data.get('purchase_cost'),
+                     _fmt_date(data.get('warranty_start')), _fmt_date(data.get('warranty_end')),
+                     data.get('useful_life_months'), user_id, manager_id,
+                     data.get('ip_address'), data.get('mac_address'), data.get('hostname'),
+                     data.get('os_info'), data.get('notes'))
+    return row
+
+def validate_license_row(lookup, row_idx, data):
+    """Validate/normalize one license row; number duplicate check and allocation stay with the writer."""
+    errors = []
+    
+    if err := validate_required(data.get('software_name'), '소프트웨어명'):
+        errors.append(err)
+    if err := validate_required(data.get('category_name'), '카테고리'):
+        errors.append(err)
+    if err := validate_required(data.get('license_type'), '라이선스유형'):
+        errors.append(err)
+    if err := validate_required(data.get('license_metric'), '측정단위'):
+        errors.append(err)
+    if err := validate_required(data.get('total_quantity'), '총수량'):
+        errors.append(err)
+    if err := validate_required(data.get('manager_employee_no'), '관리담당자사번'):
+        errors.append(err)
+    
+    category_id, _ = validate_category(lookup, data.get('category_name'))
+    if not category_id and data.get('category_name'):
+        errors.append(f"카테고리 '{data.get('category_name')}' 시스템에 없음")
+    
+    manager_id = validate_user_by_empno(lookup, data.get('manager_employee_no'))
+    if not manager_id and data.get('manager_employee_no'):
+        errors.append(f"관리담당자 사번 '{data.get('manager_employee_no')}' 시스템에 없음")
+    
+    row = {'row': row_idx, 'name': data.get('software_name'), 'errors': errors, 'warnings': [],
+           'number': str(data['license_number']) if data.get('license_number') else None}
+    if errors:
+        return row
+    
+    total = int(data['total_quantity'])
+    row['prefix'] = f"HQ-SW-{datetime.now().year}"
+    row['values'] = (data['software_name'], category_id, data.get('version'),
+                     data['license_type'], data['license_metric'], total, total,
+                     _fmt_date(data.get('purchase_date')), data.get('purchase_cost'),
+                     _fmt_date(data.get('subscription_start')), _fmt_date(data.get('subscription_end')),
+                     1 if data.get('subscription_end') else 0, 1 if str(data.get('auto_renewal')).upper() == 'Y' else 0,
+                     manager_id, '정상', data.get('notes'))
+    return row
+
+ROW_VALIDATORS = {
+    'asset': validate_hw_row,
+    'license': validate_license_row,
+}
+
+# 워커 프로세스별 기준정보 스냅샷 (initializer로 한 번만 전달)
+_worker_lookup = None
+
+def _init_validation_worker(lookup):
+    global _worker_lookup
+    _worker_lookup = lookup
+
+def _validate_chunk(kind, rows):
+    validate = ROW_VALIDATORS[kind]
+    return [validate(_worker_lookup, row_idx, data) for row_idx, data in rows]
+
+def _chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def validation_workers():
+    return settings.IMPORT_VALIDATION_WORKERS or os.cpu_count() or 1
+
+def iter_validated_chunks(kind, lookup, rows, chunk_size, workers=None):
+    """Yield validated chunks in file order, validating across a process pool.
+
+    The first chunk is validated inline so small files never start a pool;
+    at most workers * 2 chunks are in flight, keeping memory flat.
+    """
+    workers = workers or validation_workers()
+    chunks = _chunked(rows, chunk_size)
+    first = next(chunks, None)
+    if first is None:
+        return
+    validate = ROW_VALIDATORS[kind]
+    yield [validate(lookup, row_idx, data) for row_idx, data in first]
+    if workers <= 1:
+        for chunk in chunks:
+            yield [validate(lookup, row_idx, data) for row_idx, data in chunk]
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_validation_worker, initargs=(lookup,)) as pool:
+        in_flight = deque()
+        for chunk in chunks:
+            in_flight.append(pool.submit(_validate_chunk, kind, chunk))
+            if len(in_flight) >= workers * 2:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+# ========================================
+# 단일 writer: 번호 중복검사/채번 후 청크 단위 executemany
+# ========================================
+IMPORT_TARGETS = {
+    'asset': {
+        'number_table': 'Asset', 'number_column': 'asset_number', 'id_column': 'asset_id', 'scope': 'ASSET',
+        'number_label': '자산번호', 'name_key': 'asset_name', 'ref_type': 'ASSET',
+        'insert_sql': '''
             INSERT INTO Asset (asset_number, asset_name, category_id, asset_status, location_id, install_location,
                               manufacturer, model_name, serial_number, specifications, purchase_date, purchase_cost,
                               warranty_start, warranty_end, useful_life_months, current_user_id,
-                              asset_manager_id, ip_address, mac_address, hostname, os_info, notes, created_by)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
-        ''', (asset_number, data['asset_name'], category_id, data['asset_status'], location_id,
-              data.get('install_location'), data.get('manufacturer'), data.get('model_name'),
-              data.get('serial_number'), json.dumps(specs, ensure_ascii=False) if specs else None,
-              fmt_date(data.get('purchase_date')), data.get('purchase_cost'),
-              fmt_date(data.get('warranty_start')), fmt_date(data.get('warranty_end')),
-              data.get('useful_life_months'), user_id, manager_id,
-              data.get('ip_address'), data.get('mac_address'), data.get('hostname'),
-              data.get('os_info'), data.get('notes')))
+                              asset_manager_id, ip_address, mac_address, hostname, os_info, notes, created_by, updated_by)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1, 1)
+        ''',
+        # validate_hw_row()['values'] 순서
+        'columns': ('asset_name', 'category_id', 'asset_status', 'location_id', 'install_location',
+                    'manufacturer', 'model_name', 'serial_number', 'specifications', 'purchase_date', 'purchase_cost',
+                    'warranty_start', 'warranty_end', 'useful_life_months', 'current_user_id',
+                    'asset_manager_id', 'ip_address', 'mac_address', 'hostname', 'os_info', 'notes'),
+        'merge_extra_sets': 'updated_by = 1, updated_at = CURRENT_TIMESTAMP',
+        'insert_extra': {'created_by': '1', 'updated_by': '1'},
+    },
+    'license': {
+        'number_table': 'SoftwareLicense', 'number_column': 'license_number', 'id_column': 'license_id', 'scope': 'LICENSE',
+        'number_label': '라이선스번호', 'name_key': 'software_name', 'ref_type': 'LICENSE',
+        'insert_sql': '''
+            INSERT INTO SoftwareLicense (license_number, software_name, category_id, version, license_type,
+                                         license_metric, total_quantity, used_quantity, available_quantity,
+                                         purchase_date, purchase_cost, subscription_start, subscription_end,
+                                         is_subscription, auto_renewal, license_manager_id, compliance_status, notes)
+            VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''',
+        # validate_license_row()['values'] 순서
+        'columns': ('software_name', 'category_id', 'version', 'license_type', 'license_metric', 'total_quantity',
+                    'available_quantity', 'purchase_date', 'purchase_cost', 'subscription_start', 'subscription_end',
+                    'is_subscription', 'auto_renewal', 'license_manager_id', 'compliance_status', 'notes'),
+        # 사용/가용 수량과 컴플라이언스는 병합 후 재계산
+        'merge_skip': ('available_quantity', 'compliance_status'),
+        # 키로 관리되는 라이선스의 총 수량은 키 수에서 파생(트리거/재계산이 덮어씀) → 비교/반영하지 않음
+        'merge_derived': {
+            'total_quantity': ("EXISTS (SELECT 1 FROM LicenseKey k WHERE k.license_id = t.license_id AND k.key_status != '폐기')",
+                               '총 수량은 라이선스 키 수로 계산'),
+        },
+        'merge_extra_sets': 'updated_at = CURRENT_TIMESTAMP',
+        'insert_extra': {'used_quantity': '0'},
+    },
+}
+
+IMPORT_MODES = ('insert', 'merge')
+
+def run_import(kind, source, chunk_size=None, progress=None, workers=None, mode='insert', file_format='xlsx'):
+    """Stream rows, validate them (process pool) and write them through one writer.
+
+    mode='insert': 번호가 이미 있으면 오류. mode='merge': 번호 기준으로 추가/변경/동일을
+    집합 단위로 구분해 바뀐 행만 반영한다.
+    progress(conn, results)는 청크 커밋마다 같은 트랜잭션 안에서 호출된다.
+    """
+    if mode not in IMPORT_MODES:
+        raise ValueError(f"알 수 없는 Import 모드: {mode}")
+    if file_format not in IMPORT_FORMATS:
+        raise ValueError(f"지원하지 않는 파일 형식: {file_format}")
+    target = IMPORT_TARGETS[kind]
+    chunk_size = max(1, chunk_size or settings.IMPORT_CHUNK_SIZE)
+    conn = get_db()
+    try:
+        results = {'success': 0, 'errors': [], 'warnings': [], 'rows_processed': 0}
+        lookup = ReferenceLookup(conn, target['number_table'], target['number_column'])
+        chunks = iter_validated_chunks(kind, lookup, iter_source_rows(source, kind, file_format), chunk_size, workers)
+        if mode == 'merge':
+            _merge_rows(conn, target, lookup, chunks, results, progress)
+        else:
+            _insert_rows(conn, target, lookup, chunks, results, progress, chunk_size)
+        return results
+    finally:
+        conn.close()
+
+def _row_error(target, row, errors):
+    return {'row': row['row'], target['name_key']: row['name'], 'errors': errors}
+
+def _record_row_outcome(target, results, row):
+    results['success'] += 1
+    if row['warnings']:
+        results['warnings'].append({'row': row['row'], target['name_key']: row['name'], 'warnings': row['warnings']})
+
+def _insert_rows(conn, target, lookup, chunks, results, progress, chunk_size):
+    numbers = BlockAllocator(conn, target['scope'])
+    writer = ChunkedWriter(conn, numbers, chunk_size, on_commit=(lambda: progress(conn, results)) if progress else None)
+    
+    for chunk in chunks:
+        first_error = len(results['errors'])
+        batch = []
+        for row in chunk:
+            # 번호 중복 체크 (DB + 이번 파일): 파일 순서대로 판단해야 하므로 writer에서
+            if row['number'] and row['number'] in lookup.numbers:
+                row['errors'].append(f"{target['number_label']} '{row['number']}' 중복")
+            if row['errors']:
+                results['errors'].append(_row_error(target, row, row['errors']))
+                continue
+            
+            # 번호 자동 채번
+            number = row['number']
+            if not number:
+                number = numbers.next(row['prefix'])
+                while number in lookup.numbers:
+                    number = numbers.next(row['prefix'])
+            else:
+                numbers.note_used(number)
+            lookup.numbers.add(number)
+            batch.append((row, (number,) + row['values']))
         
-        results['success'] += 1
-        if warnings:
-            results['warnings'].append({'row': row_idx, 'asset_name': data.get('asset_name'), 'warnings': warnings})
+        failed = dict(writer.executemany(target['insert_sql'], [params for _, params in batch]))
+        for i, (row, _) in enumerate(batch):
+            if i in failed:
+                results['errors'].append(_row_error(target, row, [f"저장 실패: {failed[i]}"]))
+                continue
+            _record_row_outcome(target, results, row)
+        results['errors'][first_error:] = sorted(results['errors'][first_error:], key=lambda e: e['row'])
+        results['rows_processed'] += len(chunk)  # 행 번호는 형식마다 시작이 달라(xlsx/csv는 헤더 다음 2, ndjson은 1) 실제 처리 수로 셈
+        writer.checkpoint()
     
-    conn.commit()
-    conn.close()
-    return results
+    writer.finish()
 
 # ========================================
-# SW 라이선스 Import
+# 병합(merge) Import: 임시 테이블 적재 후 집합 단위 비교/반영
 # ========================================
-def import_licenses(file_content):
-    """SW 라이선스 Import 처리"""
-    conn = get_db()
-    wb = load_workbook(filename=BytesIO(file_content))
-    ws = wb.active
+def _merge_rows(conn, target, lookup, chunks, results, progress):
+    table, number_column, id_column = target['number_table'], target['number_column'], target['id_column']
+    columns = target['columns']
+    compared = [col for col in columns if col not in target.get('merge_skip', ())]
+    derived = target.get('merge_derived', {})  # 컬럼 -> (대상 행에서 이 값이 파생값인 조건, 안내 문구); 조건이 참이면 기존 값 유지
     
-    results = {'success': 0, 'errors': [], 'warnings': []}
-    headers = [cell.value for cell in ws[1]]
+    # 대상 테이블과 같은 컬럼 친화도(affinity)로 만들어야 엑셀 값과 DB 값 비교가 정확함
+    conn.execute('DROP TABLE IF EXISTS temp.import_stage')
+    conn.execute(f"CREATE TEMP TABLE import_stage AS SELECT {number_column} AS number, {', '.join(columns)} FROM {table} WHERE 0")
+    conn.execute('ALTER TABLE temp.import_stage ADD COLUMN row_idx INTEGER')
+    conn.execute('ALTER TABLE temp.import_stage ADD COLUMN prefix TEXT')
+    stage_sql = f'''
+        INSERT INTO temp.import_stage (row_idx, number, prefix, {', '.join(columns)})
+        VALUES (?, ?, ?, {', '.join('?' * len(columns))})
+    '''
     
-    for row_idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
-        if not any(row):
-            continue
-            
-        data = dict(zip(headers, row))
-        errors = []
-        
-        if err := validate_required(data.get('software_name'), '소프트웨어명'):
-            errors.append(err)
-        if err := validate_required(data.get('category_name'), '카테고리'):
-            errors.append(err)
-        if err := validate_required(data.get('license_type'), '라이선스유형'):
-            errors.append(err)
-        if err := validate_required(data.get('license_metric'), '측정단위'):
-            errors.append(err)
-        if err := validate_required(data.get('total_quantity'), '총수량'):
-            errors.append(err)
-        if err := validate_required(data.get('manager_employee_no'), '관리담당자사번'):
-            errors.append(err)
-        
-        category_id = validate_category(conn, data.get('category_name'))
-        if not category_id and data.get('category_name'):
-            errors.append(f"카테고리 '{data.get('category_name')}' 시스템에 없음")
+    # 1) 적재: 파일 내 번호 중복만 오류 (DB에 있는 번호는 갱신 대상)
+    staged = {}
+    file_numbers = set()
+    for chunk in chunks:
+        batch = []
+        for row in chunk:
+            if row['number'] and row['number'] in file_numbers:
+                row['errors'].append(f"{target['number_label']} '{row['number']}' 파일 내 중복")
+            if row['errors']:
+                results['errors'].append(_row_error(target, row, row['errors']))
+                continue
+            if row['number']:
+                file_numbers.add(row['number'])
+            staged[row['row']] = row
+            batch.append((row['row'], row['number'], row['prefix']) + row['values'])
+        conn.executemany(stage_sql, batch)
+        results['rows_processed'] += len(chunk)
+        if progress:
+            progress(conn, results)
+        conn.commit()
+    
+    # 2) 반영: 한 번의 쓰기 트랜잭션
+    begin_immediate(conn)
+    try:
+        # 삭제된 레코드와 번호가 겹치면 되살리지 않고 오류 처리
+        for row_idx, number in conn.execute(f'''
+            SELECT s.row_idx, s.number
+            FROM temp.import_stage s
+            JOIN {table} t ON t.{number_column} = s.number
+            WHERE t.is_deleted = 1
+        ''').fetchall():
+            results['errors'].append(_row_error(target, staged.pop(row_idx), [f"{target['number_label']} '{number}' 삭제된 항목"]))
+            conn.execute('DELETE FROM temp.import_stage WHERE row_idx = ?', (row_idx,))
         
-        manager_id = validate_user_by_empno(conn, data.get('manager_employee_no'))
-        if not manager_id and data.get('manager_employee_no'):
-            errors.append(f"관리담당자 사번 '{data.get('manager_employee_no')}' 시스템에 없음")
+        # 파생 컬럼은 파일 값이 달라도 기존 값 유지 (경고만 남김): 재실행해도 결과가 같도록
+        for col, (condition, note) in derived.items():
+            for row_idx, value in conn.execute(f'''
+                SELECT s.row_idx, t.{col}
+                FROM temp.import_stage s
+                JOIN {table} t ON t.{number_column} = s.number
+                WHERE t.{col} IS NOT s.{col} AND {condition}
+            ''').fetchall():
+                staged[row_idx]['warnings'].append(f"{note}되어 파일 값을 반영하지 않음 (현재 {value})")
         
-        if errors:
-            results['errors'].append({'row': row_idx, 'software_name': data.get('software_name'), 'errors': errors})
-            continue
+        # 변경: 비교 컬럼 중 하나라도 다른 행만 (이력도 이 행들만)
+        def col_differs(col):  # 대상 별칭 t, 적재 별칭 s
+            return f'(t.{col} IS NOT s.{col} AND NOT {derived[col][0]})' if col in derived else f't.{col} IS NOT s.{col}'
+        differs = ' OR '.join(col_differs(col) for col in compared)
+        changed = conn.execute(f'''
+            SELECT t.{id_column} AS ref_id, s.row_idx,
+                   {', '.join(f't.{col} AS "old_{col}", s.{col} AS "new_{col}"' for col in compared)}
+                   {''.join(f', {condition} AS "derived_{col}"' for col, (condition, _) in derived.items())}
+            FROM temp.import_stage s
+            JOIN {table} t ON t.{number_column} = s.number
+            WHERE {differs}
+        ''').fetchall()
+        history = []
+        for row in changed:
+            diff = [col for col in compared
+                    if row[f'old_{col}'] != row[f'new_{col}'] and not (col in derived and row[f'derived_{col}'])]
+            history.append((target['ref_type'], row['ref_id'], 'UPDATED', 'Import 병합 수정',
+                            json.dumps({col: row[f'old_{col}'] for col in diff}, ensure_ascii=False, default=str),
+                            json.dumps({col: row[f'new_{col}'] for col in diff}, ensure_ascii=False, default=str)))
+        conn.executemany('''
+            INSERT INTO AssetHistory (reference_type, reference_id, action_type, action_detail,
+                                      previous_values, new_values, action_by)
+            VALUES (?, ?, ?, ?, ?, ?, 1)
+        ''', history)
+        if changed:
+            conn.execute(f'''
+                UPDATE {table} AS t
+                SET {', '.join(f'{col} = CASE WHEN {derived[col][0]} THEN t.{col} ELSE s.{col} END' if col in derived
+                               else f'{col} = s.{col}' for col in compared)}, {target['merge_extra_sets']}
+                FROM temp.import_stage s
+                WHERE t.{number_column} = s.number
+                  AND ({differs})
+            ''')
         
-        license_number = data.get('license_number')
-        if not license_number:
-            year = datetime.now().year
-            prefix = f"HQ-SW-{year}"
-            last = conn.execute("SELECT license_number FROM SoftwareLicense WHERE license_number LIKE ? ORDER BY license_number DESC LIMIT 1", (f"{prefix}-%",)).fetchone()
-            num = int(last['license_number'].split('-')[-1]) + 1 if last else 1
-            license_number = f"{prefix}-{str(num).zfill(4)}"
+        # 추가: 번호 없는 행은 여기서 채번 (파일/DB 번호는 건너뜀)
+        numbers = BlockAllocator(conn, target['scope'])
+        for number in file_numbers:
+            numbers.note_used(number)
+        assigned = []
+        for row_idx, prefix in conn.execute('SELECT row_idx, prefix FROM temp.import_stage WHERE number IS NULL ORDER BY row_idx').fetchall():
+            number = numbers.next(prefix)
+            while number in lookup.numbers or number in file_numbers:
+                number = numbers.next(prefix)
+            lookup.numbers.add(number)
+            assigned.append((number, row_idx))
+        conn.executemany('UPDATE temp.import_stage SET number = ? WHERE row_idx = ?', assigned)
+        numbers.release()
         
-        def fmt_date(v):
-            if isinstance(v, datetime):
-                return v.strftime('%Y-%m-%d')
-            return str(v) if v else None
+        extra = target['insert_extra']
+        inserted = conn.execute(f'''
+            INSERT INTO {table} ({number_column}, {', '.join(columns)}, {', '.join(extra)})
+            SELECT number, {', '.join(columns)}, {', '.join(extra.values())}
+            FROM temp.import_stage s
+            WHERE NOT EXISTS (SELECT 1 FROM {table} t WHERE t.{number_column} = s.number)
+            ORDER BY row_idx
+        ''').rowcount
         
-        total = int(data['total_quantity'])
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO SoftwareLicense (license_number, software_name, category_id, version, license_type,
-                                         license_metric, total_quantity, used_quantity, available_quantity,
-                                         purchase_date, purchase_cost, subscription_start, subscription_end,
-                                         is_subscription, auto_renewal, license_manager_id, compliance_status, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (license_number, data['software_name'], category_id, data.get('version'),
-              data['license_type'], data['license_metric'], total, total,
-              fmt_date(data.get('purchase_date')), data.get('purchase_cost'),
-              fmt_date(data.get('subscription_start')), fmt_date(data.get('subscription_end')),
-              1 if data.get('subscription_end') else 0, 1 if str(data.get('auto_renewal')).upper() == 'Y' else 0,
-              manager_id, '정상', data.get('notes')))
+        if changed and table == 'SoftwareLicense':
+            recompute_license_quantities(conn, license_ids=[row['ref_id'] for row in changed])
         
-        results['success'] += 1
-    
-    conn.commit()
-    conn.close()
-    return results
+        results['inserted'] = inserted
+        results['updated'] = len(changed)
+        results['unchanged'] = len(staged) - inserted - len(changed)
+        for row_idx in sorted(staged):
+            _record_row_outcome(target, results, staged[row_idx])
+        results['errors'].sort(key=lambda e: e['row'])
+        if progress:
+            progress(conn, results)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.execute('DROP TABLE IF EXISTS temp.import_stage')
+
+def import_summary(results):
+    """Result message shared by the synchronous API and background jobs."""
+    if 'inserted' in results:
+        return (f"Import 완료: 추가 {results['inserted']}건, 변경 {results['updated']}건, "
+                f"동일 {results['unchanged']}건, 실패 {len(results['errors'])}건")
+    return f"Import 완료: 성공 {results['success']}건, 실패 {len(results['errors'])}건"
+
+# ========================================
+# HW 자산 / SW 라이선스 Import
+# ========================================
+def import_hw_assets(source, chunk_size=None, progress=None, workers=None, mode='insert', file_format='xlsx'):
+    """HW 자산 Import 처리 (source: 경로/파일 객체/bytes, file_format: xlsx/csv/ndjson)"""
+    return run_import('asset', source, chunk_size, progress, workers, mode, file_format)
+
+def import_licenses(source, chunk_size=None, progress=None, workers=None, mode='insert', file_format='xlsx'):
+    """SW 라이선스 Import 처리 (source: 경로/파일 객체/bytes, file_format: xlsx/csv/ndjson)"""
+    return run_import('license', source, chunk_size, progress, workers, mode, file_format)
 
 # ========================================
 # Export 함수
 # ========================================
-def export_assets():
-    """자산 목록 Export"""
-    conn = get_db()
-    rows = conn.execute('''
-        SELECT a.asset_number, a.asset_name, c.category_name, a.asset_status, l.location_name,
-               a.install_location, a.manufacturer, a.model_name, a.serial_number, a.specifications,
-               a.purchase_date, a.purchase_cost, a.warranty_start, a.warranty_end, a.useful_life_months,
-               u.employee_no, u.user_name, m.employee_no as manager_employee_no, m.user_name as manager_name,
-               a.ip_address, a.mac_address, a.hostname, a.os_info, a.notes
-        FROM Asset a
-        LEFT JOIN AssetCategory c ON a.category_id = c.category_id
-        LEFT JOIN Location l ON a.location_id = l.location_id
-        LEFT JOIN User u ON a.current_user_id = u.user_id
-        LEFT JOIN User m ON a.asset_manager_id = m.user_id
-        WHERE a.is_deleted = 0
-        ORDER BY a.asset_id
-    ''').fetchall()
-    conn.close()
-    
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "자산목록"
-    
-    headers = ['자산번호', '자산명', '카테고리', '상태', '사업장', '상세위치', '제조사', '모델명', '시리얼번호',
-               '스펙', '구매일', '구매금액', '보증시작일', '보증만료일', '사용연한(월)', '사용자사번', '사용자이름',
-               '관리담당자사번', '관리담당자', 'IP주소', 'MAC주소', '호스트명', '운영체제', '비고']
-    
-    header_fill = PatternFill(start_color="4F46E5", end_color="4F46E5", fill_type="solid")
-    header_font = Font(color="FFFFFF", bold=True)
-    
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.fill = header_fill
-        cell.font = header_font
-    
-    for row_idx, row in enumerate(rows, 2):
-        for col_idx, val in enumerate(dict(row).values(), 1):
-            ws.cell(row=row_idx, column=col_idx, value=val)
-    
-    output = BytesIO()
-    wb.save(output)
-    output.seek(0)
-    return output.getvalue()
+# Export 컬럼 정의: (키, 헤더, SELECT 식, 필요한 조인 별칭)
+# columns 파라미터로 일부만 고르면 해당 컬럼이 쓰는 조인만 붙는다.
+ASSET_EXPORT_COLUMNS = [
+    ('asset_number', '자산번호', 'a.asset_number', None),
+    ('asset_name', '자산명', 'a.asset_name', None),
+    ('category_name', '카테고리', 'c.category_name', 'c'),
+    ('asset_status', '상태', 'a.asset_status', None),
+    ('location_name', '사업장', 'l.location_name', 'l'),
+    ('install_location', '상세위치', 'a.install_location', None),
+    ('manufacturer', '제조사', 'a.manufacturer', None),
+    ('model_name', '모델명', 'a.model_name', None),
+    ('serial_number', '시리얼번호', 'a.serial_number', None),
+    ('specifications', '스펙', 'a.specifications', None),
+    ('purchase_date', '구매일', 'a.purchase_date', None),
+    ('purchase_cost', '구매금액', 'a.purchase_cost', None),
+    ('warranty_start', '보증시작일', 'a.warranty_start', None),
+    ('warranty_end', '보증만료일', 'a.warranty_end', None),
+    ('useful_life_months', '사용연한(월)', 'a.useful_life_months', None),
+    ('employee_no', '사용자사번', 'u.employee_no', 'u'),
+    ('user_name', '사용자이름', 'u.user_name', 'u'),
+    ('manager_employee_no', '관리담당자사번', 'm.employee_no', 'm'),
+    ('manager_name', '관리담당자', 'm.user_name', 'm'),
+    ('ip_address', 'IP주소', 'a.ip_address', None),
+    ('mac_address', 'MAC주소', 'a.mac_address', None),
+    ('hostname', '호스트명', 'a.hostname', None),
+    ('os_info', '운영체제', 'a.os_info', None),
+    ('notes', '비고', 'a.notes', None),
+]
+ASSET_EXPORT_JOINS = {
+    'c': 'LEFT JOIN AssetCategory c ON a.category_id = c.category_id',
+    'l': 'LEFT JOIN Location l ON a.location_id = l.location_id',
+    'u': 'LEFT JOIN User u ON a.current_user_id = u.user_id',
+    'm': 'LEFT JOIN User m ON a.asset_manager_id = m.user_id',
+}
 
-def export_licenses():
-    """라이선스 목록 Export"""
-    conn = get_db()
-    rows = conn.execute('''
-        SELECT sl.license_number, sl.software_name, c.category_name, sl.version, sl.license_type,
-               sl.license_metric, sl.total_quantity, sl.used_quantity, sl.available_quantity,
-               sl.purchase_date, sl.purchase_cost, sl.subscription_start, sl.subscription_end,
-               sl.auto_renewal, m.employee_no as manager_employee_no, m.user_name as manager_name,
-               sl.compliance_status, sl.notes
-        FROM SoftwareLicense sl
-        LEFT JOIN AssetCategory c ON sl.category_id = c.category_id
-        LEFT JOIN User m ON sl.license_manager_id = m.user_id
-        WHERE sl.is_deleted = 0
-    ''').fetchall()
-    conn.close()
-    
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "라이선스목록"
-    
-    headers = ['관리번호', '소프트웨어명', '카테고리', '버전', '유형', '측정단위', '총수량', '사용', '가용',
-               '구매일', '구매금액', '구독시작', '구독만료', '자동갱신', '담당자사번', '담당자', '상태', '비고']
+LICENSE_EXPORT_COLUMNS = [
+    ('license_number', '관리번호', 'sl.license_number', None),
+    ('software_name', '소프트웨어명', 'sl.software_name', None),
+    ('category_name', '카테고리', 'c.category_name', 'c'),
+    ('version', '버전', 'sl.version', None),
+    ('license_type', '유형', 'sl.license_type', None),
+    ('license_metric', '측정단위', 'sl.license_metric', None),
+    ('total_quantity', '총수량', 'sl.total_quantity', None),
+    ('used_quantity', '사용', 'sl.used_quantity', None),
+    ('available_quantity', '가용', 'sl.available_quantity', None),
+    ('purchase_date', '구매일', 'sl.purchase_date', None),
+    ('purchase_cost', '구매금액', 'sl.purchase_cost', None),
+    ('subscription_start', '구독시작', 'sl.subscription_start', None),
+    ('subscription_end', '구독만료', 'sl.subscription_end', None),
+    ('auto_renewal', '자동갱신', 'sl.auto_renewal', None),
+    ('manager_employee_no', '담당자사번', 'm.employee_no', 'm'),
+    ('manager_name', '담당자', 'm.user_name', 'm'),
+    ('compliance_status', '상태', 'sl.compliance_status', None),
+    ('notes', '비고', 'sl.notes', None),
+]
+LICENSE_EXPORT_JOINS = {
+    'c': 'LEFT JOIN AssetCategory c ON sl.category_id = c.category_id',
+    'm': 'LEFT JOIN User m ON sl.license_manager_id = m.user_id',
+}
+
+# 목록 필터 키 (Export 캐시 키에는 이 값들만 반영)
+ASSET_EXPORT_FILTERS = ('location_id', 'category_id', 'status', 'keyword')
+LICENSE_EXPORT_FILTERS = ('category_id', 'vendor_id', 'status', 'used', 'keyword')
+
+def parse_export_columns(value):
+    """'a,b,c' 또는 리스트 → 컬럼 키 리스트 (비어 있으면 None = 전체)"""
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    columns = [c.strip() for c in value if c and c.strip()]
+    return columns or None
+
+def _select_export_columns(catalog, joins, columns):
+    """Pick (headers, select list, join clauses) for the requested column keys, in request order."""
+    if columns:
+        by_key = {c[0]: c for c in catalog}
+        unknown = [key for key in columns if key not in by_key]
+        if unknown:
+            raise ValueError(f"알 수 없는 Export 컬럼: {', '.join(unknown)}")
+        chosen = [by_key[key] for key in dict.fromkeys(columns)]
+    else:
+        chosen = catalog
+    used = {c[3] for c in chosen if c[3]}
+    return ([c[1] for c in chosen], ', '.join(c[2] for c in chosen),
+            ' '.join(clause for alias, clause in joins.items() if alias in used))
+
+def build_license_filters(args):
+    """Translate license list filters (SPA와 동일: vendor_id, used, status, keyword) into (where, params) on SoftwareLicense sl."""
+    where = ['sl.is_deleted = 0']
+    params = []
+    if args.get('category_id'):
+        where.append('sl.category_id = ?')
+        params.append(args.get('category_id'))
+    if args.get('vendor_id'):
+        where.append('sl.vendor_id = ?')
+        params.append(args.get('vendor_id'))
+    if args.get('status'):
+        where.append('sl.license_status = ?')
+        params.append(args.get('status'))
+    if args.get('used') == 'used':
+        where.append('sl.used_quantity > 0')
+    elif args.get('used') == 'unused':
+        where.append('COALESCE(sl.used_quantity, 0) = 0')
+    keyword = args.get('keyword')
+    if keyword:
+        # 공급사명은 조인 대신 서브쿼리로 (선택 컬럼에 필요 없는 조인을 붙이지 않음)
+        where.append('(sl.license_number LIKE ? OR sl.software_name LIKE ? '
+                     'OR sl.vendor_id IN (SELECT vendor_id FROM Vendor WHERE vendor_name LIKE ?))')
+        kw = f'%{keyword}%'
+        params.extend([kw, kw, kw])
+    return ' AND '.join(where), params
+
+def _write_export(title, headers, color, rows, output=None):
+    """Stream rows into a write_only workbook saved to output, or to a spooled temp file (position 0).
+
+    행은 커서에서 하나씩 흘려 쓰고 결과는 EXPORT_SPOOL_MAX_BYTES 초과 시 디스크로
+    넘어가므로, 메모리 사용량이 행 수와 무관하다.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=title)
     
-    header_fill = PatternFill(start_color="10B981", end_color="10B981", fill_type="solid")
+    header_fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
     header_font = Font(color="FFFFFF", bold=True)
-    
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
         cell.fill = header_fill
         cell.font = header_font
+        header_cells.append(cell)
+    ws.append(header_cells)
     
-    for row_idx, row in enumerate(rows, 2):
-        for col_idx, val in enumerate(dict(row).values(), 1):
-            ws.cell(row=row_idx, column=col_idx, value=val)
+    for row in rows:
+        ws.append(tuple(row))
     
-    output = BytesIO()
-    wb.save(output)
+    if output is not None:
+        wb.save(output)
+        return output
+    output = tempfile.SpooledTemporaryFile(max_size=settings.EXPORT_SPOOL_MAX_BYTES)
+    try:
+        wb.save(output)
+    except Exception:
+        output.close()
+        raise
     output.seek(0)
-    return output.getvalue()
+    return output
+
+def export_assets(filters=None, columns=None, conn=None, output=None):
+    """자산 목록 Export (파일 객체 반환, 호출자가 닫음)
+
+    filters: get_assets()와 같은 필터 (location_id, category_id, status, keyword)
+    columns: ASSET_EXPORT_COLUMNS 키 목록 (None이면 전체)
+    conn/output: 호출자의 커넥션(스냅샷)과 출력 파일 (Export 캐시에서 사용)
+    """
+    headers, select, joins = _select_export_columns(ASSET_EXPORT_COLUMNS, ASSET_EXPORT_JOINS, columns)
+    own_conn = conn is None
+    if own_conn:
+        conn = get_db()
+    try:
+        where, params, match = build_asset_filters(conn, filters or {})
+        source, where, params = asset_search_source(where, params, match)
+        rows = conn.execute(f'''
+            SELECT {select}
+            {source}
+            {joins}
+            WHERE {where}
+            ORDER BY a.asset_id
+        ''', params)
+        return _write_export("자산목록", headers, "4F46E5", rows, output)
+    finally:
+        if own_conn:
+            conn.close()
+
+def export_licenses(filters=None, columns=None, conn=None, output=None):
+    """라이선스 목록 Export (파일 객체 반환, 호출자가 닫음)
+
+    filters: category_id, vendor_id, status, used(used/unused), keyword (관리번호/소프트웨어명/공급사명)
+    columns: LICENSE_EXPORT_COLUMNS 키 목록 (None이면 전체)
+    conn/output: 호출자의 커넥션(스냅샷)과 출력 파일 (Export 캐시에서 사용)
+    """
+    headers, select, joins = _select_export_columns(LICENSE_EXPORT_COLUMNS, LICENSE_EXPORT_JOINS, columns)
+    where, params = build_license_filters(filters or {})
+    own_conn = conn is None
+    if own_conn:
+        conn = get_db()
+    try:
+        rows = conn.execute(f'''
+            SELECT {select}
+            FROM SoftwareLicense sl
+            {joins}
+            WHERE {where}
+            ORDER BY sl.license_id
+        ''', params)
+        return _write_export("라이선스목록", headers, "10B981", rows, output)
+    finally:
+        if own_conn:
+            conn.close()
 
 # ========================================
 # 템플릿 생성
 # ========================================
+@lru_cache(maxsize=None)
 def create_hw_template():
-    """HW 자산 Import 템플릿 생성"""
+    """HW 자산 Import 템플릿 생성 (내용이 고정이므로 프로세스당 한 번만 생성)"""
     wb = Workbook()
     ws = wb.active
     ws.title = "HW자산템플릿"
     
-    headers = ['asset_number', 'asset_name', 'category_name', 'asset_status', 'location_name',
-               'install_location', 'manufacturer', 'model_name', 'serial_number',
-               'spec_cpu', 'spec_ram_gb', 'spec_storage', 'purchase_date', 'purchase_cost',
-               'warranty_start', 'warranty_end', 'useful_life_months',
-               'employee_no', 'user_name', 'manager_employee_no',
-               'ip_address', 'mac_address', 'hostname', 'os_info', 'notes']
-    
-    headers_kr = ['자산번호(선택)', '자산명*', '카테고리*', '상태*', '사업장*',
-                  '상세위치', '제조사', '모델명', '시리얼번호',
-                  'CPU', 'RAM(GB)', '저장장치', '구매일', '구매금액',
-                  '보증시작일', '보증만료일', '사용연한(월)',
-                  '사용자사번', '사용자이름', '관리담당자사번*',
-                  'IP주소', 'MAC주소', '호스트명', '운영체제', '비고']
+    headers = HW_TEMPLATE_HEADERS
+    headers_kr = HW_TEMPLATE_HEADERS_KR
     
     header_fill = PatternFill(start_color="4F46E5", end_color="4F46E5", fill_type="solid")
     header_font = Font(color="FFFFFF", bold=True)
@@ -401,19 +980,15 @@ def create_hw_template():
     output.seek(0)
     return output.getvalue()
 
+@lru_cache(maxsize=None)
 def create_license_template():
-    """SW 라이선스 Import 템플릿 생성"""
+    """SW 라이선스 Import 템플릿 생성 (내용이 고정이므로 프로세스당 한 번만 생성)"""
     wb = Workbook()
     ws = wb.active
     ws.title = "라이선스템플릿"
     
-    headers = ['license_number', 'software_name', 'category_name', 'version', 'license_type',
-               'license_metric', 'total_quantity', 'purchase_date', 'purchase_cost',
-               'subscription_start', 'subscription_end', 'auto_renewal', 'manager_employee_no', 'notes']
-    
-    headers_kr = ['관리번호(선택)', '소프트웨어명*', '카테고리*', '버전', '유형*',
-                  '측정단위*', '총수량*', '구매일', '구매금액',
-                  '구독시작일', '구독만료일', '자동갱신(Y/N)', '관리담당자사번*', '비고']
+    headers = LICENSE_TEMPLATE_HEADERS
+    headers_kr = LICENSE_TEMPLATE_HEADERS_KR
     
     header_fill = PatternFill(start_color="10B981", end_color="10B981", fill_type="solid")
     header_font = Font(color="FFFFFF", bold=True)
@@ -0,0 +1,227 @@
+"""
+ITAM - Import Jobs
+엑셀 Import를 백그라운드 작업으로 실행 (ImportJob 테이블 + 로컬 워커 풀)
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import settings
+from database import begin_immediate, get_db
+from import_handler import IMPORT_MODES, detect_format, import_hw_assets, import_licenses, import_summary
+
+IMPORTERS = {
+    'asset': import_hw_assets,
+    'license': import_licenses,
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def _pool():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.IMPORT_WORKERS, thread_name_prefix='itam-import')
+        return _executor
+
+# 이 프로세스 워커 풀에 들어가 아직 끝나지 않은 작업 (주기적 재등록 시 같은 작업을 큐에 또 넣지 않도록)
+_queued = set()
+_queued_lock = threading.Lock()
+
+def _submit(job_id):
+    with _queued_lock:
+        if job_id in _queued:
+            return False
+        _queued.add(job_id)
+    _pool().submit(run_job, job_id)
+    return True
+
+def create_import_job_table(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ImportJob (
+            job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_type VARCHAR(20) NOT NULL,
+            mode VARCHAR(20) NOT NULL DEFAULT 'insert',
+            status VARCHAR(20) NOT NULL DEFAULT '대기',
+            file_name VARCHAR(255),
+            file_path VARCHAR(500),
+            rows_processed INTEGER NOT NULL DEFAULT 0,
+            success_count INTEGER NOT NULL DEFAULT 0,
+            error_count INTEGER NOT NULL DEFAULT 0,
+            warning_count INTEGER NOT NULL DEFAULT 0,
+            errors TEXT,
+            warnings TEXT,
+            message TEXT,
+            created_by INTEGER,
+            created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            started_at DATETIME,
+            updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            finished_at DATETIME
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_import_job_status ON ImportJob(status, job_id)")
+
+def job_to_dict(row):
+    job = dict(row)
+    job.pop('file_path', None)
+    job['errors'] = json.loads(job['errors']) if job['errors'] else []
+    job['warnings'] = json.loads(job['warnings']) if job['warnings'] else []
+    return job
+
+def get_job(conn, job_id):
+    row = conn.execute('SELECT * FROM ImportJob WHERE job_id = ?', (job_id,)).fetchone()
+    return job_to_dict(row) if row else None
+
+def submit_import(job_type, stream, file_name=None, created_by=1, mode='insert'):
+    """Save the upload under IMPORT_JOB_DIR, record a '대기' job and queue it; returns job_id."""
+    if job_type not in IMPORTERS:
+        raise ValueError(f"알 수 없는 Import 유형: {job_type}")
+    if mode not in IMPORT_MODES:
+        raise ValueError(f"알 수 없는 Import 모드: {mode}")
+    os.makedirs(settings.IMPORT_JOB_DIR, exist_ok=True)
+    # 확장자를 유지해 워커가 같은 형식(xlsx/csv/ndjson)으로 읽음
+    suffix = {'csv': '.csv', 'ndjson': '.ndjson'}.get(detect_format(file_name), '.xlsx')
+    fd, path = tempfile.mkstemp(prefix=f'{job_type}_', suffix=suffix, dir=settings.IMPORT_JOB_DIR)
+    with os.fdopen(fd, 'wb') as out:
+        shutil.copyfileobj(stream, out)
+
+    conn = get_db()
+    try:
+        job_id = conn.execute('''
+            INSERT INTO ImportJob (job_type, mode, file_name, file_path, created_by)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (job_type, mode, file_name, path, created_by)).lastrowid
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        os.remove(path)
+        raise
+    finally:
+        conn.close()
+
+    _submit(job_id)
+    return job_id
+
+def _record_progress(job_id):
+    def progress(conn, results):
+        # Import 커넥션의 청크 트랜잭션 안에서 실행: 진행률이 커밋된 행 수와 항상 일치
+        conn.execute('''
+            UPDATE ImportJob
+            SET rows_processed = ?, success_count = ?, error_count = ?, warning_count = ?,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE job_id = ?
+        ''', (results['rows_processed'], results['success'], len(results['errors']),
+              len(results['warnings']), job_id))
+    return progress
+
+def _heartbeat_seconds():
+    return max(1, min(60, settings.IMPORT_JOB_STALE_SECONDS // 3))
+
+def _heartbeat(path, stop):
+    # 업로드 파일 mtime을 실행 중 신호로 갱신: DB 쓰기 잠금이 필요 없어 병합 반영처럼
+    # 긴 쓰기 트랜잭션 중이거나 오류 행만 이어져 청크 커밋이 없을 때도 계속 갱신됨
+    while not stop.wait(_heartbeat_seconds()):
+        try:
+            os.utime(path)
+        except OSError:
+            return
+
+def run_job(job_id):
+    """Worker entry: claim a '대기' job, run the importer and store the outcome."""
+    conn = get_db()
+    path = None
+    stop = threading.Event()
+    try:
+        # 같은 작업이 두 번 제출돼도 한 워커만 가져가도록 상태 전이로 선점
+        job = conn.execute('''
+            UPDATE ImportJob
+            SET status = '진행중', started_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
+            WHERE job_id = ? AND status = '대기'
+            RETURNING job_type, mode, file_path
+        ''', (job_id,)).fetchone()
+        conn.commit()
+        if job is None:
+            return
+        path = job['file_path']
+        threading.Thread(target=_heartbeat, args=(path, stop), name=f'itam-import-heartbeat-{job_id}',
+                         daemon=True).start()
+
+        # 종료 상태는 '진행중'일 때만 기록: 복구 처리로 이미 '실패'가 된 작업을 되돌리지 않음
+        try:
+            results = IMPORTERS[job['job_type']](path, progress=_record_progress(job_id), mode=job['mode'],
+                                                 file_format=detect_format(path))
+        except Exception as e:
+            conn.execute('''
+                UPDATE ImportJob
+                SET status = '실패', message = ?, updated_at = CURRENT_TIMESTAMP, finished_at = CURRENT_TIMESTAMP
+                WHERE job_id = ? AND status = '진행중'
+            ''', (str(e), job_id))
+            conn.commit()
+            return
+
+        conn.execute('''
+            UPDATE ImportJob
+            SET status = '완료', rows_processed = ?, success_count = ?, error_count = ?, warning_count = ?,
+                errors = ?, warnings = ?, message = ?,
+                updated_at = CURRENT_TIMESTAMP, finished_at = CURRENT_TIMESTAMP
+            WHERE job_id = ? AND status = '진행중'
+        ''', (results['rows_processed'], results['success'], len(results['errors']), len(results['warnings']),
+              json.dumps(results['errors'], ensure_ascii=False, default=str),
+              json.dumps(results['warnings'], ensure_ascii=False, default=str),
+              import_summary(results), job_id))
+        conn.commit()
+    finally:
+        stop.set()
+        conn.close()
+        with _queued_lock:
+            _queued.discard(job_id)
+        if path and os.path.exists(path):
+            os.remove(path)
+
+def _last_heartbeat(path):
+    try:
+        return os.path.getmtime(path) if path else 0
+    except OSError:
+        return 0
+
+def recover_import_jobs(conn):
+    """Close interrupted jobs and requeue waiting ones; returns (failed, requeued) job counts.
+
+    서버 재시작/워커 종료로 남은 작업 정리: 진행 기록(updated_at)과 실행 중 신호(업로드 파일 mtime)가
+    모두 IMPORT_JOB_STALE_SECONDS 동안 없는 '진행중' 작업은 '실패'로 닫고 업로드 파일을 삭제,
+    '대기' 작업은 이 프로세스 워커 풀에 아직 없을 때만 넣는다
+    (다른 프로세스가 이미 넣은 작업이어도 run_job의 상태 전이 선점으로 한 번만 실행).
+    """
+    stale_after = f'-{settings.IMPORT_JOB_STALE_SECONDS} seconds'
+    begin_immediate(conn)
+    candidates = conn.execute('''
+        SELECT job_id, file_path FROM ImportJob WHERE status = '진행중' AND updated_at < DATETIME('now', ?)
+    ''', (stale_after,)).fetchall()
+    heartbeat_cutoff = time.time() - settings.IMPORT_JOB_STALE_SECONDS
+    stale = [row for row in candidates if _last_heartbeat(row['file_path']) < heartbeat_cutoff]
+    conn.executemany('''
+        UPDATE ImportJob
+        SET status = '실패', message = '서버 재시작 등으로 작업이 중단되었습니다. 파일을 다시 업로드해주세요.',
+            updated_at = CURRENT_TIMESTAMP, finished_at = CURRENT_TIMESTAMP
+        WHERE job_id = ? AND status = '진행중'
+    ''', [(row['job_id'],) for row in stale])
+    waiting = conn.execute("SELECT job_id, file_path FROM ImportJob WHERE status = '대기' ORDER BY job_id").fetchall()
+    missing = [row['job_id'] for row in waiting if not (row['file_path'] and os.path.exists(row['file_path']))]
+    conn.executemany('''
+        UPDATE ImportJob
+        SET status = '실패', message = '업로드 파일이 없어 작업을 실행할 수 없습니다. 파일을 다시 업로드해주세요.',
+            updated_at = CURRENT_TIMESTAMP, finished_at = CURRENT_TIMESTAMP
+        WHERE job_id = ? AND status = '대기'
+    ''', [(job_id,) for job_id in missing])
+    conn.commit()
+
+    for row in stale:
+        if row['file_path'] and os.path.exists(row['file_path']):
+            os.remove(row['file_path'])
+    requeued = [row['job_id'] for row in waiting if row['job_id'] not in missing and _submit(row['job_id'])]
+    return len(stale) + len(missing), len(requeued)
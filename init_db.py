@@ -5,13 +5,14 @@ Phase1-01: DB Schema + Phase1-02: Initial Data
 import sqlite3
 from datetime import datetime, date
 
-DB_PATH = 'itam_prod.db'
+import settings
+from database import get_db
+from migrations import migrate
+
+DB_PATH = settings.DB_PATH
 
 def get_connection():
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("PRAGMA foreign_keys = ON")
-    conn.row_factory = sqlite3.Row
-    return conn
+    return get_db()
 
 def create_tables():
     """Create all tables according to PRD v2.0 Data Model"""
@@ -805,6 +806,7 @@ def main():
     create_tables()
     insert_initial_data()
     insert_sample_data()
+    migrate()
     print("🎉 모든 초기화 작업 완료!")
     print(f"📁 Database: {DB_PATH}")
 
@@ -0,0 +1,260 @@
+"""
+ITAM - License Key Helpers
+라이선스 키 목록 파싱/정규화 및 키/할당 카운터
+"""
+import json
+import re
+from datetime import date
+
+_KEY_SEPARATORS = re.compile(r'[\r\n,;]+')
+
+def iter_license_keys(lines):
+    """Yield stripped keys from an iterable of text lines (file stream); no dedupe."""
+    for line in lines:
+        for token in _KEY_SEPARATORS.split(line):
+            key = token.strip()
+            if key:
+                yield key
+
+def normalize_license_keys(raw_text):
+    """Parse bulk key text into unique key list preserving order."""
+    if raw_text is None:
+        return []
+    return list(dict.fromkeys(iter_license_keys([str(raw_text)])))
+
+def reconcile_license_keys(conn, license_id, keys, deprecate_missing=True):
+    """Bring LicenseKey rows for license_id in line with keys (any iterable, streamed).
+
+    Keys are bulk-loaded into a temp table and applied as set-based
+    statements: insert new, reactivate '폐기', and (when deprecate_missing)
+    retire keys absent from the list. Assigned keys are never retired.
+    """
+    today = date.today().isoformat()
+    conn.execute('DROP TABLE IF EXISTS temp.desired_keys')
+    conn.execute('''
+        CREATE TEMP TABLE desired_keys (
+            seq INTEGER PRIMARY KEY,
+            key_value TEXT NOT NULL UNIQUE
+        )
+    ''')
+    conn.executemany('INSERT OR IGNORE INTO temp.desired_keys (key_value) VALUES (?)', ((key,) for key in keys))
+
+    result = {'inserted': 0, 'reactivated': 0, 'deprecated': 0, 'assigned_kept': []}
+    result['inserted'] = conn.execute('''
+        INSERT INTO LicenseKey (license_id, key_value, key_status)
+        SELECT ?, d.key_value, '가용'
+        FROM temp.desired_keys d
+        WHERE NOT EXISTS (SELECT 1 FROM LicenseKey k WHERE k.license_id = ? AND k.key_value = d.key_value)
+        ORDER BY d.seq
+    ''', (license_id, license_id)).rowcount
+    result['reactivated'] = conn.execute('''
+        UPDATE LicenseKey
+        SET key_status = '가용', revoked_date = NULL, notes = NULL
+        WHERE license_id = ? AND key_status = '폐기'
+          AND key_value IN (SELECT key_value FROM temp.desired_keys)
+    ''', (license_id,)).rowcount
+    if deprecate_missing:
+        result['assigned_kept'] = [row[0] for row in conn.execute('''
+            SELECT key_value
+            FROM LicenseKey
+            WHERE license_id = ? AND key_status = '할당'
+              AND key_value NOT IN (SELECT key_value FROM temp.desired_keys)
+            ORDER BY license_key_id
+        ''', (license_id,))]
+        result['deprecated'] = conn.execute('''
+            UPDATE LicenseKey
+            SET key_status = '폐기', revoked_date = ?, notes = '라이선스 수정으로 비활성화'
+            WHERE license_id = ? AND key_status NOT IN ('폐기', '할당')
+              AND key_value NOT IN (SELECT key_value FROM temp.desired_keys)
+        ''', (today, license_id)).rowcount
+    conn.execute('DROP TABLE temp.desired_keys')
+    return result
+
+# ========================================
+# 가용 키 할당 (idx_license_key_free 부분 인덱스 사용)
+# ========================================
+def claim_available_keys(conn, license_id, count=1, today=None):
+    """Atomically flip up to count available keys to '할당'; returns claimed rows in key order.
+
+    Call inside a write transaction (database.begin_immediate) so concurrent
+    assigns serialize on the lock instead of racing for the same key.
+    """
+    rows = conn.execute('''
+        UPDATE LicenseKey
+        SET key_status = '할당', assigned_date = COALESCE(?, DATE('now')), revoked_date = NULL
+        WHERE license_key_id IN (
+            SELECT license_key_id
+            FROM LicenseKey
+            WHERE license_id = ? AND key_status = '가용'
+            ORDER BY license_key_id
+            LIMIT ?
+        ) AND key_status = '가용'
+        RETURNING license_key_id, key_value
+    ''', (today, license_id, count)).fetchall()
+    return sorted(rows, key=lambda row: row['license_key_id'])
+
+# ========================================
+# 키/할당 카운터 (SoftwareLicense 컬럼, 트리거로 증분 유지)
+# ========================================
+COUNTER_COLUMNS = ('key_total_count', 'key_available_count', 'key_assigned_count', 'active_assignment_count')
+
+def create_counter_triggers(conn):
+    key_delta = {
+        'key_total_count': "({row}.key_status != '폐기')",
+        'key_available_count': "({row}.key_status = '가용')",
+        'key_assigned_count': "({row}.key_status = '할당')",
+    }
+
+    def key_update(row, sign):
+        sets = ', '.join(f"{col} = {col} {sign} {expr.format(row=row)}" for col, expr in key_delta.items())
+        return f"UPDATE SoftwareLicense SET {sets} WHERE license_id = {row}.license_id;"
+
+    def assignment_update(row, sign):
+        return (f"UPDATE SoftwareLicense SET active_assignment_count = active_assignment_count {sign} ({row}.is_active = 1) "
+                f"WHERE license_id = {row}.license_id;")
+
+    triggers = {
+        'trg_license_key_count_ai': ('AFTER INSERT ON LicenseKey', [key_update('NEW', '+')]),
+        'trg_license_key_count_ad': ('AFTER DELETE ON LicenseKey', [key_update('OLD', '-')]),
+        'trg_license_key_count_au': (
+            'AFTER UPDATE OF key_status, license_id ON LicenseKey '
+            'WHEN OLD.key_status IS NOT NEW.key_status OR OLD.license_id != NEW.license_id',
+            [key_update('OLD', '-'), key_update('NEW', '+')]),
+        'trg_assignment_count_ai': ('AFTER INSERT ON LicenseAssignment', [assignment_update('NEW', '+')]),
+        'trg_assignment_count_ad': ('AFTER DELETE ON LicenseAssignment', [assignment_update('OLD', '-')]),
+        'trg_assignment_count_au': (
+            'AFTER UPDATE OF is_active, license_id ON LicenseAssignment '
+            'WHEN OLD.is_active IS NOT NEW.is_active OR OLD.license_id != NEW.license_id',
+            [assignment_update('OLD', '-'), assignment_update('NEW', '+')]),
+    }
+    for name, (event, body) in triggers.items():
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN {' '.join(body)} END")
+
+def counter_drift(conn):
+    """Recount keys/assignments and return licenses whose stored counters differ."""
+    rows = conn.execute('''
+        WITH k AS (
+            SELECT license_id,
+                   SUM(key_status != '폐기') AS key_total_count,
+                   SUM(key_status = '가용') AS key_available_count,
+                   SUM(key_status = '할당') AS key_assigned_count
+            FROM LicenseKey
+            GROUP BY license_id
+        ), a AS (
+            SELECT license_id, COUNT(*) AS active_assignment_count
+            FROM LicenseAssignment
+            WHERE is_active = 1
+            GROUP BY license_id
+        )
+        SELECT sl.license_id, sl.license_number,
+               sl.key_total_count, COALESCE(k.key_total_count, 0) AS expected_key_total_count,
+               sl.key_available_count, COALESCE(k.key_available_count, 0) AS expected_key_available_count,
+               sl.key_assigned_count, COALESCE(k.key_assigned_count, 0) AS expected_key_assigned_count,
+               sl.active_assignment_count, COALESCE(a.active_assignment_count, 0) AS expected_active_assignment_count
+        FROM SoftwareLicense sl
+        LEFT JOIN k ON k.license_id = sl.license_id
+        LEFT JOIN a ON a.license_id = sl.license_id
+    ''').fetchall()
+    drift = []
+    for row in rows:
+        diffs = {col: {'stored': row[col], 'expected': row[f'expected_{col}']}
+                 for col in COUNTER_COLUMNS if row[col] != row[f'expected_{col}']}
+        if diffs:
+            drift.append({'license_id': row['license_id'], 'license_number': row['license_number'], 'diffs': diffs})
+    return drift
+
+def fix_counter_drift(conn, drift):
+    conn.executemany(f'''
+        UPDATE SoftwareLicense
+        SET {', '.join(f'{col} = COALESCE(?, {col})' for col in COUNTER_COLUMNS)}
+        WHERE license_id = ?
+    ''', [tuple(item['diffs'].get(col, {}).get('expected') for col in COUNTER_COLUMNS) + (item['license_id'],)
+          for item in drift])
+
+# ========================================
+# 전체 수량/컴플라이언스 재계산 (집합 단위)
+# ========================================
+def recompute_license_quantities(conn, counters=True, license_ids=None):
+    """Recompute quantities/compliance (and counters) for all licenses in one pass.
+
+    Aggregates LicenseKey/LicenseAssignment once into a temp table and
+    applies it with a single UPDATE ... FROM; only rows that actually
+    change are written. With license_ids the aggregate (and so the
+    UPDATE) is limited to those licenses. Returns the number of updated
+    licenses.
+    """
+    if license_ids is None:
+        scope, params = '', {}
+    else:
+        scope, params = 'license_id IN (SELECT value FROM json_each(:ids))', {'ids': json.dumps(list(license_ids))}
+    conn.execute('DROP TABLE IF EXISTS temp.license_agg')
+    conn.execute('''
+        CREATE TEMP TABLE license_agg (
+            license_id INTEGER PRIMARY KEY,
+            key_total INTEGER NOT NULL,
+            key_available INTEGER NOT NULL,
+            key_assigned INTEGER NOT NULL,
+            active_assignments INTEGER NOT NULL,
+            total INTEGER NOT NULL,
+            used INTEGER NOT NULL
+        )
+    ''')
+    conn.execute(f'''
+        WITH k AS (
+            SELECT license_id,
+                   SUM(key_status != '폐기') AS key_total,
+                   SUM(key_status = '가용') AS key_available,
+                   SUM(key_status = '할당') AS key_assigned
+            FROM LicenseKey
+            {f'WHERE {scope}' if scope else ''}
+            GROUP BY license_id
+        ), a AS (
+            SELECT license_id, COUNT(*) AS active_assignments
+            FROM LicenseAssignment
+            WHERE is_active = 1 {f'AND {scope}' if scope else ''}
+            GROUP BY license_id
+        ), g AS (
+            SELECT sl.license_id, sl.total_quantity,
+                   COALESCE(k.key_total, 0) AS key_total,
+                   COALESCE(k.key_available, 0) AS key_available,
+                   COALESCE(k.key_assigned, 0) AS key_assigned,
+                   COALESCE(a.active_assignments, 0) AS active_assignments
+            FROM SoftwareLicense sl
+            LEFT JOIN k ON k.license_id = sl.license_id
+            LEFT JOIN a ON a.license_id = sl.license_id
+            {f'WHERE sl.{scope}' if scope else ''}
+        )
+        INSERT INTO temp.license_agg
+        SELECT license_id, key_total, key_available, key_assigned, active_assignments,
+               CASE WHEN key_total > 0 THEN key_total ELSE COALESCE(total_quantity, 0) END,
+               CASE WHEN key_total > 0 THEN MAX(key_assigned, active_assignments) ELSE active_assignments END
+        FROM g
+    ''', params)
+
+    sets = [
+        'total_quantity = g.total',
+        'used_quantity = g.used',
+        'available_quantity = g.total - g.used',
+        "compliance_status = CASE WHEN g.total - g.used >= 0 THEN '정상' ELSE '초과' END",
+    ]
+    checks = [
+        'total_quantity IS NOT g.total',
+        'used_quantity IS NOT g.used',
+        'available_quantity IS NOT g.total - g.used',
+        "compliance_status IS NOT CASE WHEN g.total - g.used >= 0 THEN '정상' ELSE '초과' END",
+    ]
+    if counters:
+        for column, source in zip(COUNTER_COLUMNS, ('key_total', 'key_available', 'key_assigned', 'active_assignments')):
+            sets.append(f'{column} = g.{source}')
+            checks.append(f'{column} IS NOT g.{source}')
+    cursor = conn.execute(f'''
+        UPDATE SoftwareLicense
+        SET {', '.join(sets)}, updated_at = CURRENT_TIMESTAMP
+        FROM temp.license_agg g
+        WHERE g.license_id = SoftwareLicense.license_id
+          AND ({' OR '.join(checks)})
+    ''')
+    updated = cursor.rowcount
+    conn.execute('DROP TABLE temp.license_agg')
+    return updated
+
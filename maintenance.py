@@ -0,0 +1,68 @@
+"""
+ITAM - Maintenance Commands
+운영 점검용 CLI (python maintenance.py <command>)
+"""
+import argparse
+import sys
+import time
+
+from database import begin_immediate, get_db
+from license_keys import counter_drift, fix_counter_drift, recompute_license_quantities
+
+def verify_counters(fix=False):
+    """Recount license key/assignment counters and report (optionally fix) drift."""
+    conn = get_db()
+    try:
+        if fix:
+            # 보정은 조회한 불일치 값 그대로 쓰므로 조회 전에 쓰기 잠금 (사이에 할당이 바뀌지 않도록)
+            begin_immediate(conn)
+        drift = counter_drift(conn)
+        if not drift:
+            print("✅ 라이선스 카운터 정상")
+            return 0
+
+        print(f"⚠️ 카운터 불일치 {len(drift)}건")
+        for item in drift:
+            diffs = ', '.join(f"{col} {d['stored']}→{d['expected']}" for col, d in item['diffs'].items())
+            print(f"   - [{item['license_id']}] {item['license_number']}: {diffs}")
+
+        if fix:
+            fix_counter_drift(conn, drift)
+            conn.commit()
+            print(f"🔧 {len(drift)}건 보정 완료")
+            return 0
+        return 1
+    finally:
+        conn.close()
+
+def recompute_licenses():
+    """Set-based recompute of quantities, compliance and counters for every license."""
+    conn = get_db()
+    try:
+        begin_immediate(conn)
+        started = time.monotonic()
+        updated = recompute_license_quantities(conn)
+        conn.commit()
+        print(f"✅ 라이선스 재계산 완료: {updated}건 갱신 ({int((time.monotonic() - started) * 1000)}ms)")
+        return 0
+    finally:
+        conn.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='ITAM maintenance commands')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('verify-counters', help='라이선스 키/할당 카운터 재계산 및 불일치 보고')
+    p.add_argument('--fix', action='store_true', help='불일치 값을 재계산 값으로 보정')
+
+    sub.add_parser('recompute-licenses', help='전체 라이선스 수량/컴플라이언스/카운터 일괄 재계산')
+
+    args = parser.parse_args(argv)
+    if args.command == 'verify-counters':
+        return verify_counters(fix=args.fix)
+    if args.command == 'recompute-licenses':
+        return recompute_licenses()
+    return 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,355 @@
+"""
+ITAM - Schema Migrations
+버전 기반 스키마 마이그레이션 (schema_version 테이블)
+"""
+import time
+
+from asset_search import create_search_index, fts5_trigram_supported
+from database import get_db
+from export_cache import create_data_version_table
+from import_jobs import create_import_job_table
+from license_keys import (COUNTER_COLUMNS, counter_drift, create_counter_triggers, fix_counter_drift,
+                          normalize_license_keys, recompute_license_quantities)
+from notification_checker import create_notification_dedup_index, create_notification_tracking
+from scheduler import create_scheduler_table
+from sequences import create_sequence_table
+
+def _table_exists(conn, name):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (name,)
+    ).fetchone() is not None
+
+def _columns(conn, table):
+    return [info[1] for info in conn.execute(f"PRAGMA table_info({table})").fetchall()]
+
+# ========================================
+# Migrations (순서대로, 멱등하게 작성)
+# ========================================
+def m001_license_status(conn):
+    if 'license_status' not in _columns(conn, 'SoftwareLicense'):
+        conn.execute("ALTER TABLE SoftwareLicense ADD COLUMN license_status VARCHAR(20) NOT NULL DEFAULT '활성'")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_license_status ON SoftwareLicense(license_status)")
+
+def m002_license_key_inventory(conn):
+    # Key inventory table for per-key lifecycle management.
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS LicenseKey (
+            license_key_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            license_id INTEGER NOT NULL,
+            key_value VARCHAR(500) NOT NULL,
+            key_status VARCHAR(20) NOT NULL DEFAULT '가용',
+            assigned_assignment_id INTEGER,
+            assigned_date DATE,
+            revoked_date DATE,
+            notes TEXT,
+            created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(license_id, key_value),
+            FOREIGN KEY (license_id) REFERENCES SoftwareLicense(license_id),
+            FOREIGN KEY (assigned_assignment_id) REFERENCES LicenseAssignment(assignment_id)
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_license_key_license ON LicenseKey(license_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_license_key_status ON LicenseKey(key_status)")
+
+    # Link assignment row to allocated key.
+    if _table_exists(conn, 'LicenseAssignment') and 'license_key_id' not in _columns(conn, 'LicenseAssignment'):
+        conn.execute("ALTER TABLE LicenseAssignment ADD COLUMN license_key_id INTEGER")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_assignment_licensekey ON LicenseAssignment(license_key_id)")
+
+def m003_backfill_legacy_keys(conn):
+    # Backfill keys from legacy SoftwareLicense.license_key field.
+    legacy_rows = conn.execute('''
+        SELECT license_id, license_key
+        FROM SoftwareLicense
+        WHERE COALESCE(TRIM(license_key), '') != ''
+    ''').fetchall()
+    for license_id, legacy_text in legacy_rows:
+        conn.executemany('''
+            INSERT OR IGNORE INTO LicenseKey (license_id, key_value, key_status)
+            VALUES (?, ?, '가용')
+        ''', [(license_id, key) for key in normalize_license_keys(legacy_text)])
+
+    # Map active assignments to available keys when assignment link is empty.
+    license_ids = [row[0] for row in conn.execute(
+        "SELECT license_id FROM SoftwareLicense WHERE is_deleted = 0"
+    ).fetchall()]
+    for license_id in license_ids:
+        assignment_ids = [row[0] for row in conn.execute('''
+            SELECT assignment_id
+            FROM LicenseAssignment
+            WHERE license_id = ? AND is_active = 1 AND license_key_id IS NULL
+            ORDER BY assignment_id
+        ''', (license_id,)).fetchall()]
+        key_ids = [row[0] for row in conn.execute('''
+            SELECT license_key_id
+            FROM LicenseKey
+            WHERE license_id = ? AND key_status = '가용'
+            ORDER BY license_key_id
+        ''', (license_id,)).fetchall()]
+        for assignment_id, license_key_id in zip(assignment_ids, key_ids):
+            conn.execute('''
+                UPDATE LicenseAssignment
+                SET license_key_id = ?
+                WHERE assignment_id = ?
+            ''', (license_key_id, assignment_id))
+            conn.execute('''
+                UPDATE LicenseKey
+                SET key_status = '할당',
+                    assigned_assignment_id = ?,
+                    assigned_date = COALESCE(assigned_date, DATE('now'))
+                WHERE license_key_id = ?
+            ''', (assignment_id, license_key_id))
+
+        # Keep quantity fields consistent after the backfill.
+        key_total = conn.execute('''
+            SELECT COUNT(*)
+            FROM LicenseKey
+            WHERE license_id = ? AND key_status != '폐기'
+        ''', (license_id,)).fetchone()[0]
+        assigned_key_count = conn.execute('''
+            SELECT COUNT(*)
+            FROM LicenseKey
+            WHERE license_id = ? AND key_status = '할당'
+        ''', (license_id,)).fetchone()[0]
+        active_assign_count = conn.execute('''
+            SELECT COUNT(*)
+            FROM LicenseAssignment
+            WHERE license_id = ? AND is_active = 1
+        ''', (license_id,)).fetchone()[0]
+        current_total = conn.execute('''
+            SELECT total_quantity
+            FROM SoftwareLicense
+            WHERE license_id = ?
+        ''', (license_id,)).fetchone()[0]
+        if key_total > 0:
+            total = key_total
+            used = max(assigned_key_count, active_assign_count)
+        else:
+            total = current_total
+            used = active_assign_count
+        available = total - used
+        compliance = '정상' if available >= 0 else '초과'
+        conn.execute('''
+            UPDATE SoftwareLicense
+            SET total_quantity = ?, used_quantity = ?, available_quantity = ?, compliance_status = ?,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE license_id = ?
+        ''', (total, used, available, compliance, license_id))
+
+def m004_asset_search_index(conn):
+    if not fts5_trigram_supported(conn):
+        print("⚠️ SQLite FTS5 trigram 미지원 - 자산 키워드 검색은 LIKE로 동작합니다")
+        return
+    create_search_index(conn)
+
+def m005_number_sequences(conn):
+    # prefix별 카운터는 첫 채번 시 기존 번호의 최댓값으로 시드됨
+    create_sequence_table(conn)
+
+def m006_license_counters(conn):
+    existing = _columns(conn, 'SoftwareLicense')
+    for column in COUNTER_COLUMNS:
+        if column not in existing:
+            conn.execute(f"ALTER TABLE SoftwareLicense ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+    create_counter_triggers(conn)
+    # 트리거 생성 전 데이터는 한 번 전체 재계산
+    fix_counter_drift(conn, counter_drift(conn))
+
+def m007_license_key_free_index(conn):
+    # 가용 키만 담는 부분 인덱스: 할당 시 이미 할당된 키를 건너뛰며 스캔하지 않음
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_license_key_free
+        ON LicenseKey(license_id, license_key_id)
+        WHERE key_status = '가용'
+    ''')
+
+def m008_license_aggregate_indexes(conn):
+    # 라이선스별 집계(GROUP BY license_id)를 커버링 인덱스 스캔으로 처리
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_license_key_license_status ON LicenseKey(license_id, key_status)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_assignment_license_active ON LicenseAssignment(license_id, is_active)")
+    # 단일 컬럼 idx_license_key_license는 유지 (키 목록 페이지가 license_key_id 순 정렬에 사용, v10 참고)
+
+def m009_clear_legacy_key_text(conn):
+    # LicenseKey로 이관된 키 원문 제거: 카운터 트리거가 갱신하는 SoftwareLicense 행을 작게 유지
+    conn.execute('''
+        UPDATE SoftwareLicense
+        SET license_key = NULL
+        WHERE license_key IS NOT NULL
+          AND EXISTS (SELECT 1 FROM LicenseKey lk WHERE lk.license_id = SoftwareLicense.license_id)
+    ''')
+
+def m010_license_key_page_index(conn):
+    # 키 목록 페이지(license_id 조건, license_key_id 순)를 정렬 없이 처리
+    # (이전 v8이 지웠던 DB에서만 다시 생성, 그 외에는 변경 없음)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_license_key_license ON LicenseKey(license_id)")
+
+def m011_import_jobs(conn):
+    # 백그라운드 Import 작업 상태/진행률
+    create_import_job_table(conn)
+
+def m012_import_job_mode(conn):
+    if 'mode' not in _columns(conn, 'ImportJob'):
+        conn.execute("ALTER TABLE ImportJob ADD COLUMN mode VARCHAR(20) NOT NULL DEFAULT 'insert'")
+
+def m013_data_version(conn):
+    # 자산/라이선스 데이터 버전: 쓰기 트리거가 올리고 Export 캐시 키로 사용
+    create_data_version_table(conn)
+
+def m014_notification_check_indexes(conn):
+    # 알림 체크의 날짜 조건(IN/범위)과 EOS 조인을 인덱스 탐색으로 처리
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_asset_warranty_end ON Asset(warranty_end)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_asset_useful_life_expire ON Asset(useful_life_expire_date)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_asset_eos ON Asset(eos_id)")
+
+def m015_notification_dedup_key(conn):
+    # DATE(created_at) 스캔 대신 (유형, 참조, 날짜) UNIQUE 키로 중복 알림 방지
+    create_notification_dedup_index(conn)
+
+def m016_scheduler_jobs(conn):
+    # 스케줄러 작업별 일정/임대 잠금/최근 실행 결과
+    create_scheduler_table(conn)
+
+def m017_notification_tracking(conn):
+    # 알림 증분 평가: 조건 컬럼 변경 대상(dirty set)과 체크별 high-water mark
+    create_notification_tracking(conn)
+    # EOS 경과 조회가 EOSInfo(날짜 범위) → Asset(idx_asset_eos) 순서로 풀리도록
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_eos_date ON EOSInfo(eos_date)")
+
+def m018_link_unpaired_assignments(conn):
+    # v3 백필과 같은 규칙(라이선스별 n번째 미연결 활성 할당 <-> n번째 가용 키)을 루프 대신 한 번의 집합 연산으로 재적용:
+    # v3 이후 키 없이 남은 활성 할당을 연결하고, 수량/컴플라이언스/카운터를 재계산
+    conn.execute('DROP TABLE IF EXISTS temp.key_pairing')
+    conn.execute('''
+        CREATE TEMP TABLE key_pairing AS
+        WITH a AS (
+            SELECT la.assignment_id, la.license_id,
+                   ROW_NUMBER() OVER (PARTITION BY la.license_id ORDER BY la.assignment_id) AS rn
+            FROM LicenseAssignment la
+            JOIN SoftwareLicense sl ON sl.license_id = la.license_id AND sl.is_deleted = 0
+            WHERE la.is_active = 1 AND la.license_key_id IS NULL
+        ), k AS (
+            SELECT license_key_id, license_id,
+                   ROW_NUMBER() OVER (PARTITION BY license_id ORDER BY license_key_id) AS rn
+            FROM LicenseKey
+            WHERE key_status = '가용'
+        )
+        SELECT a.assignment_id, k.license_key_id
+        FROM a JOIN k ON k.license_id = a.license_id AND k.rn = a.rn
+    ''')
+    conn.execute('''
+        UPDATE LicenseAssignment
+        SET license_key_id = p.license_key_id
+        FROM temp.key_pairing p
+        WHERE p.assignment_id = LicenseAssignment.assignment_id
+    ''')
+    conn.execute('''
+        UPDATE LicenseKey
+        SET key_status = '할당',
+            assigned_assignment_id = p.assignment_id,
+            assigned_date = COALESCE(assigned_date, DATE('now'))
+        FROM temp.key_pairing p
+        WHERE p.license_key_id = LicenseKey.license_key_id
+    ''')
+    conn.execute('DROP TABLE temp.key_pairing')
+
+    # 수량/컴플라이언스/카운터를 집합 단위로 한 번에 맞춤
+    recompute_license_quantities(conn)
+
+def m019_data_version_dirty_flag(conn):
+    # v13 트리거는 행마다 version을 올려 대량 쓰기 때 같은 행을 반복 갱신 → dirty 표시(이미 표시면 쓰기 없음)로 교체,
+    # 버전 증가는 Export 시점에 한 번 (export_cache.settle_data_version)
+    if 'dirty' not in _columns(conn, 'DataVersion'):
+        conn.execute("ALTER TABLE DataVersion ADD COLUMN dirty INTEGER NOT NULL DEFAULT 0")
+    for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_data_version_%'").fetchall():
+        conn.execute(f"DROP TRIGGER {name}")
+    create_data_version_table(conn)
+
+MIGRATIONS = [
+    (1, 'SoftwareLicense.license_status 추가', m001_license_status),
+    (2, 'LicenseKey 인벤토리 테이블', m002_license_key_inventory),
+    (3, '레거시 license_key 백필 및 수량 동기화', m003_backfill_legacy_keys),
+    (4, '자산 키워드 검색 FTS5 인덱스', m004_asset_search_index),
+    (5, '자산/라이선스 번호 채번 카운터', m005_number_sequences),
+    (6, '라이선스 키/할당 카운터 컬럼 및 트리거', m006_license_counters),
+    (7, '가용 라이선스 키 부분 인덱스', m007_license_key_free_index),
+    (8, '라이선스 집계용 커버링 인덱스', m008_license_aggregate_indexes),
+    (9, '이관 완료된 레거시 license_key 원문 정리', m009_clear_legacy_key_text),
+    (10, '라이선스 키 목록 페이지 인덱스', m010_license_key_page_index),
+    (11, '백그라운드 Import 작업 테이블', m011_import_jobs),
+    (12, 'Import 작업 모드(insert/merge)', m012_import_job_mode),
+    (13, 'Export 캐시용 데이터 버전 테이블/트리거', m013_data_version),
+    (14, '알림 체크용 자산 날짜/EOS 인덱스', m014_notification_check_indexes),
+    (15, '알림 중복 방지 키(dedup_key) UNIQUE 인덱스', m015_notification_dedup_key),
+    (16, '스케줄러 작업 테이블', m016_scheduler_jobs),
+    (17, '알림 증분 평가용 변경 추적 테이블/트리거', m017_notification_tracking),
+    (18, '미연결 활성 할당-가용 키 연결 및 수량 재계산 (집합 단위)', m018_link_unpaired_assignments),
+    (19, 'Export 데이터 버전 트리거를 dirty 표시 방식으로 교체', m019_data_version_dirty_flag),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+# ========================================
+# Runner
+# ========================================
+def ensure_version_table(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name VARCHAR(200) NOT NULL,
+            applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            duration_ms INTEGER
+        )
+    ''')
+
+def current_version(conn):
+    if not _table_exists(conn, 'schema_version'):
+        return 0
+    return conn.execute('SELECT COALESCE(MAX(version), 0) FROM schema_version').fetchone()[0]
+
+def migrate(conn=None, verbose=True):
+    """Apply pending migrations in order; returns applied version numbers."""
+    own_conn = conn is None
+    if own_conn:
+        conn = get_db()
+    applied = []
+    try:
+        # 기본 스키마가 없으면 init_db.py가 먼저 실행되어야 함
+        if not _table_exists(conn, 'SoftwareLicense'):
+            return applied
+        if current_version(conn) >= LATEST_VERSION:
+            return applied
+
+        ensure_version_table(conn)
+        for version, name, func in MIGRATIONS:
+            # 워커 여러 개가 동시에 기동해도 한 번만 적용되도록 쓰기 잠금 후 재확인
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                if conn.execute('SELECT 1 FROM schema_version WHERE version = ?', (version,)).fetchone():
+                    conn.rollback()
+                    continue
+                if verbose:
+                    print(f"🔄 Migrating: v{version} {name}")
+                started = time.monotonic()
+                func(conn)
+                conn.execute('''
+                    INSERT INTO schema_version (version, name, duration_ms)
+                    VALUES (?, ?, ?)
+                ''', (version, name, int((time.monotonic() - started) * 1000)))
+                conn.commit()
+                applied.append(version)
+            except Exception:
+                conn.rollback()
+                raise
+        return applied
+    finally:
+        if own_conn:
+            conn.close()
+
+def migration_status(conn):
+    ensure_version_table(conn)
+    applied = {row['version']: row for row in conn.execute('SELECT * FROM schema_version').fetchall()}
+    return [{
+        'version': version,
+        'name': name,
+        'applied_at': applied[version]['applied_at'] if version in applied else None,
+        'duration_ms': applied[version]['duration_ms'] if version in applied else None,
+    } for version, name, _ in MIGRATIONS]
@@ -2,185 +2,322 @@
 ITAM - Notification Checker
 알림 자동 생성 배치 모듈
 """
-import sqlite3
-from datetime import datetime, date, timedelta
+import time
+from datetime import date, timedelta
 
-DB_PATH = 'itam.db'
+from database import begin_immediate, get_db
 
-def get_db():
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("PRAGMA foreign_keys = ON")
-    conn.row_factory = sqlite3.Row
-    return conn
+# 만료 임박 알림 시점 (D-n) → 심각도
+LICENSE_ALERT_DAYS = {60: 'warning', 30: 'warning', 14: 'warning', 7: 'critical', 1: 'critical'}
+WARRANTY_ALERT_DAYS = {90: 'info', 30: 'warning', 7: 'critical'}
+
+def dedup_key_expr(type_expr, ref_type_expr, ref_id_expr, created_expr):
+    """SQL expression for Notification.dedup_key: '유형:참조유형:참조ID:날짜' (참조 없는 알림은 NULL)."""
+    return (f"CASE WHEN {ref_id_expr} IS NULL THEN NULL "
+            f"ELSE {type_expr} || ':' || COALESCE({ref_type_expr}, '') || ':' || {ref_id_expr} "
+            f"|| ':' || DATE({created_expr}) END")
+
+def create_notification_dedup_index(conn):
+    """dedup_key 컬럼 추가, 기존 알림 백필, UNIQUE 인덱스 생성"""
+    if 'dedup_key' not in [info[1] for info in conn.execute("PRAGMA table_info(Notification)")]:
+        conn.execute("ALTER TABLE Notification ADD COLUMN dedup_key VARCHAR(100)")
+    # 같은 날 중복으로 쌓인 과거 알림은 가장 먼저 생성된 건에만 키를 채움
+    conn.execute(f'''
+        UPDATE Notification
+        SET dedup_key = {dedup_key_expr('notification_type', 'reference_type', 'reference_id', 'created_at')}
+        WHERE notification_id IN (
+            SELECT MIN(notification_id) FROM Notification
+            WHERE reference_id IS NOT NULL
+            GROUP BY notification_type, reference_type, reference_id, DATE(created_at)
+        )
+    ''')
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_notification_dedup ON Notification(dedup_key)")
 
 def create_notification(conn, notification_type, severity, target_user_id, title, message, ref_type=None, ref_id=None):
     """알림 생성 (중복 방지)"""
-    cursor = conn.cursor()
-    # 같은 날 동일 유형+대상 알림이 있으면 스킵
-    existing = cursor.execute('''
-        SELECT 1 FROM Notification 
-        WHERE notification_type = ? AND reference_type = ? AND reference_id = ? 
-        AND DATE(created_at) = DATE('now')
-    ''', (notification_type, ref_type, ref_id)).fetchone()
-    
-    if not existing:
-        cursor.execute('''
-            INSERT INTO Notification (notification_type, severity, target_user_id, title, message, 
-                                       reference_type, reference_id, is_read, is_sent)
-            VALUES (?, ?, ?, ?, ?, ?, ?, 0, 0)
-        ''', (notification_type, severity, target_user_id, title, message, ref_type, ref_id))
-        return True
-    return False
-
-def check_license_expiring():
+    return insert_notifications(conn, [(notification_type, severity, target_user_id, title, message, ref_type, ref_id)]) > 0
+
+def insert_notifications(conn, rows):
+    """알림 일괄 생성 (중복 방지), 생성 건수 반환
+
+    rows: (notification_type, severity, target_user_id, title, message, ref_type, ref_id)
+    같은 날 동일 유형+대상 알림은 dedup_key UNIQUE 인덱스 충돌로 건너뛴다.
+    """
+    if not rows:
+        return 0
+    cursor = conn.executemany(f'''
+        INSERT INTO Notification (notification_type, severity, target_user_id, title, message,
+                                   reference_type, reference_id, is_read, is_sent, dedup_key)
+        VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, 0, 0, {dedup_key_expr('?1', '?6', '?7', "'now'")})
+        ON CONFLICT (dedup_key) DO NOTHING
+    ''', rows)
+    return cursor.rowcount
+
+# ========================================
+# 변경 추적 (증분 평가)
+# ========================================
+# 알림 조건에 쓰이는 컬럼이 바뀐 대상만 NotificationDirty에 기록 (INSERT OR REPLACE로 새 change_id 부여)
+DIRTY_SOURCES = [
+    ('Asset', 'ASSET', 'asset_id', ['warranty_end', 'useful_life_expire_date', 'eos_id', 'is_deleted']),
+    ('SoftwareLicense', 'LICENSE', 'license_id',
+     ['subscription_end', 'is_subscription', 'is_deleted', 'used_quantity', 'total_quantity']),
+    ('EOSInfo', 'EOS', 'eos_id', ['eos_date']),
+]
+
+def create_notification_tracking(conn):
+    """NotificationDirty(변경 대상) / NotificationCheckState(체크별 high-water mark) 테이블과 트리거"""
+    # AUTOINCREMENT: 처리한 행을 지운 뒤에도 change_id가 high-water mark 아래로 재사용되지 않음
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS NotificationDirty (
+            change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            reference_type VARCHAR(20) NOT NULL,
+            reference_id INTEGER NOT NULL,
+            UNIQUE (reference_type, reference_id)
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS NotificationCheckState (
+            check_name VARCHAR(50) PRIMARY KEY,
+            last_run_date DATE NOT NULL,
+            last_change_id INTEGER NOT NULL DEFAULT 0,
+            updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    for table, ref_type, key, columns in DIRTY_SOURCES:
+        mark = (f"INSERT OR REPLACE INTO NotificationDirty (reference_type, reference_id) "
+                f"VALUES ('{ref_type}', NEW.{key});")
+        changed = ' OR '.join(f"OLD.{col} IS NOT NEW.{col}" for col in columns)
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_notification_dirty_{table.lower()}_ai
+            AFTER INSERT ON {table} BEGIN {mark} END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_notification_dirty_{table.lower()}_au
+            AFTER UPDATE OF {', '.join(columns)} ON {table} WHEN {changed} BEGIN {mark} END
+        ''')
+
+class CheckRun:
+    """체크 한 번의 평가 범위
+
+    since: 이 체크의 마지막 실행 날짜 (None이면 전체 평가)
+    dirty_from/dirty_to: 이번에 처리할 NotificationDirty change_id 구간 (from 초과, to 이하)
+    """
+
+    def __init__(self, today, since=None, dirty_from=0, dirty_to=0):
+        self.today = today
+        self.since = since
+        self.dirty_from = dirty_from
+        self.dirty_to = dirty_to
+
+    @property
+    def full(self):
+        return self.since is None
+
+    @property
+    def new_day(self):
+        # 날짜 임계(D-n, 만료일 경과)는 날짜가 바뀔 때만 새 대상이 생김
+        return self.full or self.since < self.today
+
+    def crossed_since(self, lookback_days):
+        """'만료일 < today' 조건에 마지막 실행 이후 새로 들어온 날짜의 하한 (조회 범위 lookback 안으로 제한)"""
+        floor = self.today - timedelta(days=lookback_days)
+        return floor if self.full else max(self.since, floor)
+
+    def dirty(self, column, ref_type):
+        """(SQL 조건, 파라미터): 마지막 실행 이후 변경된 대상만"""
+        return (f"{column} IN (SELECT reference_id FROM NotificationDirty "
+                f"WHERE reference_type = ? AND change_id > ? AND change_id <= ?)",
+                [ref_type, self.dirty_from, self.dirty_to])
+
+def _collect(conn, sql, params, slices):
+    """slices(조건, 파라미터)마다 sql의 {filter}를 채워 조회하고 첫 컬럼(대상 ID) 기준으로 합친다."""
+    rows = {}
+    for condition, extra in slices:
+        for row in conn.execute(sql.format(filter=condition), list(params) + list(extra)):
+            rows.setdefault(row[0], row)
+    return list(rows.values())
+
+ALL_ROWS = ('1 = 1', [])
+# 체크 쿼리의 is_deleted 조건은 '+'로 인덱스 사용을 막음: 거의 모든 행이 0이라
+# idx_asset_deleted를 타면 날짜 인덱스/변경 대상 대신 전체 자산을 훑게 된다.
+EXPIRED_LOOKBACK_DAYS = 30  # 만료일 경과 알림 대상 기간
+
+# ========================================
+# 체크
+# ========================================
+def _alert_dates(today, alert_days):
+    return [(today + timedelta(days=days)).isoformat() for days in alert_days]
+
+def check_license_expiring(conn, run):
     """라이선스 만료 임박 체크 (D-60, D-30, D-14, D-7, D-1)"""
-    conn = get_db()
-    today = date.today()
-    alert_days = [60, 30, 14, 7, 1]
-    created_count = 0
-    
-    for days in alert_days:
-        target_date = today + timedelta(days=days)
-        severity = 'critical' if days <= 7 else 'warning'
-        
-        licenses = conn.execute('''
-            SELECT sl.*, u.user_id as manager_id
-            FROM SoftwareLicense sl
-            LEFT JOIN User u ON sl.license_manager_id = u.user_id
-            WHERE sl.is_deleted = 0 AND sl.is_subscription = 1 
-            AND sl.subscription_end = ?
-        ''', (target_date.isoformat(),)).fetchall()
-        
-        for lic in licenses:
-            title = f"라이선스 만료 D-{days}: {lic['software_name']}"
-            message = f"{lic['software_name']} 라이선스가 {days}일 후 ({lic['subscription_end']}) 만료됩니다. 갱신을 검토해주세요."
-            if create_notification(conn, 'LICENSE_EXPIRING', severity, lic['manager_id'] or 1, 
-                                   title, message, 'LICENSE', lic['license_id']):
-                created_count += 1
-    
-    conn.commit()
-    conn.close()
-    return created_count
-
-def check_warranty_expiring():
+    # 알림 시점 날짜들을 한 번에 조회 (subscription_end 인덱스 IN 탐색), 남은 일수는 SQL에서 계산
+    # 날짜가 바뀐 첫 실행은 해당 날짜 전체, 같은 날 재실행은 변경된 라이선스만
+    dates = _alert_dates(run.today, LICENSE_ALERT_DAYS)
+    licenses = _collect(conn, f'''
+        SELECT sl.license_id, sl.software_name, sl.subscription_end, u.user_id AS manager_id,
+               CAST(julianday(sl.subscription_end) - julianday(?) AS INTEGER) AS days_left
+        FROM SoftwareLicense sl
+        LEFT JOIN User u ON sl.license_manager_id = u.user_id
+        WHERE sl.subscription_end IN ({', '.join('?' * len(dates))})
+          AND +sl.is_deleted = 0 AND sl.is_subscription = 1 AND {{filter}}
+    ''', [run.today.isoformat()] + dates, [ALL_ROWS] if run.new_day else [run.dirty('sl.license_id', 'LICENSE')])
+
+    rows = []
+    for lic in licenses:
+        days = lic['days_left']
+        title = f"라이선스 만료 D-{days}: {lic['software_name']}"
+        message = f"{lic['software_name']} 라이선스가 {days}일 후 ({lic['subscription_end']}) 만료됩니다. 갱신을 검토해주세요."
+        rows.append(('LICENSE_EXPIRING', LICENSE_ALERT_DAYS[days], lic['manager_id'] or 1,
+                     title, message, 'LICENSE', lic['license_id']))
+    return insert_notifications(conn, rows)
+
+def check_warranty_expiring(conn, run):
     """보증 만료 임박 체크 (D-90, D-30, D-7)"""
-    conn = get_db()
-    today = date.today()
-    alert_days = [90, 30, 7]
-    created_count = 0
-    
-    for days in alert_days:
-        target_date = today + timedelta(days=days)
-        severity = 'critical' if days == 7 else 'warning' if days == 30 else 'info'
-        
-        assets = conn.execute('''
-            SELECT a.*, u.user_id as manager_id
-            FROM Asset a
-            LEFT JOIN User u ON a.asset_manager_id = u.user_id
-            WHERE a.is_deleted = 0 AND a.warranty_end = ?
-        ''', (target_date.isoformat(),)).fetchall()
-        
-        for asset in assets:
-            title = f"보증 만료 D-{days}: {asset['asset_number']}"
-            message = f"{asset['asset_name']} ({asset['asset_number']}) 보증이 {days}일 후 만료됩니다."
-            if create_notification(conn, 'WARRANTY_EXPIRING', severity, asset['manager_id'] or 1,
-                                   title, message, 'ASSET', asset['asset_id']):
-                created_count += 1
-    
-    conn.commit()
-    conn.close()
-    return created_count
-
-def check_useful_life_expired():
+    dates = _alert_dates(run.today, WARRANTY_ALERT_DAYS)
+    assets = _collect(conn, f'''
+        SELECT a.asset_id, a.asset_number, a.asset_name, u.user_id AS manager_id,
+               CAST(julianday(a.warranty_end) - julianday(?) AS INTEGER) AS days_left
+        FROM Asset a
+        LEFT JOIN User u ON a.asset_manager_id = u.user_id
+        WHERE a.warranty_end IN ({', '.join('?' * len(dates))})
+          AND +a.is_deleted = 0 AND {{filter}}
+    ''', [run.today.isoformat()] + dates, [ALL_ROWS] if run.new_day else [run.dirty('a.asset_id', 'ASSET')])
+
+    rows = []
+    for asset in assets:
+        days = asset['days_left']
+        title = f"보증 만료 D-{days}: {asset['asset_number']}"
+        message = f"{asset['asset_name']} ({asset['asset_number']}) 보증이 {days}일 후 만료됩니다."
+        rows.append(('WARRANTY_EXPIRING', WARRANTY_ALERT_DAYS[days], asset['manager_id'] or 1,
+                     title, message, 'ASSET', asset['asset_id']))
+    return insert_notifications(conn, rows)
+
+def check_useful_life_expired(conn, run):
     """사용연한 초과 자산 체크"""
-    conn = get_db()
-    created_count = 0
-    
-    # 사용연한 초과 자산 (이번 달에 만료된 건만)
-    assets = conn.execute('''
-        SELECT a.*, u.user_id as manager_id
+    # 최근 30일 안에 만료된 자산 중 마지막 실행 이후 만료일이 지난 것 + 변경된 것
+    today = run.today.isoformat()
+    floor = (run.today - timedelta(days=EXPIRED_LOOKBACK_DAYS)).isoformat()
+    slices = [run.dirty('a.asset_id', 'ASSET')] if not run.full else []
+    if run.new_day:
+        slices.append(('a.useful_life_expire_date >= ?', [run.crossed_since(EXPIRED_LOOKBACK_DAYS).isoformat()]))
+    assets = _collect(conn, '''
+        SELECT a.asset_id, a.asset_number, a.asset_name, u.user_id AS manager_id
         FROM Asset a
         LEFT JOIN User u ON a.asset_manager_id = u.user_id
-        WHERE a.is_deleted = 0 
-        AND a.useful_life_expire_date IS NOT NULL
-        AND a.useful_life_expire_date < DATE('now')
-        AND a.useful_life_expire_date >= DATE('now', '-30 days')
-    ''').fetchall()
-    
+        WHERE a.useful_life_expire_date < ?
+          AND a.useful_life_expire_date >= ?
+          AND +a.is_deleted = 0 AND {filter}
+    ''', [today, floor], slices)
+
+    rows = []
     for asset in assets:
         title = f"사용연한 초과: {asset['asset_number']}"
         message = f"{asset['asset_name']} ({asset['asset_number']})의 사용연한이 초과되었습니다. 교체/폐기를 검토해주세요."
-        if create_notification(conn, 'USEFUL_LIFE_EXPIRED', 'warning', asset['manager_id'] or 1,
-                               title, message, 'ASSET', asset['asset_id']):
-            created_count += 1
-    
-    conn.commit()
-    conn.close()
-    return created_count
-
-def check_eos_expired():
+        rows.append(('USEFUL_LIFE_EXPIRED', 'warning', asset['manager_id'] or 1,
+                     title, message, 'ASSET', asset['asset_id']))
+    return insert_notifications(conn, rows)
+
+def check_eos_expired(conn, run):
     """OS EOS 경과 자산 체크"""
-    conn = get_db()
-    created_count = 0
-    
-    assets = conn.execute('''
-        SELECT a.*, e.product_name, e.eos_date, u.user_id as manager_id
-        FROM Asset a
-        JOIN EOSInfo e ON a.eos_id = e.eos_id
+    # 마지막 실행 이후 EOS가 지난 제품의 자산 + EOS 연결/삭제가 바뀐 자산 + EOS 날짜가 바뀐 제품의 자산
+    today = run.today.isoformat()
+    floor = (run.today - timedelta(days=EXPIRED_LOOKBACK_DAYS)).isoformat()
+    slices = [run.dirty('a.asset_id', 'ASSET'), run.dirty('e.eos_id', 'EOS')] if not run.full else []
+    if run.new_day:
+        slices.append(('e.eos_date >= ?', [run.crossed_since(EXPIRED_LOOKBACK_DAYS).isoformat()]))
+    assets = _collect(conn, '''
+        SELECT a.asset_id, a.asset_number, a.asset_name, u.user_id AS manager_id, e.product_name, e.eos_date
+        FROM EOSInfo e
+        JOIN Asset a ON a.eos_id = e.eos_id
         LEFT JOIN User u ON a.asset_manager_id = u.user_id
-        WHERE a.is_deleted = 0 
-        AND e.eos_date < DATE('now')
-        AND e.eos_date >= DATE('now', '-30 days')
-    ''').fetchall()
-    
+        WHERE e.eos_date < ?
+          AND e.eos_date >= ?
+          AND +a.is_deleted = 0 AND {filter}
+    ''', [today, floor], slices)
+
+    rows = []
     for asset in assets:
         title = f"OS EOS 경과: {asset['asset_number']}"
         message = f"{asset['asset_name']}의 {asset['product_name']}가 EOS({asset['eos_date']})를 경과했습니다. 업그레이드/교체를 검토해주세요."
-        if create_notification(conn, 'OS_EOS_EXPIRED', 'critical', asset['manager_id'] or 1,
-                               title, message, 'ASSET', asset['asset_id']):
-            created_count += 1
-    
-    conn.commit()
-    conn.close()
-    return created_count
-
-def check_license_exceeded():
+        rows.append(('OS_EOS_EXPIRED', 'critical', asset['manager_id'] or 1,
+                     title, message, 'ASSET', asset['asset_id']))
+    return insert_notifications(conn, rows)
+
+def check_license_exceeded(conn, run):
     """라이선스 초과 체크"""
-    conn = get_db()
-    created_count = 0
-    
-    licenses = conn.execute('''
-        SELECT sl.*, u.user_id as manager_id
+    # 날짜와 무관한 조건: 첫 실행(전체) 이후에는 수량이 바뀐 라이선스만
+    licenses = _collect(conn, '''
+        SELECT sl.license_id, sl.software_name, sl.used_quantity, sl.total_quantity, u.user_id AS manager_id
         FROM SoftwareLicense sl
         LEFT JOIN User u ON sl.license_manager_id = u.user_id
-        WHERE sl.is_deleted = 0 AND sl.used_quantity > sl.total_quantity
-    ''').fetchall()
-    
+        WHERE +sl.is_deleted = 0 AND sl.used_quantity > sl.total_quantity AND {filter}
+    ''', [], [ALL_ROWS] if run.full else [run.dirty('sl.license_id', 'LICENSE')])
+
+    rows = []
     for lic in licenses:
         title = f"라이선스 초과: {lic['software_name']}"
         message = f"{lic['software_name']} 라이선스가 초과되었습니다. (사용: {lic['used_quantity']}, 보유: {lic['total_quantity']})"
-        if create_notification(conn, 'LICENSE_EXCEEDED', 'critical', lic['manager_id'] or 1,
-                               title, message, 'LICENSE', lic['license_id']):
-            created_count += 1
-    
-    conn.commit()
-    conn.close()
-    return created_count
-
-def run_all_checks():
-    """모든 알림 체크 실행"""
-    results = {
-        'license_expiring': check_license_expiring(),
-        'warranty_expiring': check_warranty_expiring(),
-        'useful_life_expired': check_useful_life_expired(),
-        'eos_expired': check_eos_expired(),
-        'license_exceeded': check_license_exceeded()
-    }
+        rows.append(('LICENSE_EXCEEDED', 'critical', lic['manager_id'] or 1,
+                     title, message, 'LICENSE', lic['license_id']))
+    return insert_notifications(conn, rows)
+
+CHECKS = [
+    ('license_expiring', check_license_expiring),
+    ('warranty_expiring', check_warranty_expiring),
+    ('useful_life_expired', check_useful_life_expired),
+    ('eos_expired', check_eos_expired),
+    ('license_exceeded', check_license_exceeded),
+]
+
+def run_all_checks(timings=None, full=False, today=None):
+    """모든 알림 체크 실행 (커넥션 하나, 체크별 트랜잭션)
+
+    체크마다 마지막 실행 날짜와 처리한 change_id(high-water mark)를 기록해 두고,
+    그 이후 변경된 대상과 날짜 임계를 새로 넘은 대상만 평가한다. full=True면 전체 평가.
+    timings에 dict를 넘기면 체크별 소요시간(ms)을 채운다.
+    """
+    timings = {} if timings is None else timings
+    results = {}
+    today = today or date.today()
+    conn = get_db()
+    try:
+        dirty_to = conn.execute('SELECT COALESCE(MAX(change_id), 0) FROM NotificationDirty').fetchone()[0]
+        states = {row['check_name']: row for row in conn.execute('SELECT * FROM NotificationCheckState')}
+        for name, check in CHECKS:
+            started = time.monotonic()
+            state = states.get(name)
+            if full or state is None:
+                run = CheckRun(today, dirty_to=dirty_to)
+            else:
+                run = CheckRun(today, date.fromisoformat(state['last_run_date']), state['last_change_id'], dirty_to)
+            begin_immediate(conn)
+            try:
+                results[name] = check(conn, run)
+                conn.execute('''
+                    INSERT INTO NotificationCheckState (check_name, last_run_date, last_change_id)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT (check_name) DO UPDATE SET
+                        last_run_date = MAX(last_run_date, excluded.last_run_date),
+                        last_change_id = excluded.last_change_id, updated_at = CURRENT_TIMESTAMP
+                ''', (name, today.isoformat(), dirty_to))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            timings[name] = round((time.monotonic() - started) * 1000, 1)
+
+        # 모든 체크가 처리한 변경분 정리
+        begin_immediate(conn)
+        conn.execute('DELETE FROM NotificationDirty WHERE change_id <= ?', (dirty_to,))
+        conn.commit()
+    finally:
+        conn.close()
+
     total = sum(results.values())
-    print(f"✅ 알림 생성 완료: 총 {total}건")
+    print(f"✅ 알림 생성 완료: 총 {total}건 ({sum(timings.values()):.1f}ms)")
     for k, v in results.items():
         if v > 0:
-            print(f"   - {k}: {v}건")
+            print(f"   - {k}: {v}건 ({timings[k]}ms)")
     return results
 
 if __name__ == '__main__':
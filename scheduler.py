@@ -0,0 +1,225 @@
+"""
+ITAM - Scheduler
+알림 체크/카운터 보정/DB 유지보수/Import 작업 정리 주기 실행 (프로세스 내 스레드 + DB 임대 잠금)
+"""
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+
+import settings
+from database import begin_immediate, get_db
+from license_keys import counter_drift, fix_counter_drift
+from notification_checker import run_all_checks
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'  # SchedulerJob 시각은 서버 로컬 시각
+UNIT_SECONDS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# ========================================
+# 작업 정의
+# ========================================
+def job_notification_checks(conn):
+    timings = {}
+    results = run_all_checks(timings)
+    return f"알림 {sum(results.values())}건 생성 ({sum(timings.values()):.0f}ms)"
+
+def job_counter_reconcile(conn):
+    begin_immediate(conn)
+    drift = counter_drift(conn)
+    if drift:
+        fix_counter_drift(conn, drift)
+    conn.commit()
+    return f"카운터 불일치 {len(drift)}건 보정"
+
+def job_db_maintenance(conn):
+    conn.execute('PRAGMA optimize')
+    busy, log_frames, checkpointed = conn.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchone()
+    return f"PRAGMA optimize, WAL 체크포인트 {checkpointed}/{log_frames} 프레임" + (" (사용 중이라 일부만)" if busy else "")
+
+def job_import_recovery(conn):
+    from import_jobs import recover_import_jobs  # openpyxl 로드는 실제 실행 시점으로 미룸
+    failed, requeued = recover_import_jobs(conn)
+    return f"중단된 Import 작업 {failed}건 실패 처리, 대기 작업 {requeued}건 재등록"
+
+def scheduled_jobs():
+    """job_name -> (일정, 실행 함수)"""
+    return {
+        'notification_checks': (settings.SCHEDULE_NOTIFICATION_CHECKS, job_notification_checks),
+        'counter_reconcile': (settings.SCHEDULE_COUNTER_RECONCILE, job_counter_reconcile),
+        'db_maintenance': (settings.SCHEDULE_DB_MAINTENANCE, job_db_maintenance),
+        'import_recovery': (settings.SCHEDULE_IMPORT_RECOVERY, job_import_recovery),
+    }
+
+# ========================================
+# 일정 해석: 'every 15m' | 'every 2h' | 'daily 03:00' | 'off'
+# ========================================
+def parse_schedule(spec):
+    """Return ('every', seconds), ('daily', (hour, minute)) or None when disabled."""
+    parts = (spec or '').strip().lower().split()
+    if not parts or parts == ['off']:
+        return None
+    if len(parts) == 2 and parts[0] == 'every' and parts[1][:-1].isdigit() and parts[1][-1] in UNIT_SECONDS:
+        seconds = int(parts[1][:-1]) * UNIT_SECONDS[parts[1][-1]]
+        if seconds > 0:
+            return ('every', seconds)
+    if len(parts) == 2 and parts[0] == 'daily':
+        try:
+            at = datetime.strptime(parts[1], '%H:%M')
+            return ('daily', (at.hour, at.minute))
+        except ValueError:
+            pass
+    raise ValueError(f"잘못된 일정 형식: {spec!r} (예: 'every 15m', 'every 1h', 'daily 03:00', 'off')")
+
+def next_run(schedule, after):
+    if schedule is None:
+        return None
+    kind, value = schedule
+    if kind == 'every':
+        return after + timedelta(seconds=value)
+    candidate = after.replace(hour=value[0], minute=value[1], second=0, microsecond=0)
+    return candidate if candidate > after else candidate + timedelta(days=1)
+
+# ========================================
+# SchedulerJob 테이블 (작업별 일정/임대/최근 실행 결과)
+# ========================================
+def create_scheduler_table(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS SchedulerJob (
+            job_name VARCHAR(50) PRIMARY KEY,
+            schedule VARCHAR(50),
+            next_run_at DATETIME,
+            lease_owner VARCHAR(100),
+            lease_expires_at DATETIME,
+            last_started_at DATETIME,
+            last_finished_at DATETIME,
+            last_duration_ms INTEGER,
+            last_status VARCHAR(20),
+            last_message TEXT,
+            run_count INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+
+def sync_jobs(conn, now=None):
+    """Register jobs and reschedule those whose setting changed (interval jobs start immediately)."""
+    now = now or datetime.now()
+    for name, (spec, _) in scheduled_jobs().items():
+        schedule = parse_schedule(spec)
+        first = now if schedule and schedule[0] == 'every' else next_run(schedule, now)
+        first = first.strftime(TIME_FORMAT) if first else None
+        conn.execute('''
+            INSERT INTO SchedulerJob (job_name, schedule, next_run_at) VALUES (?, ?, ?)
+            ON CONFLICT (job_name) DO UPDATE SET schedule = excluded.schedule, next_run_at = excluded.next_run_at
+            WHERE schedule IS NOT excluded.schedule
+        ''', (name, spec, first))
+    conn.commit()
+
+def _claim(conn, name, owner, now):
+    # 한 문장으로 임대 획득: 다른 프로세스/스레드가 잡고 있거나 아직 시각이 안 됐으면 None
+    row = conn.execute('''
+        UPDATE SchedulerJob
+        SET lease_owner = ?, lease_expires_at = ?, last_started_at = ?, last_status = '진행중'
+        WHERE job_name = ? AND next_run_at IS NOT NULL AND next_run_at <= ?
+          AND (lease_expires_at IS NULL OR lease_expires_at < ?)
+        RETURNING job_name
+    ''', (owner, (now + timedelta(seconds=settings.SCHEDULER_LEASE_SECONDS)).strftime(TIME_FORMAT),
+          now.strftime(TIME_FORMAT), name, now.strftime(TIME_FORMAT), now.strftime(TIME_FORMAT))).fetchone()
+    conn.commit()
+    return row is not None
+
+def _finish(conn, name, owner, spec, status, message, duration_ms):
+    finished = datetime.now()
+    upcoming = next_run(parse_schedule(spec), finished)
+    conn.execute('''
+        UPDATE SchedulerJob
+        SET lease_owner = NULL, lease_expires_at = NULL, last_finished_at = ?, last_duration_ms = ?,
+            last_status = ?, last_message = ?, run_count = run_count + 1, next_run_at = ?
+        WHERE job_name = ? AND lease_owner = ?
+    ''', (finished.strftime(TIME_FORMAT), duration_ms, status, message,
+          upcoming.strftime(TIME_FORMAT) if upcoming else None, name, owner))
+    conn.commit()
+
+def run_pending(owner=None, now=None):
+    """Run every due job this process can lease; returns the job names that ran."""
+    owner = owner or f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+    ran = []
+    conn = get_db()
+    try:
+        for name, (spec, func) in scheduled_jobs().items():
+            if not _claim(conn, name, owner, now or datetime.now()):
+                continue
+            started = time.monotonic()
+            try:
+                status, message = '성공', func(conn)
+            except Exception as e:
+                conn.rollback()
+                status, message = '실패', str(e)
+                print(f"⚠️ Scheduled job {name} failed: {e}")
+            _finish(conn, name, owner, spec, status, message, int((time.monotonic() - started) * 1000))
+            ran.append(name)
+    finally:
+        conn.close()
+    return ran
+
+def request_run(conn, name):
+    """Make a job due now; the scheduler thread picks it up on its next poll."""
+    updated = conn.execute('''
+        UPDATE SchedulerJob SET next_run_at = ? WHERE job_name = ?
+    ''', (datetime.now().strftime(TIME_FORMAT), name)).rowcount
+    conn.commit()
+    if updated:
+        _wake.set()
+    return updated > 0
+
+def scheduler_status(conn):
+    jobs = [dict(row) for row in conn.execute('SELECT * FROM SchedulerJob ORDER BY job_name').fetchall()]
+    return {
+        'enabled': settings.SCHEDULER_ENABLED,
+        'running': _thread is not None and _thread.is_alive() and _thread_pid == os.getpid(),
+        'poll_seconds': settings.SCHEDULER_POLL_SECONDS,
+        'jobs': jobs,
+    }
+
+# ========================================
+# 백그라운드 스레드
+# ========================================
+_thread = None
+_thread_pid = None
+_thread_lock = threading.Lock()
+_stop = threading.Event()
+_wake = threading.Event()
+
+def _loop():
+    while not _stop.is_set():
+        try:
+            run_pending()
+        except Exception as e:
+            print(f"⚠️ Scheduler poll failed: {e}")
+        _wake.wait(settings.SCHEDULER_POLL_SECONDS)
+        _wake.clear()
+
+def start_scheduler():
+    """Start the scheduler thread once per process (no-op when SCHEDULER_ENABLED is off)."""
+    global _thread, _thread_pid
+    if not settings.SCHEDULER_ENABLED:
+        return False
+    with _thread_lock:
+        # fork된 워커는 부모 스레드를 물려받지 않으므로 pid로 구분
+        if _thread is not None and _thread.is_alive() and _thread_pid == os.getpid():
+            return False
+        conn = get_db()
+        try:
+            sync_jobs(conn)
+        finally:
+            conn.close()
+        _stop.clear()
+        _thread = threading.Thread(target=_loop, name='itam-scheduler', daemon=True)
+        _thread_pid = os.getpid()
+        _thread.start()
+        return True
+
+def stop_scheduler(timeout=None):
+    _stop.set()
+    _wake.set()
+    if _thread is not None:
+        _thread.join(timeout)
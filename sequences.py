@@ -0,0 +1,133 @@
+"""
+ITAM - Number Sequences
+자산번호/라이선스번호 채번 (prefix별 카운터 테이블)
+"""
+
+# scope -> 채번 대상 (테이블, 번호 컬럼)
+SEQUENCE_SOURCES = {
+    'ASSET': ('Asset', 'asset_number'),
+    'LICENSE': ('SoftwareLicense', 'license_number'),
+}
+
+def format_number(prefix, value):
+    return f"{prefix}-{str(value).zfill(4)}"
+
+def _max_existing(conn, scope, prefix):
+    """Highest numeric suffix already used for prefix (one-time seed per prefix)."""
+    table, column = SEQUENCE_SOURCES[scope]
+    start = len(prefix) + 2
+    row = conn.execute(f'''
+        SELECT MAX(CAST(substr({column}, ?) AS INTEGER))
+        FROM {table}
+        WHERE {column} > ? AND {column} < ?
+          AND substr({column}, ?) != '' AND substr({column}, ?) NOT GLOB '*[^0-9]*'
+    ''', (start, f"{prefix}-", f"{prefix}.", start, start)).fetchone()
+    return row[0] or 0
+
+def allocate_numbers(conn, scope, prefix, count=1):
+    """Reserve count consecutive numbers for prefix and return the first one.
+
+    Runs inside the caller's write transaction: the UPDATE takes the write
+    lock before reading the counter, so concurrent creates cannot receive
+    the same number, and a rollback returns the numbers.
+    """
+    row = conn.execute('''
+        UPDATE NumberSequence
+        SET last_value = last_value + ?, updated_at = CURRENT_TIMESTAMP
+        WHERE scope = ? AND prefix = ?
+        RETURNING last_value
+    ''', (count, scope, prefix)).fetchone()
+    if row is not None:
+        return row[0] - count + 1
+    current = _max_existing(conn, scope, prefix)
+    conn.execute('''
+        INSERT INTO NumberSequence (scope, prefix, last_value)
+        VALUES (?, ?, ?)
+    ''', (scope, prefix, current + count))
+    return current + 1
+
+def allocate_number(conn, scope, prefix):
+    return format_number(prefix, allocate_numbers(conn, scope, prefix))
+
+def split_number(number):
+    """'HQ-NB-2026-0012' -> ('HQ-NB-2026', 12); None if there is no numeric suffix."""
+    head = number.rstrip('0123456789')
+    if not head.endswith('-') or len(head) == len(number):
+        return None
+    return head[:-1], int(number[len(head):])
+
+class BlockAllocator:
+    """Bulk import 용 채번기: prefix별로 block_size만큼 미리 예약해 두고 나눠준다.
+
+    Must be used inside a single write transaction; call release() before
+    commit so the unused tail of each block goes back to the counter.
+    """
+
+    def __init__(self, conn, scope, block_size=100):
+        self.conn = conn
+        self.scope = scope
+        self.block_size = block_size
+        self._blocks = {}   # prefix -> [next, end]
+        self._used = {}     # prefix -> 파일에 직접 입력된 번호
+
+    def note_used(self, number):
+        """Mark a manually entered number so a reserved block never hands it out."""
+        parsed = split_number(number or '')
+        if parsed:
+            self._used.setdefault(parsed[0], set()).add(parsed[1])
+
+    def next(self, prefix):
+        used = self._used.get(prefix, ())
+        while True:
+            block = self._blocks.get(prefix)
+            if block is None or block[0] > block[1]:
+                first = allocate_numbers(self.conn, self.scope, prefix, self.block_size)
+                block = self._blocks[prefix] = [first, first + self.block_size - 1]
+            value = block[0]
+            block[0] += 1
+            if value not in used:
+                return format_number(prefix, value)
+
+    def release(self):
+        for prefix, (next_value, end) in self._blocks.items():
+            keep = max([next_value - 1] + [v for v in self._used.get(prefix, ()) if v <= end])
+            if keep < end:
+                # 그 사이 다른 채번이 없었을 때만 되돌림
+                self.conn.execute('''
+                    UPDATE NumberSequence SET last_value = ?
+                    WHERE scope = ? AND prefix = ? AND last_value = ?
+                ''', (keep, self.scope, prefix, end))
+        self._blocks.clear()
+
+def create_sequence_table(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS NumberSequence (
+            scope VARCHAR(20) NOT NULL,
+            prefix VARCHAR(50) NOT NULL,
+            last_value INTEGER NOT NULL DEFAULT 0,
+            updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (scope, prefix)
+        )
+    ''')
+    # 직접 입력한 번호(예: HQ-NB-2026-0050)가 카운터를 앞지르면 카운터를 끌어올려 충돌 방지
+    for scope, (table, column) in SEQUENCE_SOURCES.items():
+        head = f"rtrim(NEW.{column}, '0123456789')"
+        body = f'''
+            UPDATE NumberSequence
+            SET last_value = CAST(substr(NEW.{column}, length({head}) + 1) AS INTEGER)
+            WHERE scope = '{scope}'
+              AND prefix = substr({head}, 1, length({head}) - 1)
+              AND substr({head}, -1) = '-'
+              AND length(NEW.{column}) > length({head})
+              AND CAST(substr(NEW.{column}, length({head}) + 1) AS INTEGER) > last_value;
+        '''
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table.lower()}_number_ai AFTER INSERT ON {table} BEGIN
+                {body}
+            END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table.lower()}_number_au AFTER UPDATE OF {column} ON {table} BEGIN
+                {body}
+            END
+        ''')
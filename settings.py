@@ -0,0 +1,100 @@
+"""
+ITAM - Settings
+DB 경로/프라그마/풀 설정의 단일 소스 (설정파일 + 환경변수)
+"""
+import json
+import os
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CONFIG_FILE = os.path.join(BASE_DIR, 'itam_config.json')
+
+# 우선순위: 기본값 < 설정파일(itam_config.json 또는 ITAM_CONFIG) < 환경변수(ITAM_<KEY>)
+DEFAULTS = {
+    'DB_PATH': 'itam_prod.db',
+    'DB_POOL_SIZE': 8,
+    'DB_POOL_TIMEOUT': 30,          # 풀 고갈 시 대기 한도 (초)
+    'DB_BUSY_TIMEOUT_MS': 5000,     # 잠금 대기 한도 (밀리초)
+    'DB_CACHE_SIZE_KB': 65536,      # 커넥션당 페이지 캐시 (KiB)
+    'DB_MMAP_SIZE': 268435456,      # 256MB
+    'DB_JOURNAL_MODE': 'WAL',
+    'DB_SYNCHRONOUS': 'NORMAL',
+    'API_PAGE_SIZE': 100,           # 목록 API 기본 페이지 크기
+    'API_PAGE_SIZE_MAX': 500,       # 목록 API 최대 페이지 크기
+    'IMPORT_CHUNK_SIZE': 1000,      # Import 커밋 단위 (행)
+    'UPLOAD_SPOOL_MAX_BYTES': 8388608,  # 업로드 파일을 메모리에 두는 한도, 초과 시 임시 파일 (8MB)
+    'EXPORT_SPOOL_MAX_BYTES': 8388608,  # Export 파일을 메모리에 두는 한도, 초과 시 임시 파일 (8MB)
+    'IMPORT_WORKERS': 2,            # 백그라운드 Import 동시 실행 수
+    'IMPORT_VALIDATION_WORKERS': 1,  # Import 행 검증 프로세스 수 (1: 단일 프로세스, 0: CPU 코어 수)
+    'IMPORT_JOB_DIR': 'import_jobs',  # Import 작업 대기 파일 보관 폴더
+    'IMPORT_JOB_STALE_SECONDS': 900,  # 진행 기록·실행 중 신호(업로드 파일 mtime) 없이 이 시간이 지난 '진행중' 작업은 중단된 것으로 보고 '실패' 처리
+    'EXPORT_CACHE_DIR': 'export_cache',  # Export 결과 캐시 폴더 (데이터 버전별 파일)
+    'EXPORT_CACHE_MAX_FILES': 200,  # Export 캐시 파일 최대 개수 (초과 시 오래 안 쓴 것부터 삭제)
+    'SCHEDULER_ENABLED': True,      # 서버 프로세스 안에서 주기 작업 실행
+    'SCHEDULER_POLL_SECONDS': 30,   # 실행할 작업 확인 주기 (초)
+    'SCHEDULER_LEASE_SECONDS': 3600,  # 작업 임대 잠금 유효 시간 (초), 프로세스가 죽어도 이후 재실행 가능
+    'SCHEDULE_NOTIFICATION_CHECKS': 'every 1h',  # 알림 체크 일정 ('every 15m' / 'daily 06:00' / 'off')
+    'SCHEDULE_COUNTER_RECONCILE': 'daily 03:00',  # 라이선스 카운터 불일치 보정 일정
+    'SCHEDULE_DB_MAINTENANCE': 'daily 03:30',  # PRAGMA optimize / WAL 체크포인트 일정
+    'SCHEDULE_IMPORT_RECOVERY': 'every 10m',  # 중단된 Import 작업 정리 / 대기 작업 재등록 일정
+}
+
+def _coerce(default, raw):
+    if isinstance(default, bool):
+        return str(raw).strip().lower() in ('1', 'true', 'yes', 'y', 'on')
+    if isinstance(default, int):
+        return int(raw)
+    return str(raw)
+
+def load_settings(config_path=None):
+    values = dict(DEFAULTS)
+
+    path = config_path or os.environ.get('ITAM_CONFIG') or DEFAULT_CONFIG_FILE
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            file_values = json.load(f)
+        for key, raw in file_values.items():
+            key = key.upper()
+            if key in DEFAULTS:
+                values[key] = _coerce(DEFAULTS[key], raw)
+
+    for key, default in DEFAULTS.items():
+        raw = os.environ.get(f'ITAM_{key}')
+        if raw is not None and raw != '':
+            values[key] = _coerce(default, raw)
+
+    # 상대 경로는 실행 위치가 아닌 프로젝트 폴더 기준
+    if values['DB_PATH'] != ':memory:' and not os.path.isabs(values['DB_PATH']):
+        values['DB_PATH'] = os.path.join(BASE_DIR, values['DB_PATH'])
+    for key in ('IMPORT_JOB_DIR', 'EXPORT_CACHE_DIR'):
+        if not os.path.isabs(values[key]):
+            values[key] = os.path.join(BASE_DIR, values[key])
+    return values
+
+_values = load_settings()
+
+DB_PATH = _values['DB_PATH']
+DB_POOL_SIZE = _values['DB_POOL_SIZE']
+DB_POOL_TIMEOUT = _values['DB_POOL_TIMEOUT']
+DB_BUSY_TIMEOUT_MS = _values['DB_BUSY_TIMEOUT_MS']
+DB_CACHE_SIZE_KB = _values['DB_CACHE_SIZE_KB']
+DB_MMAP_SIZE = _values['DB_MMAP_SIZE']
+DB_JOURNAL_MODE = _values['DB_JOURNAL_MODE']
+DB_SYNCHRONOUS = _values['DB_SYNCHRONOUS']
+API_PAGE_SIZE = _values['API_PAGE_SIZE']
+API_PAGE_SIZE_MAX = _values['API_PAGE_SIZE_MAX']
+IMPORT_CHUNK_SIZE = _values['IMPORT_CHUNK_SIZE']
+UPLOAD_SPOOL_MAX_BYTES = _values['UPLOAD_SPOOL_MAX_BYTES']
+EXPORT_SPOOL_MAX_BYTES = _values['EXPORT_SPOOL_MAX_BYTES']
+IMPORT_WORKERS = _values['IMPORT_WORKERS']
+IMPORT_VALIDATION_WORKERS = _values['IMPORT_VALIDATION_WORKERS']
+IMPORT_JOB_DIR = _values['IMPORT_JOB_DIR']
+IMPORT_JOB_STALE_SECONDS = _values['IMPORT_JOB_STALE_SECONDS']
+EXPORT_CACHE_DIR = _values['EXPORT_CACHE_DIR']
+EXPORT_CACHE_MAX_FILES = _values['EXPORT_CACHE_MAX_FILES']
+SCHEDULER_ENABLED = _values['SCHEDULER_ENABLED']
+SCHEDULER_POLL_SECONDS = _values['SCHEDULER_POLL_SECONDS']
+SCHEDULER_LEASE_SECONDS = _values['SCHEDULER_LEASE_SECONDS']
+SCHEDULE_NOTIFICATION_CHECKS = _values['SCHEDULE_NOTIFICATION_CHECKS']
+SCHEDULE_COUNTER_RECONCILE = _values['SCHEDULE_COUNTER_RECONCILE']
+SCHEDULE_DB_MAINTENANCE = _values['SCHEDULE_DB_MAINTENANCE']
+SCHEDULE_IMPORT_RECOVERY = _values['SCHEDULE_IMPORT_RECOVERY']
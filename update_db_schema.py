@@ -1,66 +1,30 @@
 
-import sqlite3
 import os
 
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_PATH = os.path.join(BASE_DIR, 'itam_prod.db')
+import settings
+from database import get_db
+from migrations import migrate, migration_status
 
-def add_license_status_column():
-    print(f"🔄 Updating license schema in {DB_PATH}...")
+DB_PATH = settings.DB_PATH
+
+def update_schema():
+    print(f"🔄 Updating schema in {DB_PATH}...")
     try:
         if not os.path.exists(DB_PATH):
             print(f"❌ Database not found at {DB_PATH}")
             return
 
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        # Check if column exists
-        cursor.execute("PRAGMA table_info(SoftwareLicense)")
-        columns = [info[1] for info in cursor.fetchall()]
-        
-        if 'license_status' not in columns:
-            cursor.execute("ALTER TABLE SoftwareLicense ADD COLUMN license_status VARCHAR(20) NOT NULL DEFAULT '활성'")
-            print("✅ 'license_status' column added successfully.")
-            
-            # Create index for performance
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_license_status ON SoftwareLicense(license_status)")
-            print("✅ Index 'idx_license_status' created.")
+        conn = get_db()
+        applied = migrate(conn)
+        if applied:
+            print(f"✅ Applied migrations: {', '.join(f'v{v}' for v in applied)}")
         else:
-            print("ℹ️ 'license_status' column already exists.")
-
-        # Create per-key inventory table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS LicenseKey (
-                license_key_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                license_id INTEGER NOT NULL,
-                key_value VARCHAR(500) NOT NULL,
-                key_status VARCHAR(20) NOT NULL DEFAULT '가용',
-                assigned_assignment_id INTEGER,
-                assigned_date DATE,
-                revoked_date DATE,
-                notes TEXT,
-                created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(license_id, key_value),
-                FOREIGN KEY (license_id) REFERENCES SoftwareLicense(license_id)
-            )
-        ''')
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_license_key_license ON LicenseKey(license_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_license_key_status ON LicenseKey(key_status)")
-        print("✅ LicenseKey table/indexes checked.")
+            print("ℹ️ Schema is already up to date.")
 
-        # Add key link to assignment
-        cursor.execute("PRAGMA table_info(LicenseAssignment)")
-        la_columns = [info[1] for info in cursor.fetchall()]
-        if 'license_key_id' not in la_columns:
-            cursor.execute("ALTER TABLE LicenseAssignment ADD COLUMN license_key_id INTEGER")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_assignment_licensekey ON LicenseAssignment(license_key_id)")
-            print("✅ 'license_key_id' column added to LicenseAssignment.")
-        else:
-            print("ℹ️ 'license_key_id' column already exists.")
+        for row in migration_status(conn):
+            mark = '✅' if row['applied_at'] else '⏳'
+            print(f"   {mark} v{row['version']} {row['name']} ({row['applied_at'] or 'pending'})")
 
-        conn.commit()
-            
     except Exception as e:
         print(f"❌ Error: {e}")
     finally:
@@ -68,4 +32,4 @@ def add_license_status_column():
             conn.close()
 
 if __name__ == '__main__':
-    add_license_status_column()
+    update_schema()